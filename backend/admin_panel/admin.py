@@ -1,3 +1,103 @@
 from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from unfold.admin import ModelAdmin
+from unfold.decorators import display
+from .models import RequestProfile, SlowQuery
 
-# Register your models here.
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(ModelAdmin):
+    """
+    🔬 Request Profiles
+
+    Captured by the profiling middleware (rewear/profiling.py); read-only,
+    download the .prof file to dig in with pstats or snakeviz.
+    """
+    list_display = (
+        'created_at', 'method', 'path', 'endpoint', 'status_code', 'total_ms',
+        'queries', 'db_ms', 'trigger', 'user', 'download_link'
+    )
+    list_filter = ('trigger', 'endpoint', 'method', 'status_code', 'created_at')
+    search_fields = ('path', 'endpoint')
+    readonly_fields = [field.name for field in RequestProfile._meta.fields] + ['download_link']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download),
+                name='admin_panel_requestprofile_download'
+            ),
+        ] + super().get_urls()
+
+    @display(description='Profile')
+    def download_link(self, obj):
+        url = reverse('admin:admin_panel_requestprofile_download', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, 'Download')
+
+    def download(self, request, pk):
+        if not self.has_view_permission(request):
+            raise Http404
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        try:
+            return FileResponse(open(profile.file_path, 'rb'), as_attachment=True, filename=profile.filename)
+        except FileNotFoundError:
+            raise Http404('Profile file is gone')
+
+    # remove the .prof files along with the rows
+    def delete_model(self, request, obj):
+        obj.discard()
+
+    def delete_queryset(self, request, queryset):
+        for profile in queryset:
+            profile.discard()
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(ModelAdmin):
+    """
+    🐢 Slow Queries
+
+    Statements over SLOW_QUERY_MS with their EXPLAIN plan
+    (rewear/slow_queries.py); read-only.
+    """
+    list_display = ('created_at', 'duration_ms', 'short_sql', 'endpoint', 'source', 'database', 'same_statement')
+    list_filter = ('database', 'endpoint', 'created_at')
+    search_fields = ('sql', 'endpoint', 'source', 'path')
+    fields = (
+        'created_at', 'duration_ms', 'database', 'endpoint', 'method', 'path', 'source',
+        'fingerprint', 'formatted_sql', 'formatted_plan'
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @display(description='SQL')
+    def short_sql(self, obj):
+        return obj.sql if len(obj.sql) <= 120 else obj.sql[:117] + '...'
+
+    @display(description='SQL')
+    def formatted_sql(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.sql)
+
+    @display(description='Plan')
+    def formatted_plan(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.plan or '-')
+
+    @display(description='Runs')
+    def same_statement(self, obj):
+        url = reverse('admin:admin_panel_slowquery_changelist') + f'?fingerprint={obj.fingerprint}'
+        return format_html('<a href="{}">{}</a>', url, 'All runs')
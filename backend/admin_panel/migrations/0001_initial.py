@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('endpoint', models.CharField(blank=True, help_text='URL name of the view', max_length=200)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('trigger', models.CharField(choices=[('header', 'Profiling header'), ('sample', 'Random sample')], max_length=10)),
+                ('total_ms', models.FloatField()),
+                ('queries', models.PositiveIntegerField(default=0)),
+                ('db_ms', models.FloatField(default=0)),
+                ('serialize_ms', models.FloatField(default=0)),
+                ('render_ms', models.FloatField(default=0)),
+                ('filename', models.CharField(max_length=255)),
+                ('summary', models.TextField(blank=True, help_text='Top functions by cumulative time')),
+                ('user', models.ForeignKey(blank=True, help_text='Staff user who asked for the profile', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_profiles', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
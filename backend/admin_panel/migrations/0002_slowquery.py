@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('database', models.CharField(help_text='Database alias', max_length=100)),
+                ('duration_ms', models.FloatField()),
+                ('sql', models.TextField()),
+                ('fingerprint', models.CharField(db_index=True, help_text='Same for every run of the statement', max_length=32)),
+                ('plan', models.TextField(blank=True)),
+                ('endpoint', models.CharField(blank=True, help_text='URL name of the view', max_length=200)),
+                ('method', models.CharField(blank=True, max_length=10)),
+                ('path', models.CharField(blank=True, max_length=500)),
+                ('source', models.CharField(blank=True, help_text='First project code frame on the stack', max_length=300)),
+            ],
+            options={
+                'verbose_name_plural': 'slow queries',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,3 +1,103 @@
+import os
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class RequestProfile(models.Model):
+    """
+    🔬 cProfile capture of one request
+
+    Written by the profiling middleware (rewear/profiling.py); the pstats
+    file itself lives in PROFILING_DIR under `filename`.
+    """
+
+    class Trigger(models.TextChoices):
+        HEADER = 'header', 'Profiling header'
+        SAMPLE = 'sample', 'Random sample'
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    endpoint = models.CharField(max_length=200, blank=True, help_text="URL name of the view")
+    status_code = models.PositiveSmallIntegerField()
+    trigger = models.CharField(max_length=10, choices=Trigger.choices)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='request_profiles',
+        help_text="Staff user who asked for the profile"
+    )
+
+    # Request stats (rewear/instrumentation.py)
+    total_ms = models.FloatField()
+    queries = models.PositiveIntegerField(default=0)
+    db_ms = models.FloatField(default=0)
+    serialize_ms = models.FloatField(default=0)
+    render_ms = models.FloatField(default=0)
+
+    filename = models.CharField(max_length=255)
+    summary = models.TextField(blank=True, help_text="Top functions by cumulative time")
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.total_ms:.0f} ms)"
+
+    @property
+    def file_path(self):
+        return os.path.join(settings.PROFILING_DIR, self.filename)
+
+    def discard(self):
+        """Delete the pstats file and the row"""
+        try:
+            os.remove(self.file_path)
+        except FileNotFoundError:
+            pass
+        self.delete()
+
+    @classmethod
+    def prune(cls, keep):
+        """Discard all but the newest `keep` profiles"""
+        for profile in cls.objects.order_by('-created_at', '-id')[keep:]:
+            profile.discard()
+
+
+class SlowQuery(models.Model):
+    """
+    🐢 SQL statement that ran for at least SLOW_QUERY_MS
+
+    Recorded by rewear/slow_queries.py with the request and code line
+    that issued it and its EXPLAIN plan. Parameters are not stored, the
+    literals PostgreSQL prints in plan conditions are redacted.
+    """
+    created_at = models.DateTimeField(auto_now_add=True)
+    database = models.CharField(max_length=100, help_text="Database alias")
+    duration_ms = models.FloatField()
+    sql = models.TextField()
+    fingerprint = models.CharField(
+        max_length=32, db_index=True, help_text="Same for every run of the statement"
+    )
+    plan = models.TextField(blank=True)
+
+    # Where it came from
+    endpoint = models.CharField(max_length=200, blank=True, help_text="URL name of the view")
+    method = models.CharField(max_length=10, blank=True)
+    path = models.CharField(max_length=500, blank=True)
+    source = models.CharField(max_length=300, blank=True, help_text="First project code frame on the stack")
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'slow queries'
+
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms on {self.database}: {self.sql[:80]}"
+
+    @classmethod
+    def prune(cls, keep):
+        """Delete all but the newest `keep` rows"""
+        cutoff = cls.objects.order_by('-id').values_list('id', flat=True)[keep:keep + 1].first()
+        if cutoff is not None:
+            cls.objects.filter(id__lte=cutoff).delete()
@@ -1,3 +1,242 @@
-from django.test import TestCase
+import asyncio
+import cProfile
+import json
+import os
+import shutil
+import tempfile
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rewear import handlers, profiling, slow_queries
+from rewear.testing import authenticated_client, bearer, make_item
+
+from .models import RequestProfile, SlowQuery
+
+User = get_user_model()
+
+
+class RequestProfilingTests(TestCase):
+    """Requests with the profiling token are profiled, stored and downloadable from the admin"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_superuser(username='staff', email='staff@example.com', password='pass12345')
+        cls.member = User.objects.create_user(username='member', email='member@example.com', password='pass12345')
+        make_item(cls.member)
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(
+            PROFILING_ENABLED=True, PROFILING_TOKEN='profile-secret', PROFILING_DIR=self.profile_dir
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_staff_request_is_profiled(self):
+        response = authenticated_client(self.staff).get('/api/items/', HTTP_X_PROFILE='profile-secret')
+        self.assertEqual(response.status_code, 200)
+
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertEqual(profile.endpoint, 'item-list')
+        self.assertEqual(profile.trigger, 'header')
+        self.assertEqual(profile.user, self.staff)
+        self.assertGreater(profile.queries, 0)
+        self.assertTrue(os.path.exists(profile.file_path))
+
+    def test_storing_the_profile_does_not_count_toward_the_request(self):
+        with self.assertNoLogs('rewear.requests', 'WARNING'):
+            response = authenticated_client(self.staff).get('/api/items/', HTTP_X_PROFILE='profile-secret')
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertIn(f'desc="{profile.queries} queries"', response['Server-Timing'])
+        self.assertLessEqual(profile.queries, settings.REQUEST_BUDGETS['item-list']['queries'])
+
+    def test_profile_follows_sync_view_thread_under_asgi(self):
+        token = RefreshToken.for_user(self.staff).access_token
+        headers = {'Authorization': f'Bearer {token}', 'X-Profile': 'profile-secret'}
+        response = async_to_sync(AsyncClient().get)('/api/users/dashboard/', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+        self.assertIn('dashboard', profile.summary)
+
+    def test_header_without_the_token_is_ignored(self):
+        for client in (self.client, authenticated_client(self.member), authenticated_client(self.staff)):
+            response = client.get('/api/items/', HTTP_X_PROFILE='1')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_token_from_non_staff_is_profiled_without_user(self):
+        response = authenticated_client(self.member).get('/api/items/', HTTP_X_PROFILE='profile-secret')
+        self.assertIsNone(RequestProfile.objects.get(pk=response['X-Profile-Id']).user)
+
+    @override_settings(PROFILING_TOKEN='')
+    def test_header_is_ignored_without_a_configured_token(self):
+        response = authenticated_client(self.staff).get('/api/items/', HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_off_by_default(self):
+        with override_settings(PROFILING_ENABLED=False):
+            response = authenticated_client(self.staff).get('/api/items/', HTTP_X_PROFILE='profile-secret')
+        self.assertNotIn('X-Profile-Id', response)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_KEEP=2)
+    def test_sampling_keeps_newest_profiles(self):
+        client = authenticated_client(self.member)
+        for _ in range(3):
+            client.get('/api/items/')
+        self.assertEqual(RequestProfile.objects.count(), 2)
+        self.assertEqual(len(os.listdir(self.profile_dir)), 2)
+        self.assertFalse(RequestProfile.objects.filter(user__isnull=False).exists())
+
+    def test_admin_lists_and_downloads_profiles(self):
+        profile_id = authenticated_client(self.staff).get('/api/items/', HTTP_X_PROFILE='profile-secret')['X-Profile-Id']
+        self.client.force_login(self.staff)
+
+        listing = self.client.get('/admin/admin_panel/requestprofile/')
+        self.assertContains(listing, '/api/items/')
+
+        download = self.client.get(f'/admin/admin_panel/requestprofile/{profile_id}/download/')
+        self.assertEqual(download.status_code, 200)
+        with open(RequestProfile.objects.get(pk=profile_id).file_path, 'rb') as f:
+            self.assertEqual(b''.join(download.streaming_content), f.read())
+
+
+class PooledViewProfilingTests(TransactionTestCase):
+    """
+    With SYNC_VIEW_THREADS the view runs on a pool thread while the
+    request's profiler is still enabled in the middleware's thread. From
+    Python 3.12 cProfile is process-wide and two can't be enabled at once.
+    """
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(
+            PROFILING_ENABLED=True, PROFILING_TOKEN='profile-secret', PROFILING_DIR=self.profile_dir
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.staff = User.objects.create_superuser(username='staff', email='staff@example.com', password='pass12345')
+
+    def get(self, path, headers):
+        handler = handlers.PooledASGIHandler(threads=2, queue_limit=0)
+        self.addCleanup(handler.pool.executor.shutdown)
+
+        async def get():
+            communicator = ApplicationCommunicator(handler, {
+                'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+                'headers': [(b'host', b'testserver'), *headers], 'server': ('testserver', 80),
+            })
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(5)
+            await communicator.receive_output(5)
+            return start['status'], {name.lower(): value for name, value in start['headers']}
+
+        return asyncio.run(get())
+
+    def test_view_on_a_pool_thread_is_profiled(self):
+        status, headers = self.get('/api/users/dashboard/', [
+            (b'authorization', bearer(self.staff).encode()), (b'x-profile', b'profile-secret'),
+        ])
+        self.assertEqual(status, 200)
+        profile = RequestProfile.objects.get(pk=int(headers[b'x-profile-id']))
+        self.assertIn('dashboard', profile.summary)
+        self.assertEqual(profile.user, self.staff)
+
+    @skipUnless(profiling.PROCESS_WIDE, 'cProfile is per thread before Python 3.12')
+    def test_request_is_served_when_another_profiler_is_active(self):
+        other = cProfile.Profile()
+        other.enable()
+        try:
+            with self.assertLogs('rewear.profiling', 'WARNING'):
+                status, headers = self.get('/api/users/dashboard/', [
+                    (b'authorization', bearer(self.staff).encode()), (b'x-profile', b'profile-secret'),
+                ])
+        finally:
+            other.disable()
+        self.assertEqual(status, 200)
+        self.assertNotIn(b'x-profile-id', headers)
+        self.assertFalse(RequestProfile.objects.exists())
+
+
+class SlowQueryCaptureTests(TransactionTestCase):
+    """Statements over SLOW_QUERY_MS are stored with their view, code line and plan"""
+
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir)
+        settings_override = override_settings(
+            SLOW_QUERY_MS=0.000001,  # everything
+            SLOW_QUERY_LOG=os.path.join(self.log_dir, 'slow-{pid}.log'),
+            SLOW_QUERY_KEEP=1000,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        make_item(self.owner, title='Denim jacket')
+
+        connection = connections['default']
+        slow_queries.install(connection=connection)
+        self.addCleanup(slow_queries.recorder.drain)
+        self.addCleanup(connection.execute_wrappers.remove, slow_queries.record_slow_query)
+
+    def test_search_queries_are_recorded_with_plan(self):
+        response = authenticated_client(self.owner).get('/api/items/search/?q=denim')
+        self.assertEqual(response.status_code, 200)
+        slow_queries.recorder.drain()
+
+        recorded = SlowQuery.objects.filter(endpoint='item-advanced-search', sql__contains='LIKE')
+        self.assertTrue(recorded.exists())
+        query = recorded.first()
+        self.assertEqual(query.method, 'GET')
+        self.assertEqual(query.path, '/api/items/search/')
+        self.assertIn('items_item', query.plan)
+
+        log_file = os.path.join(self.log_dir, f'slow-{os.getpid()}.log')
+        with open(log_file) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertIn(query.fingerprint, {line['fingerprint'] for line in lines})
+
+    def test_sync_view_queries_point_at_the_code(self):
+        authenticated_client(self.owner).get('/api/swaps/')
+        slow_queries.recorder.drain()
+        sources = set(SlowQuery.objects.filter(endpoint='swap-list').values_list('source', flat=True))
+        self.assertTrue(any(source.startswith('swaps/') for source in sources), sources)
+
+    def test_plan_literals_are_redacted(self):
+        plan = '\n'.join((
+            'Index Scan using items_item_owner_id on items_item  (cost=0.15..8.17 rows=1 width=1172)',
+            "  Index Cond: (owner_id = 42)",
+            "  Filter: (((title)::text ~~* '%it''s denim%'::text) AND (point_value > -1.5))",
+            '  Hash Cond: (items_itemimage.item_id = items_item_2.id)',
+        ))
+        redacted = slow_queries.redact_plan(plan)
+        self.assertNotIn('42', redacted)
+        self.assertNotIn('denim', redacted)
+        self.assertNotIn('1.5', redacted)
+        self.assertIn("Filter: (((title)::text ~~* '?'::text) AND (point_value > ?))", redacted)
+        # costs, estimates and names stay
+        self.assertIn('(cost=0.15..8.17 rows=1 width=1172)', redacted)
+        self.assertIn('(items_itemimage.item_id = items_item_2.id)', redacted)
+
+    def test_fingerprint_ignores_in_list_length(self):
+        self.assertEqual(
+            slow_queries.fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s)'),
+            slow_queries.fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'),
+        )
+
+    @override_settings(SLOW_QUERY_KEEP=3)
+    def test_keeps_newest(self):
+        for _ in range(5):
+            User.objects.count()
+        slow_queries.recorder.drain()
+        self.assertEqual(SlowQuery.objects.count(), 3)
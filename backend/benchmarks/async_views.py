@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+📊 Read views under ASGI: sync vs pooled sync vs async
+
+Drives rewear.asgi:application in-process (no network, no server) with
+concurrent requests against the hot read endpoints in three modes and
+reports throughput and latency at each concurrency level:
+
+- sync    ASYNC_READ_VIEWS=False, SYNC_VIEW_THREADS=0 (Django default,
+          a new thread for every request)
+- pooled  ASYNC_READ_VIEWS=False, SYNC_VIEW_THREADS=--threads
+          (rewear/handlers.py)
+- async   ASYNC_READ_VIEWS=True (items/async_views.py, users/async_views.py)
+
+Every mode runs in a fresh subprocess so routing and the handler follow
+the settings.
+
+--db-latency-ms adds a sleep to every SQL query to stand in for a remote
+database; use it to see how each mode behaves when requests spend most
+of their time waiting on the database.
+
+Usage:
+    python manage.py create_sample_items --count=50   # if the DB is empty
+    python benchmarks/async_views.py --requests 400 --concurrency 1 10 50
+    python benchmarks/async_views.py --db-latency-ms 2 --threads 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_mode(args):
+    """Child process: benchmark the endpoints in the mode set through the environment"""
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rewear.settings')
+
+    from rewear.asgi import application  # runs django.setup()
+    from rewear import stats
+
+    from django.db.backends.signals import connection_created
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from items.models import Item
+    from users.models import User
+
+    if args.db_latency_ms:
+        delay = args.db_latency_ms / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            # fires again on every reconnect of the same connection object
+            if slow_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_query)
+
+        connection_created.connect(add_latency, weak=False)
+
+    user = User.objects.order_by('id').first()
+    item = Item.objects.filter(is_approved=True, status='available').order_by('id').first()
+    if user is None or item is None:
+        print(json.dumps({'error': 'no users/items - run create_sample_items first'}))
+        return 1
+    token = str(RefreshToken.for_user(user).access_token)
+
+    endpoints = [
+        ('list', '/api/items/', 'page_size=50'),
+        ('search', '/api/items/search/', 'q=a&sort=popular'),
+        ('featured', '/api/items/featured/', 'limit=20'),
+        ('detail', f'/api/items/{item.id}/', ''),
+        ('me', '/api/users/me/', ''),
+    ]
+    headers = [
+        (b'host', b'testserver'),
+        (b'authorization', f'Bearer {token}'.encode()),  # bypasses the anonymous cache
+        (b'accept', b'application/json'),
+    ]
+
+    async def request(path, query):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '', 'headers': headers,
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        }
+        body_sent = False
+        status = None
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()  # the client never disconnects
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        started = time.perf_counter()
+        await application(scope, receive, send)
+        if status != 200:
+            raise RuntimeError(f'{path}?{query} answered {status}')
+        return time.perf_counter() - started
+
+    async def load(path, query, concurrency, total):
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with gate:
+                return await request(path, query)
+
+        await request(path, query)  # warm up
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            'rps': total / elapsed,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        }
+
+    async def main():
+        results = {}
+        for name, path, query in endpoints:
+            for concurrency in args.concurrency:
+                results[f'{name}@{concurrency}'] = await load(path, query, concurrency, args.requests)
+        return results
+
+    results = asyncio.run(main())
+    results['stats'] = stats.collect()
+    print(json.dumps(results))
+    return 0
+
+
+MODES = {
+    'sync': {'ASYNC_READ_VIEWS': 'False', 'SYNC_VIEW_THREADS': '0'},
+    'pooled': {'ASYNC_READ_VIEWS': 'False'},
+    'async': {'ASYNC_READ_VIEWS': 'True', 'SYNC_VIEW_THREADS': '0'},
+}
+
+
+def spawn(mode, args):
+    env = dict(os.environ, SYNC_VIEW_THREADS=str(args.threads), SYNC_VIEW_QUEUE_LIMIT='0')
+    env.update(MODES[mode])
+    command = [
+        sys.executable, os.path.abspath(__file__), '--child',
+        '--requests', str(args.requests), '--db-latency-ms', str(args.db_latency_ms),
+        '--concurrency', *map(str, args.concurrency),
+    ]
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    results = json.loads(output.strip().splitlines()[-1])
+    if 'error' in results:
+        raise SystemExit(results['error'])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--db-latency-ms', type=float, default=0)
+    parser.add_argument('--threads', type=int, default=8, help='SYNC_VIEW_THREADS for the pooled mode')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return run_mode(args)
+
+    results = {mode: spawn(mode, args) for mode in MODES}
+    pool = results['pooled'].pop('stats').get('sync_view_pool', {})
+    for mode in MODES:
+        results[mode].pop('stats', None)
+
+    print(f'{args.requests} requests per row, simulated DB latency {args.db_latency_ms} ms/query, '
+          f'{args.threads} pool threads')
+    print(f'  {"endpoint@conc":<16} {"sync rps":>9} {"pooled":>15} {"async":>15}'
+          f' {"sync p95":>10} {"pooled p95":>11} {"async p95":>10}')
+    for key, sync in results['sync'].items():
+        pooled, fast = results['pooled'][key], results['async'][key]
+        print(f'  {key:<16} {sync["rps"]:>9.0f}'
+              f' {pooled["rps"]:>7.0f} ({pooled["rps"] / sync["rps"]:>4.2f}x)'
+              f' {fast["rps"]:>7.0f} ({fast["rps"] / sync["rps"]:>4.2f}x)'
+              f' {sync["p95_ms"]:>8.1f}ms {pooled["p95_ms"]:>9.1f}ms {fast["p95_ms"]:>8.1f}ms')
+    if pool:
+        print(f'  pool: peak {pool["peak_waiting"]} waiting, avg wait {pool["avg_wait_ms"]} ms, '
+              f'{pool["completed"]} requests')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
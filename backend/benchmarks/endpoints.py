@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+📊 Hot endpoint benchmark
+
+Drives the hot API endpoints in-process through the Django test client
+(no server, no network) against the configured database and reports,
+per endpoint: p50/p95 latency, queries per request and memory allocated
+per request.
+
+- reads: list, search, featured, detail, the dashboards
+- writes: like, swap create/accept/complete, redeem
+
+Every write iteration runs in a transaction that is rolled back, so
+each iteration starts from the same state and a run leaves the dataset
+as it found it (apart from view_count, which detail still bumps). The
+state a write needs (a pending swap to accept, enough points to redeem,
+...) is set up inside that transaction but outside the timed request.
+Because of that transaction the writes' own atomic blocks become
+savepoints and nothing is committed: compare write numbers between
+runs, not with production.
+
+Allocations are measured in separate rounds with tracemalloc on (it
+slows everything down): the peak traced memory of a request above what
+was allocated before it.
+
+Results are written as JSON (--output). --compare BASELINE.json prints
+the change per endpoint and exits with status 1 when one regressed:
+more queries, p50 latency or allocations up by more than --threshold, or
+p95 up by more than twice that (tails are noisier).
+
+Usage:
+    python manage.py generate_dataset --users 2000 --items 100000   # on an empty DB
+    python benchmarks/endpoints.py --output before.json
+    python benchmarks/endpoints.py --output after.json --compare before.json
+    python benchmarks/endpoints.py --only list detail --rounds 200
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rewear.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, connections, transaction  # noqa: E402
+from django.db.models import Count, F  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from items.models import Item  # noqa: E402
+from rewear.testing import authenticated_client  # noqa: E402
+from swaps.models import SwapRequest  # noqa: E402
+from users.models import User  # noqa: E402
+
+
+class Endpoint:
+    """
+    One benchmarked request. `prepare()` returns (client, method, path, data)
+    and for writes runs inside the rolled-back transaction.
+    """
+
+    def __init__(self, name, prepare, write=False):
+        self.name = name
+        self.prepare = prepare
+        self.write = write
+
+
+class Actors:
+    """The users and items the endpoints are exercised with"""
+
+    def __init__(self):
+        available = Item.objects.filter(is_approved=True, status='available')
+        owners = list(
+            available.values_list('owner', flat=True).annotate(n=Count('id')).order_by('-n', 'owner')[:2]
+        )
+        if len(owners) < 2:
+            raise SystemExit('Need at least two users with available items - run generate_dataset first')
+        self.seller = User.objects.get(pk=owners[0])
+        self.buyer = User.objects.get(pk=owners[1])
+
+        # the seller's most liked listing and one of the buyer's to offer for it
+        self.wanted = available.filter(owner=self.seller).order_by('-like_count', 'id').first()
+        self.offered = available.filter(owner=self.buyer).order_by('id').first()
+        self.seller_client = authenticated_client(self.seller)
+        self.buyer_client = authenticated_client(self.buyer)
+
+    def swap(self, status):
+        swap = SwapRequest.objects.create(
+            requester=self.buyer, requested_item=self.wanted, offered_item=self.offered, status=status
+        )
+        if status == 'accepted':
+            Item.objects.filter(pk__in=[self.wanted.pk, self.offered.pk]).update(status='pending')
+        return swap
+
+
+def endpoints(actors):
+    buyer, seller = actors.buyer_client, actors.seller_client
+    wanted, offered = actors.wanted, actors.offered
+
+    def swap_create():
+        # the dataset may already hold this exact request
+        SwapRequest.objects.filter(
+            requester=actors.buyer, requested_item=wanted, offered_item=offered
+        ).delete()
+        return buyer, 'post', '/api/swaps/', {'requested_item': wanted.pk, 'offered_item': offered.pk}
+
+    def swap_accept():
+        SwapRequest.objects.filter(requester=actors.buyer, requested_item=wanted, offered_item=offered).delete()
+        return seller, 'post', f'/api/swaps/{actors.swap("pending").pk}/accept/', None
+
+    def swap_complete():
+        SwapRequest.objects.filter(requester=actors.buyer, requested_item=wanted, offered_item=offered).delete()
+        return seller, 'post', f'/api/swaps/{actors.swap("accepted").pk}/complete/', None
+
+    def redeem():
+        User.objects.filter(pk=actors.buyer.pk).update(points=F('points') + wanted.point_value)
+        return buyer, 'post', '/api/swaps/redeem/', {'item_id': wanted.pk}
+
+    return [
+        Endpoint('list', lambda: (buyer, 'get', '/api/items/?page_size=20', None)),
+        Endpoint('search', lambda: (buyer, 'get', '/api/items/search/?q=vintage&sort=popular', None)),
+        Endpoint('featured', lambda: (buyer, 'get', '/api/items/featured/', None)),
+        Endpoint('detail', lambda: (buyer, 'get', f'/api/items/{wanted.pk}/', None)),
+        Endpoint('like', lambda: (buyer, 'post', f'/api/items/{wanted.pk}/like/', None), write=True),
+        Endpoint('swap_create', swap_create, write=True),
+        Endpoint('swap_accept', swap_accept, write=True),
+        Endpoint('swap_complete', swap_complete, write=True),
+        Endpoint('redeem', redeem, write=True),
+        Endpoint('dashboard', lambda: (seller, 'get', '/api/users/dashboard/', None)),
+        Endpoint('complete_dashboard', lambda: (seller, 'get', '/api/users/complete_dashboard/', None)),
+        Endpoint('my_activity', lambda: (seller, 'get', '/api/users/my_activity/', None)),
+        Endpoint('my_swaps', lambda: (seller, 'get', '/api/users/my_swaps/', None)),
+        Endpoint('liked_items', lambda: (buyer, 'get', '/api/users/liked_items/', None)),
+    ]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def call(endpoint):
+    """Run one request; returns (status, seconds, queries, allocated bytes or None)"""
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        if endpoint.write:
+            stack.enter_context(transaction.atomic())
+        client, method, path, data = endpoint.prepare()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        if method == 'get':
+            response = client.get(path)
+        else:
+            response = client.post(path, data, format='json')
+        elapsed = time.perf_counter() - started
+        allocated = tracemalloc.get_traced_memory()[1] - baseline if tracing else None
+
+        if endpoint.write:
+            transaction.set_rollback(True)
+    if response.status_code >= 400:
+        raise SystemExit(f'{endpoint.name}: {method.upper()} {path} answered {response.status_code}: '
+                         f'{response.content[:300]!r}')
+    return response.status_code, elapsed, counter.count, allocated
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+def measure(endpoint, args):
+    for _ in range(args.warmup):
+        call(endpoint)
+
+    latencies, queries = [], []
+    # like timeit: a collection landing in one request would only add noise
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(args.rounds):
+            status, elapsed, count, _ = call(endpoint)
+            latencies.append(elapsed * 1000)
+            queries.append(count)
+    finally:
+        gc.enable()
+
+    allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(args.alloc_rounds):
+            allocations.append(call(endpoint)[3])
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': status,
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries': max(queries),
+        'alloc_kib': round(statistics.median(allocations) / 1024, 1) if allocations else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, args):
+    """Print the change per endpoint; returns the names of the endpoints that regressed"""
+    if baseline['meta'].get('items') != results['meta']['items']:
+        print(f'⚠️  Baseline was taken on {baseline["meta"].get("items")} items, '
+              f'this run on {results["meta"]["items"]}')
+
+    regressed = []
+    print(f'\nCompared with {args.compare} ({baseline["meta"].get("git") or "unknown revision"}):')
+    print(f'  {"endpoint":<20} {"p50":>18} {"p95":>18} {"queries":>9} {"alloc KiB":>19}')
+    for name, now in results['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None:
+            print(f'  {name:<20} (not in baseline)')
+            continue
+
+        flags = []
+        for key, threshold in (('p50_ms', args.threshold), ('p95_ms', 2 * args.threshold)):
+            if now[key] > before[key] * (1 + threshold) and now[key] - before[key] > args.min_ms:
+                flags.append(key)
+        if now['queries'] > before['queries']:
+            flags.append('queries')
+        if (now['alloc_kib'] is not None and before.get('alloc_kib')
+                and now['alloc_kib'] > before['alloc_kib'] * (1 + args.threshold)):
+            flags.append('alloc_kib')
+        if flags:
+            regressed.append(name)
+
+        def change(key, unit=''):
+            if now.get(key) is None or not before.get(key):
+                return '-'
+            return f'{now[key]:.1f}{unit} ({(now[key] / before[key] - 1) * 100:+.0f}%)'
+
+        print(f'  {name:<20} {change("p50_ms", "ms"):>18} {change("p95_ms", "ms"):>18}'
+              f' {before["queries"]:>3} → {now["queries"]:<3} {change("alloc_kib"):>19}'
+              f'{"  ❌ " + ", ".join(flags) if flags else ""}')
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per endpoint first')
+    parser.add_argument('--alloc-rounds', type=int, default=5, help='requests per endpoint under tracemalloc')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='benchmark only these endpoints')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON file of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative p50/allocation growth counted as a regression (default 0.25)')
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help='ignore latency changes smaller than this many milliseconds (default 1.0)')
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error('--rounds must be at least 1')
+
+    # the benchmark reports queries itself; don't log every request over its budget
+    logging.getLogger('rewear.requests').setLevel(logging.ERROR)
+
+    actors = Actors()
+    selected = endpoints(actors)
+    if args.only:
+        unknown = set(args.only) - {endpoint.name for endpoint in selected}
+        if unknown:
+            parser.error(f'unknown endpoints: {", ".join(sorted(unknown))}')
+        selected = [endpoint for endpoint in selected if endpoint.name in args.only]
+
+    results = {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'git': git_revision(),
+            'database': connection.vendor,
+            'items': Item.objects.count(),
+            'rounds': args.rounds,
+            'alloc_rounds': args.alloc_rounds,
+            'async_read_views': settings.ASYNC_READ_VIEWS,
+        },
+        'endpoints': {},
+    }
+
+    print(f'{args.rounds} requests per endpoint on {results["meta"]["items"]} items ({connection.vendor})')
+    print(f'  {"endpoint":<20} {"p50":>9} {"p95":>9} {"queries":>8} {"alloc KiB":>10}')
+    for endpoint in selected:
+        result = measure(endpoint, args)
+        results['endpoints'][endpoint.name] = result
+        print(f'  {endpoint.name:<20} {result["p50_ms"]:>7.2f}ms {result["p95_ms"]:>7.2f}ms'
+              f' {result["queries"]:>8} {result["alloc_kib"] or 0:>10.1f}')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f'Results written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressed = compare(results, baseline, args)
+        if regressed:
+            print(f'❌ Regressions: {", ".join(regressed)}')
+            return 1
+        print('✅ No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
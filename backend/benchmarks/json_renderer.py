@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+📊 JSON renderer benchmark
+
+Compares DRF's stock JSONRenderer with rewear.renderers.ORJSONRenderer on
+real ItemListSerializer pages (nested owner, tags_list, ...) taken from the
+configured database, and checks both produce identical bytes.
+
+Usage:
+    python manage.py create_sample_items --count=50   # if the DB is empty
+    python benchmarks/json_renderer.py --page-size 50 --rounds 2000
+"""
+
+import argparse
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rewear.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from items.models import Item  # noqa: E402
+from items.serializers import ItemListSerializer  # noqa: E402
+from rewear.parsers import ORJSONParser  # noqa: E402
+from rewear.renderers import ORJSONRenderer  # noqa: E402
+
+
+def build_payload(page_size):
+    """Serialize one page exactly like the list endpoint does"""
+    request = RequestFactory().get('/api/items/')
+    request.user = AnonymousUser()
+    items = Item.objects.select_related('owner').prefetch_related('images')[:page_size]
+    data = ItemListSerializer(items, many=True, context={'request': request}).data
+    return {
+        'results': data,
+        'pagination': {
+            'count': len(data), 'next': None, 'previous': None,
+            'current_page': 1, 'total_pages': 1, 'page_size': page_size
+        }
+    }
+
+
+def bench(label, func, rounds):
+    seconds = min(timeit.repeat(func, number=rounds, repeat=3))
+    per_call = seconds / rounds * 1e6
+    print(f'  {label:<28} {per_call:>10.1f} µs/op')
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=1000)
+    args = parser.parse_args()
+
+    payload = build_payload(args.page_size)
+    count = len(payload['results'])
+    if count < args.page_size:
+        print(f'⚠️  Only {count} items in the database, run create_sample_items for a full page')
+    if not count:
+        return 1
+
+    stock, fast = JSONRenderer(), ORJSONRenderer()
+    stock_bytes = stock.render(payload, 'application/json')
+    fast_bytes = fast.render(payload, 'application/json')
+    assert stock_bytes == fast_bytes, 'ORJSONRenderer output differs from JSONRenderer'
+
+    print(f'Rendering a {count}-item ItemListSerializer page ({len(stock_bytes)} bytes)')
+    stock_time = bench('JSONRenderer', lambda: stock.render(payload, 'application/json'), args.rounds)
+    fast_time = bench('ORJSONRenderer', lambda: fast.render(payload, 'application/json'), args.rounds)
+    print(f'  speedup: {stock_time / fast_time:.1f}x')
+
+    print('Parsing the same document')
+    stock_parser, fast_parser = JSONParser(), ORJSONParser()
+    stock_time = bench('JSONParser', lambda: stock_parser.parse(io.BytesIO(stock_bytes)), args.rounds)
+    fast_time = bench('ORJSONParser', lambda: fast_parser.parse(io.BytesIO(stock_bytes)), args.rounds)
+    print(f'  speedup: {stock_time / fast_time:.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
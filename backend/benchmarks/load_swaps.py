@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+🔥 Concurrent load test for the swap and redemption flows
+
+Runs hundreds of simulated users concurrently against a running server
+and then checks the database for the invariants those flows must keep.
+
+1. Swap flow, for --duration seconds: every simulated user loops through
+   browse (list + detail), like, request a swap, respond to swaps
+   requested from them (accept or reject) and complete accepted swaps.
+   Most requests target a small set of --hot-items, so users compete for
+   the same listings. Both parties of an accepted swap try to complete it.
+2. Redeem races, --races rounds: a group of users redeems the same item
+   at the same instant, or one user redeems two items at once with
+   points for only one of them.
+
+Reported: throughput, latency percentiles and status codes per
+operation, and invariant violations:
+
+- negative points
+- points out of balance: the points of the load users must equal their
+  starting points plus what the successful completes and redeems said
+  they moved (catches lost updates)
+- an item redeemed more than once, or redeemed and also swapped
+- an item in more than one accepted/completed swap
+- a swap completed more than once
+- item status disagreeing with its swaps
+- like_count disagreeing with the likes
+
+Users and items are created directly in the database (usernames
+swapload-<run>-N), so this script must use the same settings, database
+and SECRET_KEY as the server: it mints the JWTs itself. Point it at a
+local PostgreSQL to look for lock contention and races; SQLite works as a
+stand-in but serializes writers, so expect "database is locked" 500s
+there under load.
+
+Usage:
+    python manage.py runserver --noreload      # or gunicorn -c gunicorn.conf.py
+    python benchmarks/load_swaps.py --users 200 --duration 60
+    python benchmarks/load_swaps.py --base-url http://localhost:8000 --races 50 --output load.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rewear.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db.models import Count, F, Q, Sum  # noqa: E402
+from items.models import Item  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+from items.signals import listings_changed  # noqa: E402
+from swaps.models import SwapRequest  # noqa: E402
+from users.models import User  # noqa: E402
+
+ACTIONS = [('browse', 40), ('like', 15), ('request_swap', 20), ('respond', 15), ('complete', 10)]
+
+
+class Recorder:
+    """Latencies and status codes per operation, shared by all threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, operation, status, seconds):
+        with self.lock:
+            self.latencies[operation].append(seconds * 1000)
+            self.statuses[operation][status] += 1
+
+    def summary(self):
+        rows = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            statuses = self.statuses[operation]
+            rows[operation] = {
+                'count': len(latencies),
+                '2xx': sum(n for status, n in statuses.items() if isinstance(status, int) and status < 300),
+                '4xx': sum(n for status, n in statuses.items() if isinstance(status, int) and 400 <= status < 500),
+                '5xx': sum(n for status, n in statuses.items() if isinstance(status, int) and status >= 500),
+                'errors': statuses['error'],
+                'p50_ms': round(statistics.median(latencies), 1),
+                'p95_ms': round(percentile(latencies, 0.95), 1),
+                'p99_ms': round(percentile(latencies, 0.99), 1),
+            }
+        return rows
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+class Outcomes:
+    """What the server claimed to have done, for the invariant checks"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.completed = Counter()   # swap id -> successful completes
+        self.redeemed = Counter()    # item id -> successful redeems
+        self.points_moved = 0        # net points change of all load users
+
+    def complete(self, swap_id):
+        with self.lock:
+            self.completed[swap_id] += 1
+            self.points_moved += 10  # 5 each for both parties
+
+    def redeem(self, item_id, deducted, awarded):
+        with self.lock:
+            self.redeemed[item_id] += 1
+            self.points_moved += awarded - deducted
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        self.recorder = Recorder()
+        self.outcomes = Outcomes()
+        self.lock = threading.Lock()
+        self.inbox = defaultdict(deque)        # owner id -> swap ids requested from them
+        self.to_complete = defaultdict(deque)  # user id -> accepted swap ids they are part of
+
+    # Setup
+
+    def create_users(self, prefix, count, points):
+        # '!' is an unusable password: the script mints their tokens itself
+        return User.objects.bulk_create([
+            User(username=f'{prefix}{n}', email=f'{prefix}{n}@example.com', password='!', points=points)
+            for n in range(count)
+        ])
+
+    def create_items(self, owners, per_owner, rng, prices=(5, 50)):
+        return Item.objects.bulk_create([
+            Item(
+                owner=owner, title=f'Load test item {owner.pk}-{n}', description='Created by load_swaps.py',
+                category='tops', size='M', point_value=rng.randint(*prices),
+            )
+            for owner in owners for n in range(per_owner)
+        ])
+
+    def setup(self):
+        args = self.args
+        rng = random.Random(args.seed)
+        self.run = run = f'swapload-{int(time.time())}-'
+
+        self.users = self.create_users(run, args.users, args.points)
+        self.items = self.create_items(self.users, args.items_per_user, rng)
+        self.items_of = defaultdict(list)
+        for item in self.items:
+            self.items_of[item.owner_id].append(item.pk)
+        self.owner_of = {item.pk: item.owner_id for item in self.items}
+        self.hot = rng.sample([item.pk for item in self.items], min(args.hot_items, len(self.items)))
+
+        # every redeem race round gets its own seller, items and buyers with 60 points:
+        # enough for one of the 30-40 point items, not two
+        self.race_sellers = self.create_users(f'{run}seller-', args.races, 0)
+        self.race_items = self.create_items(self.race_sellers, 2, rng, prices=(30, 40))
+        self.race_buyers = self.create_users(f'{run}buyer-', args.races * args.racers, 60)
+
+        listings_changed()
+        self.load_users = self.users + self.race_sellers + self.race_buyers
+        self.initial_points = self.total_points()
+        self.tokens = {user.pk: str(RefreshToken.for_user(user).access_token) for user in self.load_users}
+        print(f'Created {len(self.load_users)} users and {len(self.items) + len(self.race_items)} items ({run}*)')
+
+    def load_user_queryset(self):
+        return User.objects.filter(username__startswith=self.run)
+
+    def total_points(self):
+        return self.load_user_queryset().aggregate(total=Sum('points'))['total'] or 0
+
+    # HTTP
+
+    def session(self, user):
+        session = requests.Session()
+        session.headers['Authorization'] = f'Bearer {self.tokens[user.pk]}'
+        return session
+
+    def call(self, session, operation, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, self.args.base_url + path, timeout=self.args.timeout, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(operation, 'error', time.perf_counter() - started)
+            return None
+        self.recorder.record(operation, response.status_code, time.perf_counter() - started)
+        return response
+
+    # Phase 1: swap flow
+
+    def simulate(self, user, deadline, seed):
+        rng = random.Random(seed)
+        session = self.session(user)
+        actions, weights = zip(*ACTIONS)
+        while time.monotonic() < deadline:
+            getattr(self, rng.choices(actions, weights)[0])(user, session, rng)
+            if self.args.think_ms:
+                time.sleep(rng.random() * self.args.think_ms / 1000)
+
+    def pick_target(self, user, rng):
+        """Mostly a hot item, never one of the user's own"""
+        for _ in range(5):
+            item_id = rng.choice(self.hot) if rng.random() < 0.8 else rng.choice(self.items).pk
+            if self.owner_of[item_id] != user.pk:
+                return item_id
+        return None
+
+    def browse(self, user, session, rng):
+        self.call(session, 'list', 'GET', f'/api/items/?page={rng.randint(1, 3)}&page_size=20')
+        item_id = self.pick_target(user, rng)
+        if item_id:
+            self.call(session, 'detail', 'GET', f'/api/items/{item_id}/')
+
+    def like(self, user, session, rng):
+        item_id = self.pick_target(user, rng)
+        if item_id:
+            self.call(session, 'like', 'POST', f'/api/items/{item_id}/like/')
+
+    def request_swap(self, user, session, rng):
+        wanted = self.pick_target(user, rng)
+        if not wanted or not self.items_of[user.pk]:
+            return
+        offered = rng.choice(self.items_of[user.pk])
+        response = self.call(session, 'swap_create', 'POST', '/api/swaps/', json={
+            'requested_item': wanted, 'offered_item': offered, 'message': 'Load test swap',
+        })
+        if response is not None and response.status_code == 201:
+            swap_id = response.json().get('id')
+            with self.lock:
+                self.inbox[self.owner_of[wanted]].append((swap_id, user.pk))
+
+    def respond(self, user, session, rng):
+        with self.lock:
+            if not self.inbox[user.pk]:
+                return
+            swap_id, requester = self.inbox[user.pk].popleft()
+        if rng.random() < 0.2:
+            self.call(session, 'swap_reject', 'POST', f'/api/swaps/{swap_id}/reject/')
+            return
+        response = self.call(session, 'swap_accept', 'POST', f'/api/swaps/{swap_id}/accept/')
+        if response is not None and response.status_code == 200:
+            with self.lock:
+                # both parties will try to complete it
+                self.to_complete[user.pk].append(swap_id)
+                self.to_complete[requester].append(swap_id)
+
+    def complete(self, user, session, rng):
+        with self.lock:
+            if not self.to_complete[user.pk]:
+                return
+            swap_id = self.to_complete[user.pk].popleft()
+        response = self.call(session, 'swap_complete', 'POST', f'/api/swaps/{swap_id}/complete/')
+        if response is not None and response.status_code == 200:
+            self.outcomes.complete(swap_id)
+
+    def swap_flow(self):
+        deadline = time.monotonic() + self.args.duration
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.users)) as pool:
+            futures = [
+                pool.submit(self.simulate, user, deadline, self.args.seed * 100003 + n)
+                for n, user in enumerate(self.users)
+            ]
+            for future in futures:
+                future.result()
+        return time.perf_counter() - started
+
+    # Phase 2: redeem races
+
+    def redeem(self, session, item_id, barrier):
+        barrier.wait()
+        response = self.call(session, 'redeem', 'POST', '/api/swaps/redeem/', json={'item_id': item_id})
+        if response is not None and response.status_code == 200:
+            body = response.json()
+            self.outcomes.redeem(item_id, body['points_deducted'], body['points_awarded_to_seller'])
+
+    def redeem_races(self):
+        sessions = {buyer.pk: self.session(buyer) for buyer in self.race_buyers}
+        items_of = defaultdict(list)
+        for item in self.race_items:
+            items_of[item.owner_id].append(item.pk)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.racers) as pool:
+            for n, seller in enumerate(self.race_sellers):
+                first, second = items_of[seller.pk]
+                buyers = self.race_buyers[n * self.args.racers:(n + 1) * self.args.racers]
+                if n % 2 == 0:
+                    # everyone wants the same item
+                    racers = [(sessions[buyer.pk], first) for buyer in buyers]
+                else:
+                    # one buyer redeems both items at once
+                    racers = [(sessions[buyers[0].pk], first), (sessions[buyers[0].pk], second)]
+                barrier = threading.Barrier(len(racers))
+                for future in [pool.submit(self.redeem, session, item_id, barrier) for session, item_id in racers]:
+                    future.result()
+        return time.perf_counter() - started
+
+    # Invariants
+
+    def check(self):
+        violations = {}
+        # items redeemed during the run have new owners, but those are load users too
+        items = Item.objects.filter(owner__username__startswith=self.run)
+
+        negative = list(self.load_user_queryset().filter(points__lt=0).values_list('username', flat=True))
+        if negative:
+            violations['negative_points'] = negative
+
+        expected = self.initial_points + self.outcomes.points_moved
+        actual = self.total_points()
+        if actual != expected:
+            violations['points_out_of_balance'] = {'expected': expected, 'actual': actual}
+
+        redeemed_twice = [item_id for item_id, n in self.outcomes.redeemed.items() if n > 1]
+        if redeemed_twice:
+            violations['redeemed_more_than_once'] = redeemed_twice
+
+        completed_twice = [swap_id for swap_id, n in self.outcomes.completed.items() if n > 1]
+        if completed_twice:
+            violations['swap_completed_more_than_once'] = completed_twice
+
+        live = SwapRequest.objects.filter(status__in=['accepted', 'completed']).filter(
+            Q(requested_item__in=items) | Q(offered_item__in=items)
+        ).values_list('id', 'requested_item', 'offered_item', 'status')
+        swaps_of = defaultdict(list)
+        for swap_id, requested, offered, swap_status in live:
+            swaps_of[requested].append((swap_id, swap_status))
+            swaps_of[offered].append((swap_id, swap_status))
+        double_booked = {item_id: swaps for item_id, swaps in swaps_of.items() if len(swaps) > 1}
+        if double_booked:
+            violations['item_in_several_swaps'] = {str(k): [s for s, _ in v] for k, v in double_booked.items()}
+
+        sold_twice = [item_id for item_id in self.outcomes.redeemed if item_id in swaps_of]
+        if sold_twice:
+            violations['redeemed_and_swapped'] = sold_twice
+
+        statuses = dict(items.values_list('id', 'status'))
+        mismatched = []
+        for item_id, swaps in swaps_of.items():
+            wanted = 'swapped' if any(s == 'completed' for _, s in swaps) else 'pending'
+            if statuses.get(item_id) != wanted:
+                mismatched.append({'item': item_id, 'status': statuses.get(item_id), 'expected': wanted})
+        if mismatched:
+            violations['item_status_mismatch'] = mismatched
+
+        drifted = list(
+            items.annotate(likes_total=Count('likes')).exclude(like_count=F('likes_total'))
+            .values_list('id', flat=True)
+        )
+        if drifted:
+            violations['like_count_drift'] = drifted
+        return violations
+
+
+def print_table(title, elapsed, rows):
+    total = sum(row['count'] for row in rows.values())
+    print(f'\n{title}: {total} requests in {elapsed:.1f}s, {total / elapsed if elapsed else 0:.1f} req/s')
+    print(f'  {"operation":<14} {"count":>7} {"2xx":>6} {"4xx":>6} {"5xx":>5} {"err":>5}'
+          f' {"p50":>8} {"p95":>8} {"p99":>8}')
+    for operation, row in rows.items():
+        print(f'  {operation:<14} {row["count"]:>7} {row["2xx"]:>6} {row["4xx"]:>6} {row["5xx"]:>5}'
+              f' {row["errors"]:>5} {row["p50_ms"]:>6.1f}ms {row["p95_ms"]:>6.1f}ms {row["p99_ms"]:>6.1f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--users', type=int, default=200, help='simulated users in the swap flow')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of swap flow')
+    parser.add_argument('--items-per-user', type=int, default=3)
+    parser.add_argument('--hot-items', type=int, default=20, help='listings most requests compete for')
+    parser.add_argument('--points', type=int, default=100, help='starting points of swap flow users')
+    parser.add_argument('--think-ms', type=float, default=50, help='max random pause between actions')
+    parser.add_argument('--races', type=int, default=20, help='redeem race rounds')
+    parser.add_argument('--racers', type=int, default=10, help='users per same-item redeem race')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the report to this JSON file')
+    args = parser.parse_args()
+    if args.users < 2 or args.racers < 2:
+        parser.error('--users and --racers must be at least 2')
+
+    try:
+        requests.get(args.base_url + '/', timeout=5)
+    except requests.RequestException as exc:
+        raise SystemExit(f'No server at {args.base_url}: {exc}')
+
+    harness = Harness(args)
+    harness.setup()
+
+    print(f'Swap flow: {args.users} users for {args.duration:.0f}s ...')
+    flow_seconds = harness.swap_flow()
+    flow = harness.recorder.summary()
+    harness.recorder = Recorder()
+
+    print(f'Redeem races: {args.races} rounds ...')
+    race_seconds = harness.redeem_races() if args.races else 0
+    races = harness.recorder.summary()
+
+    print_table('Swap flow', flow_seconds, flow)
+    if races:
+        print_table('Redeem races', race_seconds, races)
+
+    violations = harness.check()
+    print('\nInvariants:')
+    if violations:
+        for name, details in violations.items():
+            count = len(details) if isinstance(details, (list, dict)) and name != 'points_out_of_balance' else ''
+            print(f'  ❌ {name} {count}: {json.dumps(details)[:200]}')
+    else:
+        print('  ✅ no violations')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'args': vars(args),
+                'swap_flow': {'seconds': round(flow_seconds, 2), 'operations': flow},
+                'redeem_races': {'seconds': round(race_seconds, 2), 'operations': races},
+                'violations': violations,
+            }, f, indent=2)
+            f.write('\n')
+        print(f'Report written to {args.output}')
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
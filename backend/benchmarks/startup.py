@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+⏱️ Startup benchmark with an import-time budget
+
+Measures what a cold start or a recycled worker costs, each in fresh
+interpreters so nothing is cached in-process:
+
+- boot: django.setup() plus loading the URLconf (what gunicorn's master
+  does before forking, and every worker without preload_app), median of
+  --runs
+- import profile: one more boot under `python -X importtime`, summed up
+  as self time per top-level package and the slowest imports by
+  cumulative time
+- lazy modules: modules that must not be imported at boot
+  (drf_yasg.views by default, see rewear/schema.py); one that is counts
+  as a violation
+- time to first response: from spawning uvicorn with rewear.asgi to the
+  first 200 from GET /, median of --runs
+
+With --boot-budget-ms / --ttfr-budget-ms the run exits with status 1 when
+a median is over budget or a lazy module was imported, so it can gate CI.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --boot-budget-ms 900 --ttfr-budget-ms 2500 --output startup.json
+    python benchmarks/startup.py --skip-server --top 40
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_MODULES = ('drf_yasg.views',)
+
+BOOT = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+done = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - started) * 1000,
+    'urlconf_ms': (done - setup) * 1000,
+    'boot_ms': (done - started) * 1000,
+    'modules': len(sys.modules),
+    'imported_lazy': [name for name in sys.argv[1:] if name in sys.modules],
+}))
+"""
+
+
+def environment():
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'rewear.settings')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [BACKEND, env.get('PYTHONPATH')]))
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    return env
+
+
+def boot(lazy_modules, importtime=False):
+    """One boot in a fresh interpreter: (timings, -X importtime output)"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', BOOT, *lazy_modules]
+    result = subprocess.run(command, cwd=BACKEND, env=environment(), capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(f'Boot failed:\n{result.stderr}')
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(output):
+    """[(module, self_us, cumulative_us)] from `-X importtime` lines"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def import_profile(imports, top):
+    by_package = defaultdict(int)
+    for name, self_us, _ in imports:
+        by_package[name.split('.')[0]] += self_us
+    packages = sorted(by_package.items(), key=lambda entry: -entry[1])[:top]
+    slowest = sorted(imports, key=lambda entry: -entry[2])[:top]
+    return {
+        'total_ms': round(sum(self_us for _, self_us, _ in imports) / 1000, 1),
+        'modules': len(imports),
+        'packages_ms': {name: round(self_us / 1000, 1) for name, self_us in packages},
+        'cumulative_ms': {name: round(cumulative_us / 1000, 1) for name, _, cumulative_us in slowest},
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def first_response(timeout):
+    """Seconds from spawning uvicorn until GET / answers 200"""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/'
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'rewear.asgi:application',
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND, env=environment(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise SystemExit(f'Server exited:\n{server.stderr.read()}')
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.005)
+        raise SystemExit(f'No response from {url} within {timeout}s')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='boots and server starts to take the median of')
+    parser.add_argument('--top', type=int, default=15, help='packages and imports listed in the profile')
+    parser.add_argument('--lazy', nargs='*', default=list(LAZY_MODULES), metavar='MODULE',
+                        help=f'modules that must not be imported at boot (default: {" ".join(LAZY_MODULES)})')
+    parser.add_argument('--boot-budget-ms', type=float, help='fail when the median boot takes longer')
+    parser.add_argument('--ttfr-budget-ms', type=float, help='fail when the median time to first response is longer')
+    parser.add_argument('--skip-server', action='store_true', help="don't measure time to first response")
+    parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for the server to answer')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error('--runs must be at least 1')
+
+    boots = [boot(args.lazy)[0] for _ in range(args.runs)]
+    _, importtime = boot(args.lazy, importtime=True)
+    profile = import_profile(parse_importtime(importtime), args.top)
+    imported_lazy = sorted({name for run in boots for name in run['imported_lazy']})
+
+    results = {
+        'meta': {
+            'git': git_revision(),
+            'python': sys.version.split()[0],
+            'settings': environment()['DJANGO_SETTINGS_MODULE'],
+            'runs': args.runs,
+        },
+        'boot': {
+            key: round(statistics.median(run[key] for run in boots), 1)
+            for key in ('setup_ms', 'urlconf_ms', 'boot_ms')
+        },
+        'modules': boots[0]['modules'],
+        'imported_lazy': imported_lazy,
+        'import_profile': profile,
+        'first_response_ms': None,
+    }
+
+    print(f'Boot (median of {args.runs}): {results["boot"]["boot_ms"]:.0f}ms'
+          f' = django.setup() {results["boot"]["setup_ms"]:.0f}ms'
+          f' + URLconf {results["boot"]["urlconf_ms"]:.0f}ms, {results["modules"]} modules')
+    print(f'\nSelf import time per package (-X importtime, {profile["total_ms"]:.0f}ms in total):')
+    for name, ms in profile['packages_ms'].items():
+        print(f'  {name:<40} {ms:>8.1f}ms')
+    print('\nSlowest imports, cumulative:')
+    for name, ms in profile['cumulative_ms'].items():
+        print(f'  {name:<40} {ms:>8.1f}ms')
+
+    if not args.skip_server:
+        starts = [first_response(args.timeout) * 1000 for _ in range(args.runs)]
+        results['first_response_ms'] = round(statistics.median(starts), 1)
+        print(f'\nTime to first response (median of {args.runs}): {results["first_response_ms"]:.0f}ms')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f'Results written to {args.output}')
+
+    violations = []
+    if imported_lazy:
+        violations.append(f'imported at boot: {", ".join(imported_lazy)}')
+    if args.boot_budget_ms is not None and results['boot']['boot_ms'] > args.boot_budget_ms:
+        violations.append(f'boot {results["boot"]["boot_ms"]:.0f}ms > {args.boot_budget_ms:.0f}ms')
+    first = results['first_response_ms']
+    if args.ttfr_budget_ms is not None and first is not None and first > args.ttfr_budget_ms:
+        violations.append(f'first response {first:.0f}ms > {args.ttfr_budget_ms:.0f}ms')
+    if violations:
+        print(f'\n❌ Over budget: {"; ".join(violations)}')
+        return 1
+    print('\n✅ Within budget')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Production server: gunicorn pre-forking uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py
+
+The master imports Django once (preload_app), warms it up
+(rewear/warmup.py) and forks WEB_CONCURRENCY workers that share those
+pages copy-on-write. Workers are recycled after roughly
+GUNICORN_MAX_REQUESTS requests, staggered by the jitter so they don't
+all restart together. On SIGTERM workers stop accepting connections and
+get GUNICORN_GRACEFUL_TIMEOUT seconds to finish in-flight requests.
+
+Each worker is a full ASGI process, so SYNC_VIEW_THREADS and
+CONN_MAX_AGE apply per worker: the database sees up to
+workers x threads connections.
+
+Prometheus metrics (rewear/metrics.py) are aggregated over the workers
+through files in PROMETHEUS_MULTIPROC_DIR. It has to exist before
+prometheus_client is imported (preload_app), so it is set up here; the
+master empties it on start so counters of a previous run don't leak in.
+"""
+
+import os
+import shutil
+import tempfile
+
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'rewear-prometheus')
+)
+os.makedirs(metrics_dir, exist_ok=True)
+
+
+def default_workers():
+    # the CPUs this process may run on, not every core of the host
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+wsgi_app = 'rewear.asgi:application'
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.getenv('WEB_CONCURRENCY', default_workers()))
+preload_app = True
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '500'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = '-'
+errorlog = '-'
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+
+def on_starting(server):
+    # the preloaded master never serves requests, its files can go too
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def when_ready(server):
+    # with preload_app the application is imported by now and no worker exists yet
+    from django.db import DatabaseError
+    from rewear.readiness import state
+    from rewear.warmup import prepare_fork, warm_up
+
+    seconds = warm_up()
+    # migrations are the release step's job (start.sh release); just report
+    try:
+        if not state.check_migrations():
+            server.log.warning('Unapplied migrations, /readyz answers 503 until they are: %s',
+                               ', '.join(state.pending))
+    except DatabaseError as exc:
+        server.log.warning('Could not check migrations: %s', exc)
+    prepare_fork()
+    server.log.info('Warmed up in %.0f ms, forking %s workers', seconds * 1000, server.num_workers)
+
+
+def pre_fork(server, worker):
+    # also covers workers forked later to replace recycled ones
+    from rewear.warmup import close_connections
+
+    close_connections()
+
+
+def child_exit(server, worker):
+    # counters of the exited worker stay in the totals, its live gauges go
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin, TabularInline
 from .models import Item, ItemImage, ItemLike, PlatformConfig, ItemReport
+from .signals import listings_changed
 from unfold.decorators import action , display
 
 class ItemImageInline(TabularInline):
@@ -104,18 +105,21 @@ class ItemAdmin(ModelAdmin):
     def approve_items(self, request, queryset):
         """Bulk approve selected items"""
         updated = queryset.update(is_approved=True, rejection_reason='')
+        listings_changed()
         self.message_user(request, f'{updated} items were approved.')
     approve_items.short_description = "Approve selected items"
 
     def feature_items(self, request, queryset):
         """Bulk feature selected items"""
         updated = queryset.filter(is_approved=True).update(is_featured=True)
+        listings_changed()
         self.message_user(request, f'{updated} items were featured.')
     feature_items.short_description = "Feature selected items"
 
     def unfeature_items(self, request, queryset):
         """Bulk unfeature selected items"""
         updated = queryset.update(is_featured=False)
+        listings_changed()
         self.message_user(request, f'{updated} items were unfeatured.')
     unfeature_items.short_description = "Remove featured status"
     
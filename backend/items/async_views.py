@@ -0,0 +1,108 @@
+"""
+⚡ Native async item read endpoints (ASYNC_READ_VIEWS)
+
+Async versions of ItemViewSet.list / retrieve / featured /
+advanced_search. Query building, conditional GET, sparse fieldsets and
+the projection all come from ItemViewSet, so the output is identical;
+only the evaluation goes through the async ORM. Writes on the same URLs
+are handed to the DRF viewset (see rewear/async_api.py).
+"""
+
+from django.db.models import F
+from django.http import Http404
+from rewear.async_api import async_read_view, json_response, read_view
+from rewear.conditional import not_modified, set_validators
+from .models import Item, PlatformConfig
+from .serializers import ItemDetailSerializer
+from .views import ItemViewSet
+
+
+async def list_items(request, user):
+    """📋 GET /api/items/"""
+    view = read_view(ItemViewSet, request, user, 'list')
+    queryset = view.filter_queryset(view.get_queryset())
+    return await view.alist_response(queryset)
+
+
+async def search_items(request, user):
+    """🔍 GET /api/items/search/"""
+    view = read_view(ItemViewSet, request, user, 'advanced_search')
+    queryset = view.search_queryset(view.get_queryset())
+    return await view.alist_response(queryset)
+
+
+async def featured_items(request, user):
+    """⭐ GET /api/items/featured/?limit=6"""
+    view = read_view(ItemViewSet, request, user, 'featured')
+    config = await PlatformConfig.aget_config()
+    limit = view.featured_limit(config.featured_items_count)
+    projection = view.get_list_projection()
+
+    admin_featured, most_liked = view.featured_querysets()
+    featured_count = await admin_featured.acount()
+
+    if featured_count < limit:
+        rows = [row async for row in projection.values(admin_featured)]
+        rows += [row async for row in projection.values(most_liked[:limit - featured_count])]
+    else:
+        rows = [row async for row in projection.values(admin_featured[:limit])]
+
+    results = await projection.abuild(rows)
+    return json_response(view.featured_payload(results, featured_count, limit))
+
+
+async def is_liked(view, item_id):
+    liked = view.liked_queryset(item_id)
+    return liked is not None and await liked.aexists()
+
+
+async def retrieve_item(request, user, pk):
+    """📱 GET /api/items/{id}/ - increments view count"""
+    view = read_view(ItemViewSet, request, user, 'retrieve', {'pk': pk})
+    views_counter = Item.objects.filter(id=pk)
+
+    if request.headers.get('If-None-Match') or request.headers.get('If-Modified-Since'):
+        stamp = await view.detail_stamp(pk).afirst()
+        if stamp:
+            etag = view.detail_etag(
+                stamp['id'], stamp['updated_at'], stamp['like_count'], stamp['owner__points'],
+                await is_liked(view, stamp['id'])
+            )
+            response = not_modified(request, etag, stamp['updated_at'])
+            if response is not None:
+                await views_counter.aupdate(view_count=F('view_count') + 1)
+                return response
+
+    try:
+        instance = await view.get_queryset().aget(pk=pk)
+    except Item.DoesNotExist:
+        raise Http404('No Item matches the given query.')
+    await views_counter.aupdate(view_count=F('view_count') + 1)
+
+    liked = await is_liked(view, instance.id)
+    serializer = ItemDetailSerializer(instance, context={
+        **view.get_serializer_context(), 'liked_ids': {instance.id} if liked else set()
+    })
+    owner_points = instance.owner.points if view.get_field_selection().wants('owner') else None
+    etag = view.detail_etag(instance.id, instance.updated_at, instance.like_count, owner_points, liked)
+    return set_validators(json_response(serializer.data), etag, instance.updated_at)
+
+
+def viewset_view(actions, detail, extra_action=None):
+    """The DRF view the router would build, for the methods the async views don't serve"""
+    initkwargs = {'basename': 'item', 'detail': detail}
+    if extra_action is not None:
+        initkwargs.update(extra_action.kwargs)
+    return ItemViewSet.as_view(actions, **initkwargs)
+
+
+item_list = async_read_view(list_items, viewset_view({'get': 'list', 'post': 'create'}, detail=False))
+item_search = async_read_view(
+    search_items, viewset_view({'get': 'advanced_search'}, False, ItemViewSet.advanced_search)
+)
+item_featured = async_read_view(
+    featured_items, viewset_view({'get': 'featured'}, False, ItemViewSet.featured)
+)
+item_detail = async_read_view(retrieve_item, viewset_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+}, detail=True))
@@ -0,0 +1,490 @@
+"""
+Management command to generate a large, realistic synthetic dataset for
+load tests and benchmarks.
+
+Rows are streamed straight into the tables - COPY on PostgreSQL,
+batched executemany() elsewhere - without building model instances, so
+millions of items take minutes instead of the hours a save() per row
+would (bulk_create spends most of its time in Model.__init__ and the SQL
+compiler). The same --seed produces the same data on an empty database.
+
+- users: a few power sellers own most listings (power-law owners)
+- items: created_at spread over --days, a mix of categories, conditions,
+  statuses, moderation states and a handful featured
+- images: 1-3 per item, pointing at a few tiny placeholder PNGs written
+  once under MEDIA_ROOT/items/generated/
+- likes: item popularity follows a Zipf distribution (--like-skew), so a
+  few items collect thousands of likes and most have none; like_count
+  matches the ItemLike rows
+- swaps: in every status, with item statuses to match (accepted -> both
+  items pending, completed -> both swapped)
+- reports: on a fraction of items, unresolved ones flag the item
+
+Nothing goes through save(), so the post_save signals don't run: the
+cached anonymous listings are purged once at the end.
+
+Usage: python manage.py generate_dataset --users 50000 --items 2000000 --seed 42
+"""
+
+import io
+import random
+import time
+from array import array
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from items.models import Item, ItemImage, ItemLike, ItemReport
+from PIL import Image
+from items.signals import listings_changed
+from swaps.models import SwapRequest
+
+User = get_user_model()
+
+ADJECTIVES = [
+    'Vintage', 'Classic', 'Oversized', 'Slim', 'Cropped', 'Relaxed', 'Organic',
+    'Striped', 'Floral', 'Denim', 'Linen', 'Wool', 'Leather', 'Knitted', 'Retro',
+]
+NOUNS = {
+    'tops': ['T-Shirt', 'Blouse', 'Sweater', 'Hoodie', 'Tank Top', 'Shirt'],
+    'bottoms': ['Jeans', 'Chinos', 'Skirt', 'Shorts', 'Trousers', 'Leggings'],
+    'dresses': ['Maxi Dress', 'Midi Dress', 'Sundress', 'Wrap Dress', 'Slip Dress'],
+    'outerwear': ['Jacket', 'Coat', 'Blazer', 'Parka', 'Trench Coat', 'Cardigan'],
+    'shoes': ['Sneakers', 'Boots', 'Sandals', 'Loafers', 'Heels', 'Flats'],
+    'accessories': ['Scarf', 'Belt', 'Hat', 'Sunglasses', 'Watch', 'Necklace'],
+    'bags': ['Tote Bag', 'Backpack', 'Crossbody Bag', 'Clutch', 'Duffel Bag'],
+    'activewear': ['Sports Bra', 'Running Shorts', 'Yoga Pants', 'Track Jacket'],
+    'underwear': ['Socks', 'Bralette', 'Boxers', 'Thermal Set'],
+    'other': ['Costume', 'Swimsuit', 'Apron', 'Kimono'],
+}
+SIZES = {
+    'shoes': ['36', '37', '38', '39', '40', '41', '42', '43', '44', '45'],
+    'accessories': ['One Size'],
+    'bags': ['One Size'],
+    'bottoms': ['XS', 'S', 'M', 'L', 'XL', '26', '28', '30', '32', '34'],
+}
+DEFAULT_SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+CONDITIONS = [('new', 1), ('excellent', 3), ('good', 4), ('fair', 2)]
+COLORS = ['black', 'white', 'blue', 'red', 'green', 'beige', 'grey', 'pink', 'brown', 'yellow']
+BRANDS = ['', '', 'Levi\'s', 'Zara', 'H&M', 'Patagonia', 'Uniqlo', 'Nike', 'Adidas', 'COS', 'Mango']
+TAGS = [
+    'vintage', 'summer', 'winter', 'casual', 'formal', 'designer', 'eco',
+    'streetwear', 'boho', 'minimal', 'party', 'workwear', 'sport', 'handmade',
+]
+LOCATIONS = ['Berlin', 'London', 'Paris', 'Madrid', 'Lisbon', 'Amsterdam', 'Vienna', 'Prague', '']
+REPORT_REASONS = [
+    'Looks like a counterfeit', 'Photos do not match the description',
+    'Inappropriate content', 'Item is not clothing', 'Spam listing',
+]
+SWAP_MESSAGES = ['', '', 'Would you swap?', 'Love this, interested in mine?']
+SWAP_STATUSES = [('pending', 45), ('accepted', 10), ('rejected', 25), ('completed', 20)]
+ITEM_FIELDS = [
+    'id', 'owner', 'title', 'description', 'category', 'size', 'condition', 'status',
+    'point_value', 'tags', 'color', 'brand', 'view_count', 'like_count', 'is_approved',
+    'is_rejected', 'is_featured', 'is_flagged', 'rejection_reason', 'featured_at',
+    'created_at', 'updated_at',
+]
+PLACEHOLDER_COLORS = [
+    (230, 57, 70), (241, 250, 238), (168, 218, 220), (69, 123, 157),
+    (29, 53, 87), (244, 162, 97), (42, 157, 143), (233, 196, 106),
+]
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+class PowerLaw:
+    """
+    Rank sampler: rank r in [0, n) is drawn with probability ~ 1 / (r + 1) ** skew.
+
+    Ranks are mapped to indexes through a fixed pseudo-random permutation,
+    so the popular rows are scattered instead of being the first inserted.
+    """
+
+    def __init__(self, n, skew, rng):
+        self.n = n
+        self.skew = skew
+        self.rng = rng
+        self.stride = next(p for p in range(rng.randrange(n // 2 + 1, n + 2), 10 * n + 3) if coprime(p, n))
+        self.offset = rng.randrange(n)
+
+    def rank(self):
+        u = self.rng.random()
+        if self.skew == 1:
+            x = (self.n + 1) ** u
+        else:
+            exponent = 1 - self.skew
+            x = (((self.n + 1) ** exponent - 1) * u + 1) ** (1 / exponent)
+        return min(int(x) - 1, self.n - 1)
+
+    def index(self, rank):
+        return (rank * self.stride + self.offset) % self.n
+
+    def sample(self):
+        return self.index(self.rank())
+
+
+def coprime(a, b):
+    while b:
+        a, b = b, a % b
+    return a == 1
+
+
+class Command(BaseCommand):
+    help = 'Generate a large seeded synthetic dataset (users, items, images, likes, swaps, reports)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Number of users (default: 10000)')
+        parser.add_argument('--items', type=int, default=200000, help='Number of items (default: 200000)')
+        parser.add_argument(
+            '--likes', type=int, default=None,
+            help='Approximate number of likes (default: 2 per item)'
+        )
+        parser.add_argument('--swaps', type=int, default=None, help='Number of swap requests (default: items / 20)')
+        parser.add_argument('--reports', type=int, default=None, help='Number of reports (default: items / 200)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many days')
+        parser.add_argument(
+            '--like-skew', type=float, default=1.1,
+            help='Zipf exponent of item popularity; higher concentrates likes on fewer items (default: 1.1)'
+        )
+        parser.add_argument(
+            '--seller-skew', type=float, default=0.9,
+            help='Zipf exponent of listings per user (default: 0.9)'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT batch (default: 5000)')
+        parser.add_argument('--prefix', default='load', help='Username prefix of generated users (default: load)')
+        parser.add_argument('--password', default='password123', help='Password of every generated user')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.seed = options['seed']
+        self.batch_size = options['batch_size']
+        self.n_users = options['users']
+        self.n_items = options['items']
+        if self.n_users < 2 or self.n_items < 2:
+            raise CommandError('Need at least 2 users and 2 items')
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(
+                f'Users with prefix "{options["prefix"]}" already exist; '
+                'use another --prefix or start from an empty database'
+            )
+
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=options['days'])
+        started = time.perf_counter()
+
+        self.stage('Users', self.create_users)
+        self.plan()
+        self.stage('Items', self.create_items)
+        self.stage('Images', self.create_images)
+        self.stage('Likes', self.create_likes)
+        self.stage('Swaps', self.create_swaps)
+        self.stage('Reports', self.create_reports)
+        self.stage('Analyze', self.analyze)
+        listings_changed()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated dataset with seed {self.seed} in {time.perf_counter() - started:.1f}s')
+        )
+
+    def rng(self, name):
+        return random.Random(f'{self.seed}-{name}')
+
+    def stage(self, name, func):
+        started = time.perf_counter()
+        with transaction.atomic():
+            count = func()
+        suffix = f': {count} rows' if count is not None else ''
+        self.stdout.write(f'{name}{suffix} ({time.perf_counter() - started:.1f}s)')
+
+    def insert(self, model, fields, rows):
+        """Write `rows`, tuples of values for `fields`, into the model's table; returns the row count"""
+        opts = model._meta
+        quote = connection.ops.quote_name
+        columns = [opts.get_field(name) for name in fields]
+        table = quote(opts.db_table)
+        names = ', '.join(quote(column.column) for column in columns)
+        count = 0
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                with cursor.cursor.copy(f'COPY {table} ({names}) FROM STDIN') as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                        count += 1
+                return count
+
+            datetimes = [n for n, column in enumerate(columns) if column.get_internal_type() == 'DateTimeField']
+            adapt = connection.ops.adapt_datetimefield_value
+            sql = f'INSERT INTO {table} ({names}) VALUES ({", ".join(["%s"] * len(columns))})'
+            rows = iter(rows)
+            while batch := list(islice(rows, self.batch_size)):
+                if datetimes:
+                    batch = [list(row) for row in batch]
+                    for row in batch:
+                        for n in datetimes:
+                            row[n] = adapt(row[n])
+                cursor.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def created_at(self, index, total, rng):
+        """Rows are inserted oldest first, with some jitter"""
+        span = (self.now - self.start).total_seconds()
+        seconds = span * (index + rng.random()) / total
+        return self.start + timedelta(seconds=seconds)
+
+    # Users
+
+    def create_users(self):
+        # a few thousand rows at most, and bulk_create hands back their ids
+        rng = self.rng('users')
+        prefix = self.options['prefix']
+        password = make_password(self.options['password'])
+        users = [
+            User(
+                username=f'{prefix}{n}',
+                email=f'{prefix}{n}@example.com',
+                password=password,
+                points=min(int(20 * rng.paretovariate(1.5)), 100000),
+                location=rng.choice(LOCATIONS) or None,
+                is_private=rng.random() < 0.05,
+                date_joined=self.created_at(n, self.n_users, rng),
+            )
+            for n in range(self.n_users)
+        ]
+        self.user_ids = array('q', (user.pk for user in User.objects.bulk_create(users, self.batch_size)))
+        return len(self.user_ids)
+
+    # Plan: decide everything that has to be known before the items are inserted
+
+    def plan(self):
+        rng = self.rng('owners')
+        sellers = PowerLaw(self.n_users, self.options['seller_skew'], rng)
+        self.owners = array('q', (sellers.sample() for _ in range(self.n_items)))
+
+        self.like_counts = array('q', bytes(8 * self.n_items))
+        for user, item in self.iter_likes():
+            self.like_counts[item] += 1
+
+        self.item_status = {}
+        self.plan_swaps()
+        self.plan_reports()
+
+    def iter_likes(self):
+        """(user index, item index) pairs; deterministic, so it can be replayed"""
+        rng = self.rng('likes')
+        target = self.options['likes']
+        if target is None:
+            target = 2 * self.n_items
+        popularity = PowerLaw(self.n_items, self.options['like_skew'], rng)
+        mean = target / self.n_users
+        for user in range(self.n_users):
+            # Pareto(2) has mean 2: most users like a few items, some like hundreds
+            wanted = min(round(mean * rng.paretovariate(2) / 2), self.n_items // 2)
+            liked = set()
+            for _ in range(wanted * 2):
+                if len(liked) >= wanted:
+                    break
+                item = popularity.sample()
+                if self.owners[item] != user:
+                    liked.add(item)
+            for item in sorted(liked):
+                yield user, item
+
+    def plan_swaps(self):
+        rng = self.rng('swaps')
+        count = self.options['swaps']
+        if count is None:
+            count = self.n_items // 20
+        popularity = PowerLaw(self.n_items, self.options['like_skew'], rng)
+        seen = set()
+        self.swaps = []
+        for _ in range(count * 2):
+            if len(self.swaps) >= count:
+                break
+            offered = rng.randrange(self.n_items)
+            requested = popularity.sample()
+            requester = self.owners[offered]
+            if self.owners[requested] == requester or (requester, requested, offered) in seen:
+                continue
+            status = weighted(rng, SWAP_STATUSES)
+            if status in ('accepted', 'completed'):
+                # an item can only be in one accepted or completed swap
+                if offered in self.item_status or requested in self.item_status:
+                    status = 'rejected'
+                else:
+                    item_status = 'pending' if status == 'accepted' else 'swapped'
+                    self.item_status[offered] = self.item_status[requested] = item_status
+            seen.add((requester, requested, offered))
+            self.swaps.append((requester, requested, offered, status))
+
+    def plan_reports(self):
+        rng = self.rng('reports')
+        count = self.options['reports']
+        if count is None:
+            count = self.n_items // 200
+        seen = set()
+        self.reports = []
+        self.flagged = set()
+        for _ in range(count * 2):
+            if len(self.reports) >= count:
+                break
+            item = rng.randrange(self.n_items)
+            reporter = rng.randrange(self.n_users)
+            if self.owners[item] == reporter or (item, reporter) in seen:
+                continue
+            resolved = rng.random() < 0.4
+            if not resolved:
+                self.flagged.add(item)
+            seen.add((item, reporter))
+            self.reports.append((item, reporter, resolved))
+
+    # Items
+
+    def create_items(self):
+        rng = self.rng('items')
+        categories = [value for value, label in Item.Category.choices]
+        featured = set(rng.sample(range(self.n_items), min(50, self.n_items)))
+        # explicit ids, so likes, images and swaps can refer to items without reading them back
+        self.first_item_id = (Item.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+        def rows():
+            for n in range(self.n_items):
+                category = rng.choice(categories)
+                noun = rng.choice(NOUNS[category])
+                brand = rng.choice(BRANDS)
+                color = rng.choice(COLORS)
+                created_at = self.created_at(n, self.n_items, rng)
+                likes = self.like_counts[n]
+
+                status = self.item_status.get(n)
+                if status is None:
+                    roll = rng.random()
+                    status = 'swapped' if roll < 0.03 else 'reserved' if roll < 0.04 else 'available'
+
+                moderation = rng.random()
+                is_rejected = moderation < 0.01
+                is_approved = moderation >= 0.03
+
+                yield (
+                    self.item_id(n),
+                    self.user_ids[self.owners[n]],
+                    f'{rng.choice(ADJECTIVES)} {brand + " " if brand else ""}{noun}',
+                    f'{color.capitalize()} {noun.lower()} in {category}, worn a few times and ready for a new home.',
+                    category,
+                    rng.choice(SIZES.get(category, DEFAULT_SIZES)),
+                    weighted(rng, CONDITIONS),
+                    status,
+                    rng.randint(1, 100),
+                    ', '.join(rng.sample(TAGS, rng.randint(0, 4))),
+                    color,
+                    brand,
+                    likes * rng.randint(5, 30) + rng.randint(0, 50),
+                    likes,
+                    is_approved,
+                    is_rejected,
+                    n in featured and is_approved,
+                    n in self.flagged,
+                    'Does not meet listing guidelines' if is_rejected else '',
+                    created_at if n in featured else None,
+                    created_at,
+                    created_at,
+                )
+
+        count = self.insert(Item, ITEM_FIELDS, rows())
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Item]):
+                cursor.execute(sql)
+        return count
+
+    def item_id(self, n):
+        return self.first_item_id + n
+
+    def placeholder_images(self):
+        names = []
+        for n, color in enumerate(PLACEHOLDER_COLORS):
+            name = f'items/generated/placeholder-{n}.png'
+            if not default_storage.exists(name):
+                buffer = io.BytesIO()
+                Image.new('RGB', (8, 8), color).save(buffer, format='PNG')
+                name = default_storage.save(name, ContentFile(buffer.getvalue()))
+            names.append(name)
+        return names
+
+    def create_images(self):
+        rng = self.rng('images')
+        names = self.placeholder_images()
+
+        def rows():
+            for n in range(self.n_items):
+                for order in range(rng.choice((1, 1, 2, 3))):
+                    yield self.item_id(n), rng.choice(names), f'Photo {order + 1}', order == 0, order
+
+        return self.insert(ItemImage, ['item', 'image', 'alt_text', 'is_primary', 'order'], rows())
+
+    def create_likes(self):
+        rng = self.rng('like-dates')
+        span = (self.now - self.start).total_seconds()
+
+        def rows():
+            for user, item in self.iter_likes():
+                # sometime after the item was listed
+                listed = span * item / self.n_items
+                created_at = self.start + timedelta(seconds=listed + rng.random() * (span - listed))
+                yield self.user_ids[user], self.item_id(item), created_at
+
+        return self.insert(ItemLike, ['user', 'item', 'created_at'], rows())
+
+    def create_swaps(self):
+        rng = self.rng('swap-dates')
+
+        def rows():
+            for requester, requested, offered, status in self.swaps:
+                created_at = self.created_at(max(requested, offered), self.n_items, rng)
+                updated_at = created_at if status == 'pending' else min(created_at + timedelta(days=2), self.now)
+                yield (
+                    self.user_ids[requester],
+                    self.item_id(requested),
+                    self.item_id(offered),
+                    status,
+                    rng.choice(SWAP_MESSAGES),
+                    created_at,
+                    updated_at,
+                )
+
+        return self.insert(
+            SwapRequest,
+            ['requester', 'requested_item', 'offered_item', 'status', 'message', 'created_at', 'updated_at'],
+            rows(),
+        )
+
+    def create_reports(self):
+        rng = self.rng('report-dates')
+
+        def rows():
+            for item, reporter, resolved in self.reports:
+                yield (
+                    self.item_id(item),
+                    self.user_ids[reporter],
+                    rng.choice(REPORT_REASONS),
+                    resolved,
+                    self.created_at(item, self.n_items, rng),
+                )
+
+        return self.insert(ItemReport, ['item', 'reported_by', 'reason', 'resolved', 'created_at'], rows())
+
+    def analyze(self):
+        # fresh planner statistics, otherwise the first benchmark runs against empty-table plans
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,36 @@
+"""
+Management command to garbage-collect abandoned resumable image uploads.
+
+Deletes upload sessions that have not received a chunk within
+IMAGE_UPLOAD_SESSION_TTL_HOURS, along with their partial files and any
+stray partial files left behind without a session. Starting a new
+upload session does the same at most once per IMAGE_UPLOAD_PURGE_INTERVAL;
+the command is for cron jobs and quiet periods.
+
+Usage: python manage.py purge_upload_sessions
+"""
+
+from django.core.management.base import BaseCommand
+from items.models import ImageUploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete abandoned resumable image upload sessions and their partial files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        expired, orphaned = ImageUploadSession.purge(dry_run=dry_run)
+
+        prefix = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{prefix} {expired} expired upload session(s) and {orphaned} orphaned partial file(s)'
+            )
+        )
@@ -1,6 +1,13 @@
+import os
+import time
+import uuid
+from datetime import timedelta
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.text import slugify
 
 class PlatformConfig(models.Model):
@@ -41,6 +48,55 @@ class PlatformConfig(models.Model):
         config, created = cls.objects.get_or_create(pk=1)
         return config
 
+    @classmethod
+    async def aget_config(cls):
+        """Async get_config() for the async read views"""
+        config, created = await cls.objects.aget_or_create(pk=1)
+        return config
+
+class ListingVersion(models.Model):
+    """
+    🔖 Write stamp for item listings
+
+    A counter bumped after every committed write that can change what a
+    list page shows (items, images, likes, listed owners' names and
+    points; see items/signals.py). List ETags are derived from it: one
+    small aggregate instead of one over the listed items, and it also
+    changes for deletes and bulk updates, which an aggregate of
+    updated_at does not see. Kept in the database rather than the cache so
+    every process agrees on it.
+
+    Every bump is an UPDATE, and concurrent UPDATEs of one row queue on
+    its lock, so the counter is split over SHARDS rows and the version is
+    their sum. A write bumps the shard of the item (or owner) it touched:
+    writes to different items rarely wait on each other, and writes to
+    the same item already queue on the item's own row. The sum only ever
+    grows, so an old ETag never matches again; the price is reading
+    SHARDS rows instead of one per list request.
+    """
+    SHARDS = 16
+
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.aggregate(total=models.Sum('version'))['total'] or 0
+
+    @classmethod
+    async def acurrent(cls):
+        """Async current() for the async read views"""
+        return (await cls.objects.aaggregate(total=models.Sum('version')))['total'] or 0
+
+    @classmethod
+    def bump(cls, key=0):
+        """Add one to the shard for `key` (an item or user id)"""
+        pk = key % cls.SHARDS + 1
+        shard = cls.objects.filter(pk=pk)
+        if not shard.update(version=models.F('version') + 1):
+            version, created = cls.objects.get_or_create(pk=pk, defaults={'version': 1})
+            if not created:  # another process created the row first
+                shard.update(version=models.F('version') + 1)
+
 class Item(models.Model):
     # defining choices for fields - frontend friendly
     class Status(models.TextChoices):
@@ -150,6 +206,11 @@ class Item(models.Model):
         self.view_count = models.F('view_count') + 1
         self.save(update_fields=['view_count'])
 
+    def touch(self):
+        """Bump updated_at when related data (images) changes so ETags change too"""
+        self.updated_at = timezone.now()
+        Item.objects.filter(pk=self.pk).update(updated_at=self.updated_at)
+
 class ItemImage(models.Model):
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='items/%Y/%m/')
@@ -163,6 +224,101 @@ class ItemImage(models.Model):
     def __str__(self):
         return f"Image for {self.item.title}"
 
+class ImageUploadSession(models.Model):
+    """
+    📤 Resumable image upload in progress
+
+    Bytes are appended to a partial file on disk chunk by chunk; once
+    every byte has arrived the session is finalized into an ItemImage.
+    Sessions that go quiet for IMAGE_UPLOAD_SESSION_TTL_HOURS are purged
+    when a new session is started (at most once per
+    IMAGE_UPLOAD_PURGE_INTERVAL per process) and by the
+    `purge_upload_sessions` management command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name='upload_sessions')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField(help_text="Final file size in bytes")
+    received_bytes = models.PositiveBigIntegerField(default=0)
+
+    # ItemImage fields applied on finalize
+    alt_text = models.CharField(max_length=255, blank=True)
+    is_primary = models.BooleanField(default=False)
+    order = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received_bytes}/{self.total_size} bytes)"
+
+    @property
+    def partial_path(self):
+        """Location of the partially received file on local disk"""
+        return os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, f"{self.id}.part")
+
+    @property
+    def is_complete(self):
+        return self.received_bytes >= self.total_size
+
+    def remove_partial_file(self):
+        try:
+            os.remove(self.partial_path)
+        except FileNotFoundError:
+            pass
+
+    def discard(self):
+        """Delete the partial file and the session row"""
+        self.remove_partial_file()
+        self.delete()
+
+    @classmethod
+    def expired(cls):
+        """Sessions that have not received a chunk within the configured TTL"""
+        cutoff = timezone.now() - timedelta(hours=settings.IMAGE_UPLOAD_SESSION_TTL_HOURS)
+        return cls.objects.filter(updated_at__lt=cutoff)
+
+    @classmethod
+    def purge(cls, dry_run=False):
+        """
+        Delete expired sessions with their partial files, and partial files
+        older than the TTL whose session is gone.
+        Returns (expired sessions, orphaned files).
+        """
+        expired = list(cls.expired())
+        if not dry_run:
+            for session in expired:
+                session.discard()
+
+        orphaned = 0
+        temp_dir = settings.IMAGE_UPLOAD_TEMP_DIR
+        cutoff = time.time() - settings.IMAGE_UPLOAD_SESSION_TTL_HOURS * 3600
+        if os.path.isdir(temp_dir):
+            live_ids = {str(pk) for pk in cls.objects.values_list('id', flat=True)}
+            for name in os.listdir(temp_dir):
+                path = os.path.join(temp_dir, name)
+                try:
+                    if name.removesuffix('.part') in live_ids or os.path.getmtime(path) > cutoff:
+                        continue
+                    if not dry_run:
+                        os.remove(path)
+                except FileNotFoundError:
+                    continue  # removed by a concurrent purge
+                orphaned += 1
+        return len(expired), orphaned
+
+    @classmethod
+    def purge_if_due(cls):
+        """purge(), unless this process already did within IMAGE_UPLOAD_PURGE_INTERVAL"""
+        if cache.add('upload-sessions:purged', True, settings.IMAGE_UPLOAD_PURGE_INTERVAL):
+            cls.purge()
+
 class ItemLike(models.Model):
     """Track user likes/favorites for better recommendations"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
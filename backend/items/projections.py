@@ -0,0 +1,145 @@
+"""
+⚡ Projection-based fast path for item lists
+
+ItemListSerializer costs a nested serializer plus three method fields per
+item, and its image/like lookups run one query per item. For read-only
+list pages ItemListProjection builds the exact same payload from a
+`.values()` projection and two batched lookups (primary images, likes),
+assembling plain dicts directly.
+
+The output must stay identical to ItemListSerializer - items/tests.py
+has a parity test that guards the shape. That includes `?fields=` /
+`?omit=`: unrequested fields are left out of the SELECT, and the image
+and like lookups only run when primary_image / is_liked are wanted.
+"""
+
+from rest_framework import serializers
+from rewear.fieldsets import FieldSelection
+from rewear.instrumentation import timed
+from .models import ItemImage, ItemLike
+from .serializers import ItemListSerializer
+
+ITEM_COLUMNS = (
+    'id', 'title', 'category', 'size', 'condition', 'status', 'point_value',
+    'color', 'brand', 'view_count', 'like_count', 'is_featured', 'created_at',
+    'tags', 'owner_id', 'owner__username', 'owner__points',
+)
+EMPTY_ROW = dict.fromkeys(ITEM_COLUMNS)
+
+# Output fields that are not plain columns; None means a batched lookup
+FIELD_COLUMNS = {
+    'owner': ('owner_id', 'owner__username', 'owner__points'),
+    'tags_list': ('tags',),
+    'primary_image': None,
+    'is_liked': None,
+}
+
+
+class ItemListProjection:
+    """Builds ItemListSerializer-compatible dicts without model instances"""
+
+    def __init__(self, request):
+        self.request = request
+        self.datetime_field = serializers.DateTimeField()
+        self.storage = ItemImage._meta.get_field('image').storage
+        self.fields = None
+        self.columns = ITEM_COLUMNS
+        
+        selection = FieldSelection.from_request(request) if request else FieldSelection()
+        if selection:
+            self.fields = selection.filter(ItemListSerializer.Meta.fields)
+            columns = ['id']  # always needed to batch the lookups
+            for name in self.fields:
+                columns.extend(FIELD_COLUMNS.get(name, (name,)) or ())
+            self.columns = tuple(dict.fromkeys(columns))
+
+    def wants(self, name):
+        return self.fields is None or name in self.fields
+
+    def values(self, queryset):
+        """Narrow a queryset (or slice of one) down to the projected columns"""
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def build(self, rows):
+        """Turn projected rows into the list payload, preserving order"""
+        rows = list(rows)
+        ids = [row['id'] for row in rows]
+        images = self.primary_images(ids) if ids and self.wants('primary_image') else {}
+        liked = self.liked_ids(ids) if ids and self.wants('is_liked') else set()
+        with timed('serialize'):
+            return [self.item(row, images, liked) for row in rows]
+
+    async def abuild(self, rows):
+        """build() for the async read views - same lookups through the async ORM"""
+        rows = list(rows)
+        ids = [row['id'] for row in rows]
+        images, liked = {}, set()
+        if ids and self.wants('primary_image') and self.request:
+            images = self.image_urls([image async for image in self.image_rows(ids)])
+        if ids and self.wants('is_liked') and self.liked_rows(ids) is not None:
+            liked = {item_id async for item_id in self.liked_rows(ids)}
+        with timed('serialize'):
+            return [self.item(row, images, liked) for row in rows]
+
+    def image_rows(self, ids):
+        return ItemImage.objects.filter(item_id__in=ids).order_by(
+            'item_id', '-is_primary', 'order', 'id'
+        ).values_list('item_id', 'image')
+
+    def image_urls(self, rows):
+        """item_id -> absolute URL of its primary image, or first image by order"""
+        images = {}
+        for item_id, name in rows:
+            if item_id not in images and name:
+                images[item_id] = self.request.build_absolute_uri(self.storage.url(name))
+        return images
+
+    def primary_images(self, ids):
+        if not self.request:
+            return {}
+        return self.image_urls(self.image_rows(ids))
+
+    def liked_rows(self, ids):
+        """ids of the viewer's likes among `ids`, or None for anonymous viewers"""
+        user = getattr(self.request, 'user', None)
+        if not (user and user.is_authenticated):
+            return None
+        return ItemLike.objects.filter(user=user, item_id__in=ids).values_list('item_id', flat=True)
+
+    def liked_ids(self, ids):
+        rows = self.liked_rows(ids)
+        return set(rows) if rows is not None else set()
+
+    def item(self, row, images, liked):
+        if self.fields is None:
+            return self.full_item(row, images, liked)
+        # sparse rows only carry the requested columns
+        data = self.full_item({**EMPTY_ROW, **row}, images, liked)
+        return {name: data[name] for name in self.fields}
+
+    def full_item(self, row, images, liked):
+        tags = row['tags']
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'category': row['category'],
+            'size': row['size'],
+            'condition': row['condition'],
+            'status': row['status'],
+            'point_value': row['point_value'],
+            'color': row['color'],
+            'brand': row['brand'],
+            'view_count': row['view_count'],
+            'like_count': row['like_count'],
+            'is_featured': row['is_featured'],
+            'created_at': self.datetime_field.to_representation(row['created_at']),
+            'primary_image': images.get(row['id']),
+            'owner': {
+                'id': row['owner_id'],
+                'username': row['owner__username'],
+                'points': row['owner__points'],
+            },
+            'tags_list': [tag.strip() for tag in tags.split(',') if tag.strip()] if tags else [],
+            'is_liked': row['id'] in liked,
+        }
+
@@ -1,6 +1,15 @@
+import os
+
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Item, ItemImage, ItemLike, ItemReport
+from django.core.validators import get_available_image_extensions
+from django.db.models import prefetch_related_objects
+from django.db.models.manager import BaseManager
+from django.urls import reverse
+from rewear.fieldsets import SparseFieldsetMixin
+from rewear.instrumentation import TimedListSerializer, TimedSerializerMixin
+from .models import Item, ItemImage, ItemLike, ItemReport, ImageUploadSession
 
 User = get_user_model()
 
@@ -16,7 +25,39 @@ class ItemOwnerSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'points')
 
-class ItemListSerializer(serializers.ModelSerializer):
+def prepare_item_batch(context, items):
+    """
+    Look up what ItemListSerializer needs per item - owner, primary image,
+    the viewer's like - for all `items` at once and leave it in `context`,
+    so serializing them runs a fixed number of queries instead of a few
+    per item.
+    """
+    from .projections import ItemListProjection
+
+    items = [item for item in items if item is not None]
+    if not items:
+        return
+    ids = [item.id for item in items]
+    request = context.get('request')
+    projection = ItemListProjection(request)
+
+    prefetch_related_objects(items, 'owner')  # no query when select_related already did it
+    if request:
+        images = projection.image_urls(projection.image_rows(ids))
+        context.setdefault('primary_images', {}).update({item_id: images.get(item_id) for item_id in ids})
+    context.setdefault('liked_ids', set()).update(projection.liked_ids(ids))
+
+
+class ItemBatchListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """many=True for ItemListSerializer - batches the per-item lookups"""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        prepare_item_batch(self.context, items)
+        return super().to_representation(items)
+
+
+class ItemListSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for item lists/grids - optimized for frontend"""
     owner = ItemOwnerSerializer(read_only=True)
     tags_list = serializers.SerializerMethodField()
@@ -31,12 +72,16 @@ class ItemListSerializer(serializers.ModelSerializer):
             'is_featured', 'created_at', 'primary_image', 'owner',
             'tags_list', 'is_liked'
         )
+        list_serializer_class = ItemBatchListSerializer
 
     def get_tags_list(self, obj):
         return obj.get_tags_list()
 
     def get_is_liked(self, obj):
         """Check if current user has liked this item"""
+        liked_ids = self.context.get('liked_ids')
+        if liked_ids is not None:
+            return obj.id in liked_ids  # looked up in one batch by the view / prepare_item_batch
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return ItemLike.objects.filter(user=request.user, item=obj).exists()
@@ -44,6 +89,9 @@ class ItemListSerializer(serializers.ModelSerializer):
 
     def get_primary_image(self, obj):
         """Get the primary image or first image for quick display"""
+        primary_images = self.context.get('primary_images')
+        if primary_images is not None and obj.id in primary_images:
+            return primary_images[obj.id]  # looked up in one batch (prepare_item_batch)
         primary_img = obj.images.filter(is_primary=True).first()
         if not primary_img:
             primary_img = obj.images.first()
@@ -54,7 +102,7 @@ class ItemListSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(primary_img.image.url)
         return None
 
-class ItemDetailSerializer(serializers.ModelSerializer):
+class ItemDetailSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Detailed serializer for single item view"""
     images = ItemImageSerializer(many=True, read_only=True)
     owner = ItemOwnerSerializer(read_only=True)
@@ -77,6 +125,9 @@ class ItemDetailSerializer(serializers.ModelSerializer):
         return obj.get_tags_list()
 
     def get_is_liked(self, obj):
+        liked_ids = self.context.get('liked_ids')
+        if liked_ids is not None:
+            return obj.id in liked_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return ItemLike.objects.filter(user=request.user, item=obj).exists()
@@ -184,6 +235,46 @@ class ItemCreateUpdateSerializer(serializers.ModelSerializer):
         
         return instance
 
+class ImageUploadSessionSerializer(serializers.ModelSerializer):
+    """Resumable upload session - clients use received_bytes to resume"""
+    upload_id = serializers.UUIDField(source='id', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+    upload_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImageUploadSession
+        fields = (
+            'upload_id', 'item', 'filename', 'total_size', 'received_bytes',
+            'chunk_size', 'alt_text', 'is_primary', 'order', 'upload_url',
+            'created_at', 'updated_at'
+        )
+        read_only_fields = ('item', 'received_bytes', 'created_at', 'updated_at')
+
+    def get_chunk_size(self, obj):
+        return settings.IMAGE_UPLOAD_CHUNK_SIZE
+
+    def get_upload_url(self, obj):
+        request = self.context.get('request')
+        path = reverse('upload_session_detail', kwargs={'upload_id': obj.id})
+        return request.build_absolute_uri(path) if request else path
+
+    def validate_filename(self, value):
+        """Only accept file extensions Pillow can open"""
+        value = os.path.basename(value)
+        extension = os.path.splitext(value)[1].lstrip('.').lower()
+        if extension not in get_available_image_extensions():
+            raise serializers.ValidationError("Unsupported image file extension")
+        return value
+
+    def validate_total_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError("File size must be at least 1 byte")
+        if value > settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File size must not exceed {settings.IMAGE_UPLOAD_MAX_SIZE} bytes"
+            )
+        return value
+
 class CategorySerializer(serializers.Serializer):
     """Serializer for category choices - helps frontend build dropdowns"""
     value = serializers.CharField()
@@ -199,13 +290,14 @@ class ItemStatsSerializer(serializers.Serializer):
 
 
 
-class ItemReportSerializer(serializers.ModelSerializer):
+class ItemReportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     # optional nested read-only fields
     item_title = serializers.CharField(source='item.title', read_only=True)
     reported_by_username = serializers.CharField(source='reported_by.username', read_only=True)
 
     class Meta:
         model = ItemReport
+        list_serializer_class = TimedListSerializer
         fields = [
             'id',
             'item',
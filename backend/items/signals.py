@@ -0,0 +1,53 @@
+"""
+Cache invalidation hooks: any write to an item, its images or likes, or
+to the name or points of a user with listed items, purges the cached
+anonymous item listings (see rewear/middleware.py) and bumps the
+ListingVersion that list ETags are derived from. Other user writes
+(registrations, logins, profile edits) leave listings alone, as every
+bump is a write of its own.
+
+Bulk `QuerySet.update()` calls bypass these signals and must call
+`listings_changed()` themselves.
+"""
+
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rewear.cache import purge_tags
+from .models import Item, ItemImage, ItemLike, ListingVersion
+
+
+def listings_changed(key=0):
+    """
+    Invalidate cached listings and list ETags, once the current
+    transaction commits. `key` (the item or user id) picks the
+    ListingVersion shard.
+    """
+    purge_tags('items')
+    transaction.on_commit(partial(ListingVersion.bump, key))
+
+
+@receiver([post_save, post_delete], sender=Item)
+def purge_item_listings(sender, instance, **kwargs):
+    listings_changed(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ItemImage)
+@receiver([post_save, post_delete], sender=ItemLike)
+def purge_item_part_listings(sender, instance, **kwargs):
+    listings_changed(instance.item_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def purge_owner_listings(sender, instance, created, update_fields=None, **kwargs):
+    # deleting a user deletes their items, whose own signals purge
+    if update_fields and not set(update_fields) & set(instance.LISTED_FIELDS):
+        return  # e.g. a login
+    listed, instance.listed = getattr(instance, 'listed', None), instance.listed_values()
+    if created or listed == instance.listed:
+        return  # no items yet, or no listed field changed
+    if instance.items.exists():
+        listings_changed(instance.pk)
@@ -1,3 +1,1176 @@
-from django.test import TestCase
+import asyncio
+import gc
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image as PILImage
+from prometheus_client import REGISTRY
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rewear import db_routers, handlers, instrumentation, readiness, schema, warmup
+from rewear.compression import compress
+from rewear.middleware import CompressionMiddleware
+from rewear.parsers import ORJSONParser
+from rewear.renderers import ORJSONRenderer
+from rewear.testing import (
+    QueryBudgetMixin, authenticated_client, bearer, make_item, query_budget, sync_view_response
+)
+
+from . import views
+from .models import ImageUploadSession, Item, ItemImage, ItemLike, ListingVersion, PlatformConfig
+from .projections import ItemListProjection
+from .serializers import ItemImageSerializer, ItemListSerializer
+
+User = get_user_model()
+
+
+class ItemListProjectionParityTests(TestCase):
+    """ItemListProjection must produce exactly what ItemListSerializer does"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='pass12345', points=42
+        )
+        cls.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='pass12345'
+        )
+
+        def make_item(title, **extra):
+            return Item.objects.create(
+                owner=cls.owner, title=title, description='desc', category='tops',
+                size='M', **extra
+            )
+
+        # primary image that is not first in display order
+        tagged = make_item('Tagged', tags='vintage, , denim ,summer', brand='Levi\'s', is_featured=True)
+        ItemImage.objects.create(item=tagged, image='items/2025/01/back.jpg', order=0)
+        ItemImage.objects.create(item=tagged, image='items/2025/01/front.jpg', order=1, is_primary=True)
+
+        # no primary flag - first image by order wins
+        unflagged = make_item('Unflagged', color='Blue')
+        ItemImage.objects.create(item=unflagged, image='items/2025/01/second.jpg', order=2)
+        ItemImage.objects.create(item=unflagged, image='items/2025/01/first.jpg', order=1)
+
+        # no images, no tags
+        make_item('Bare', status=Item.Status.PENDING)
+
+        ItemLike.objects.create(user=cls.viewer, item=tagged)
+
+    def render(self, data):
+        return json.dumps(data, sort_keys=False, default=str)
+
+    def assert_parity(self, user, params=None):
+        request = Request(APIRequestFactory().get('/api/items/', params))
+        request.user = user
+        queryset = Item.objects.order_by('id')
+
+        expected = ItemListSerializer(queryset, many=True, context={'request': request}).data
+        projection = ItemListProjection(request)
+        actual = projection.build(projection.values(queryset))
+
+        # compare serialized text so key order and value types both count
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_parity_anonymous(self):
+        self.assert_parity(AnonymousUser())
+
+    def test_parity_authenticated(self):
+        self.assert_parity(self.viewer)
+
+    def test_parity_sparse_fields(self):
+        self.assert_parity(self.viewer, {'fields': 'id,title,primary_image,point_value'})
+        self.assert_parity(self.viewer, {'omit': 'owner,is_liked,tags_list'})
+
+    def test_sparse_fields_skip_unrequested_lookups(self):
+        request = Request(APIRequestFactory().get('/api/items/', {'fields': 'id,title,point_value'}))
+        request.user = self.viewer
+        projection = ItemListProjection(request)
+        self.assertNotIn('owner__username', projection.columns)
+        with self.assertNumQueries(1):
+            data = projection.build(projection.values(Item.objects.order_by('id')))
+        self.assertEqual(list(data[0]), ['id', 'title', 'point_value'])
+
+    @override_settings(ANON_CACHE_ENABLED=False)
+    def test_list_endpoint_matches_serializer(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=bearer(self.viewer))
+        response = client.get('/api/items/')
+        self.assertEqual(response.status_code, 200)
+
+        request = APIRequestFactory().get('/api/items/')
+        request.user = self.viewer
+        expected = ItemListSerializer(
+            Item.objects.filter(status='available').order_by('-created_at'),
+            many=True, context={'request': request}
+        ).data
+        self.assertEqual(self.render(response.json()['results']), self.render(expected))
+
+
+HAS_REPLICA = 'replica' in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, 'needs a "replica" database (rewear.test_settings)')
+@override_settings(REPLICA_DATABASES=['replica'], REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The replica is a separate, empty database here, so a read served by
+    it returns no items while the primary has one.
+    """
+    databases = {'default', 'replica'} if HAS_REPLICA else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(db_routers._down_until.clear)
+        self.user = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.item = Item.objects.create(
+            owner=self.user, title='On primary', description='desc', category='tops', size='M'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=bearer(self.user))
+
+    def titles(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return [item['title'] for item in response.json()['results']]
+
+    def test_safe_requests_read_from_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            self.assertEqual(self.titles('/api/items/'), [])
+            self.assertEqual(self.titles('/api/items/my/'), [])
+        self.assertTrue(replica_queries.captured_queries)
+
+    def test_write_pins_user_to_primary(self):
+        response = self.client.post('/api/items/', {
+            'title': 'Just listed', 'description': 'desc', 'category': 'tops', 'size': 'M',
+            'condition': 'good', 'point_value': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('Just listed', self.titles('/api/items/my/'))
+
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=bearer(User.objects.create_user(
+            username='browser', email='browser@example.com', password='pass12345'
+        )))
+        self.assertEqual(other.get('/api/items/').json()['results'], [])
+
+    def test_function_view_writes_pin_too(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        theirs = Item.objects.create(owner=other, title='Theirs', description='desc', category='tops', size='M')
+
+        # a failed write leaves the user on the replica
+        self.assertEqual(self.client.post('/api/items/items/report/', {'item': theirs.pk}).status_code, 400)
+        self.assertEqual(self.titles('/api/items/my/'), [])
+
+        response = self.client.post('/api/items/items/report/', {'item': theirs.pk, 'reason': 'Torn'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.titles('/api/items/my/'), ['On primary'])
+
+    def test_process_local_cache_warning(self):
+        self.assertEqual([warning.id for warning in db_routers.check_pin_cache(None)], ['rewear.W001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(db_routers.check_pin_cache(None), [])
+        with override_settings(REPLICA_DATABASES=[]):
+            self.assertEqual(db_routers.check_pin_cache(None), [])
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError):
+            self.assertEqual(self.titles('/api/items/my/'), ['On primary'])
+        # skipped until REPLICA_RETRY_SECONDS pass, without retrying the connect
+        self.assertEqual(self.titles('/api/items/my/'), ['On primary'])
+
+
+class ItemQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Item read endpoints run the same queries whatever the page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        cls.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='pass12345')
+        PlatformConfig.get_config()  # created on first use otherwise
+
+    def setUp(self):
+        self.client = authenticated_client(self.viewer)
+        self.add_items(2)
+
+    def add_items(self, count):
+        for _ in range(count):
+            item = make_item(self.owner, title='Denim jacket', is_featured=True)
+            ItemLike.objects.create(user=self.viewer, item=item)
+
+    def assert_constant(self, path, endpoint):
+        self.assertConstantQueries(
+            self.client, path, lambda: self.add_items(8),
+            max_queries=settings.REQUEST_BUDGETS[endpoint]['queries'],
+        )
+
+    def test_list(self):
+        self.assert_constant('/api/items/?page_size=50', 'item-list')
+
+    def test_search(self):
+        self.assert_constant('/api/items/search/?q=denim&page_size=50', 'item-advanced-search')
+
+    def test_featured(self):
+        self.assert_constant('/api/items/featured/?limit=20', 'item-featured')
+
+    def test_my_items(self):
+        self.client = authenticated_client(self.owner)
+        self.assert_constant('/api/items/my/?page_size=50', 'item-my-items')
+
+    def test_serializer_list_batches_lookups(self):
+        request = Request(APIRequestFactory().get('/api/items/'))
+        request.user = self.viewer
+        items = list(Item.objects.all())
+        with query_budget(3):  # owners, primary images, likes
+            ItemListSerializer(items, many=True, context={'request': request}).data
+
+
+class RequestInstrumentationTests(TestCase):
+    """Server-Timing header and the phases it reports"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        make_item(cls.owner, image=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def server_timing(self, response):
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_header(self):
+        client = authenticated_client(self.owner)
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = client.get('/api/items/')
+        queries = len(primary) + len(replica)
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'render', 'total'})
+        self.assertEqual(timing['db']['desc'], f'"{queries} queries"')
+        self.assertLessEqual(queries, settings.REQUEST_BUDGETS['item-list']['queries'])
+        for name in ('serialize', 'render'):
+            self.assertGreater(float(timing[name]['dur']), 0)
+        self.assertGreaterEqual(float(timing['total']['dur']), float(timing['serialize']['dur']))
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_can_be_turned_off(self):
+        self.assertNotIn('Server-Timing', authenticated_client(self.owner).get('/api/items/'))
+
+    def test_only_timed_serializers_count(self):
+        items = list(Item.objects.all())
+        with instrumentation.measure() as metrics:
+            ItemImageSerializer(ItemImage.objects.all(), many=True).data
+        self.assertNotIn('serialize', metrics.phases)
+        with instrumentation.measure() as metrics:
+            ItemListSerializer(items, many=True).data
+        self.assertGreater(metrics.phases['serialize'], 0)
+
+    def test_endpoint_budgets_are_for_reads(self):
+        self.assertEqual(instrumentation.budget_for('item-list', 'POST'), settings.REQUEST_BUDGET)
+        self.assertEqual(
+            instrumentation.budget_for('item-list', 'GET')['queries'],
+            settings.REQUEST_BUDGETS['item-list']['queries'],
+        )
+
+
+class PrometheusMetricsTests(TestCase):
+    """/metrics exports request, cache, upload and business event metrics"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        cls.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='pass12345')
+        cls.item = make_item(cls.owner)
+
+    def setUp(self):
+        cache.clear()
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    def test_requests_are_counted_per_endpoint(self):
+        labels = {'method': 'GET', 'endpoint': 'item-list', 'status': '200'}
+        before = self.sample('rewear_http_requests_total', **labels)
+        authenticated_client(self.viewer).get('/api/items/')
+        self.assertEqual(self.sample('rewear_http_requests_total', **labels), before + 1)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            'rewear_http_request_duration_seconds_bucket{endpoint="item-list",le="0.005",method="GET"}',
+            response.content.decode()
+        )
+        self.assertIn('rewear_image_upload_sessions 0.0', response.content.decode())
+
+    def test_anonymous_cache_hits_and_misses(self):
+        before = {result: self.sample('rewear_cache_requests_total', cache='anon_response', result=result)
+                  for result in ('hit', 'miss')}
+        self.client.get('/api/items/')
+        self.client.get('/api/items/')
+        self.assertEqual(self.sample('rewear_cache_requests_total', cache='anon_response', result='miss'),
+                         before['miss'] + 1)
+        self.assertEqual(self.sample('rewear_cache_requests_total', cache='anon_response', result='hit'),
+                         before['hit'] + 1)
+
+    def test_events_count_on_commit(self):
+        liked = self.sample('rewear_events_total', event='item_liked')
+        unliked = self.sample('rewear_events_total', event='item_unliked')
+        client = authenticated_client(self.viewer)
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'/api/items/{self.item.pk}/like/')
+        self.assertEqual(self.sample('rewear_events_total', event='item_liked'), liked + 1)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            client.post(f'/api/items/{self.item.pk}/like/')
+        self.assertEqual(self.sample('rewear_events_total', event='item_unliked'), unliked)
+
+    def test_connection_pool_stats(self):
+        self.assertNotIn('rewear_db_pool_pool_size{', self.client.get('/metrics').content.decode())
+
+        stats = {
+            'pool_min': 2, 'pool_max': 4, 'pool_size': 3, 'pool_available': 1, 'requests_waiting': 2,
+            'requests_num': 10, 'requests_wait_ms': 1500, 'connections_errors': 1,
+        }
+        with mock.patch('rewear.db.pool_stats', return_value={'default': stats}):
+            body = self.client.get('/metrics').content.decode()
+        for line in (
+            'rewear_db_pool_pool_size{alias="default"} 3.0',
+            'rewear_db_pool_pool_available{alias="default"} 1.0',
+            'rewear_db_pool_requests_waiting{alias="default"} 2.0',
+            'rewear_db_pool_requests_total{alias="default"} 10.0',
+            'rewear_db_pool_requests_wait_seconds_total{alias="default"} 1.5',
+            'rewear_db_pool_connections_errors_total{alias="default"} 1.0',
+            'rewear_db_pool_requests_errors_total{alias="default"} 0.0',
+        ):
+            self.assertIn(line, body)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+
+class OpenAPISchemaTests(TestCase):
+    """The schema is generated once per code version, saved, and served precompressed with an ETag"""
+
+    def setUp(self):
+        self.schema_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.schema_dir)
+        settings_override = override_settings(DEBUG=False, CODE_VERSION='release-1', SCHEMA_CACHE_DIR=self.schema_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def fresh_process(self):
+        """What a newly started worker sees: nothing in memory yet"""
+        patcher = mock.patch('rewear.schema.OPENAPI_SCHEMA', schema.SchemaPayload())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_generated_once_then_served_from_memory_and_disk(self):
+        self.fresh_process()
+        response = self.client.get('/swagger/?format=openapi')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/openapi+json')
+        self.assertIn('/items/', json.loads(response.content)['paths'])
+        self.assertIn('openapi-release-1.json.gz', os.listdir(self.schema_dir))
+
+        with mock.patch('rewear.schema.generate', side_effect=AssertionError('regenerated')):
+            self.assertEqual(self.client.get('/redoc/?format=openapi')['ETag'], response['ETag'])
+            self.fresh_process()
+            gzipped = self.client.get('/swagger/?format=openapi', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(gzipped.content)), json.loads(response.content))
+
+        revalidated = self.client.get('/swagger/?format=openapi', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_new_code_version_regenerates(self):
+        self.fresh_process()
+        self.client.get('/swagger/?format=openapi')
+        self.fresh_process()
+        with override_settings(CODE_VERSION='release-2'), \
+                mock.patch('rewear.schema.generate', wraps=schema.generate) as generate:
+            self.assertEqual(self.client.get('/swagger/?format=openapi').status_code, 200)
+        generate.assert_called_once()
+        saved = os.listdir(self.schema_dir)
+        self.assertIn('openapi-release-2.json', saved)
+        self.assertFalse([name for name in saved if 'release-1' in name])
+
+
+class ReadinessTests(TestCase):
+    """/readyz reports 503 until the worker is warm and the database is reachable and migrated"""
+
+    def fresh_process(self):
+        patcher = mock.patch('rewear.readiness.state', readiness.Readiness())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ready_once_warmed_up(self):
+        self.fresh_process()
+        response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['pending_migrations'], [])
+        self.assertTrue(response.json()['warm'])
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def test_unapplied_migrations(self):
+        self.fresh_process()
+        migration = mock.Mock(app_label='items')
+        migration.name = '0099_future'  # name= would name the mock
+        with mock.patch('django.db.migrations.executor.MigrationExecutor.migration_plan',
+                        return_value=[(migration, False)]):
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['pending_migrations'], ['items.0099_future'])
+
+        # checked again until the release step has run
+        self.assertEqual(self.client.get('/readyz').status_code, 200)
+
+    def test_database_unavailable(self):
+        self.fresh_process()
+        with mock.patch('django.db.backends.base.base.BaseDatabaseWrapper.cursor',
+                        side_effect=OperationalError('connection refused')), \
+                self.assertLogs('rewear.readiness', 'WARNING'):
+            response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['database'], 'unavailable')
+
+
+try:
+    import psycopg_pool  # noqa: F401 - DB_POOL needs it
+    HAS_PSYCOPG_POOL = True
+except ImportError:
+    HAS_PSYCOPG_POOL = False
+
+
+class PrepareForkTests(SimpleTestCase):
+    """Nothing database related is inherited by forked workers"""
+
+    def prepare_fork(self, *wrappers):
+        self.addCleanup(gc.unfreeze)
+        with mock.patch.object(connections, 'all', return_value=list(wrappers)):
+            warmup.prepare_fork()
+
+    def test_connections_and_pools_are_closed(self):
+        connection = mock.Mock(spec=['close', 'close_pool'])
+        self.prepare_fork(connection)
+        connection.close.assert_called_once_with()
+        connection.close_pool.assert_called_once_with()
+
+    @skipUnless(HAS_PSYCOPG_POOL, 'DB_POOL needs psycopg_pool')
+    def test_no_pool_survives(self):
+        from django.db.backends.postgresql.base import DatabaseWrapper
+
+        config = connections.configure_settings({'default': {
+            'ENGINE': 'django.db.backends.postgresql', 'NAME': 'rewear', 'OPTIONS': {'pool': True},
+        }})['default']
+        connection = DatabaseWrapper(config, alias='pooled')
+        self.addCleanup(connection.close_pool)
+        self.assertIsNotNone(connection.pool)  # created, not opened: no server needed
+        self.prepare_fork(connection)
+        self.assertNotIn('pooled', DatabaseWrapper._connection_pools)
+
+
+@override_settings(IMAGE_UPLOAD_PURGE_INTERVAL=0)
+class ResumableUploadTests(TestCase):
+    """Chunked uploads: Content-Range checks, resuming, finalizing once, and only into your own item"""
+
+    def setUp(self):
+        self.media_root, temp_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.addCleanup(shutil.rmtree, temp_dir)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_UPLOAD_TEMP_DIR=temp_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        self.item = make_item(self.owner, image=False)
+        self.client = authenticated_client(self.owner)
+
+        buffer = io.BytesIO()
+        PILImage.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+        self.png = buffer.getvalue()
+
+    def start(self, data=None):
+        response = self.client.post(
+            f'/api/items/{self.item.pk}/upload-sessions/',
+            {'filename': 'photo.png', 'total_size': len(self.png), 'is_primary': True, **(data or {})},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['upload_url'].replace('http://testserver', '')
+
+    def put(self, url, start, end, client=None):
+        return (client or self.client).put(
+            url, self.png[start:end + 1], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.png)}',
+        )
+
+    def test_chunked_upload_resume_and_finalize(self):
+        url = self.start()
+        session = ImageUploadSession.objects.get()
+        self.assertFalse(os.path.abspath(session.partial_path).startswith(os.path.abspath(self.media_root)))
+
+        middle = len(self.png) // 2
+        self.assertEqual(self.put(url, 0, middle - 1).json()['received_bytes'], middle)
+
+        # a retried chunk does not start at received_bytes: 409 tells where to resume
+        conflict = self.put(url, 0, middle - 1)
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict.json()['received_bytes'], middle)
+        self.assertEqual(self.client.get(url).json()['received_bytes'], middle)
+
+        self.assertEqual(self.client.post(url + 'finalize/').status_code, 400)  # not complete yet
+        self.assertEqual(self.put(url, middle, len(self.png) - 1).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 201, response.content)
+        image = ItemImage.objects.get(item=self.item)
+        self.assertTrue(image.is_primary)
+        with open(image.image.path, 'rb') as f:
+            self.assertEqual(f.read(), self.png)
+        self.assertFalse(ImageUploadSession.objects.exists())
+        self.assertFalse(os.path.exists(session.partial_path))
+
+        self.assertEqual(self.client.post(url + 'finalize/').status_code, 404)
+
+    def test_failed_finalize_can_be_retried(self):
+        url = self.start()
+        self.put(url, 0, len(self.png) - 1)
+        session = ImageUploadSession.objects.get()
+
+        with mock.patch.object(Item, 'touch', side_effect=OperationalError('database is locked')), \
+                self.assertRaises(OperationalError):
+            self.client.post(url + 'finalize/')
+        # the claim rolled back, the partial file is still there and no copy is left behind
+        self.assertTrue(ImageUploadSession.objects.filter(pk=session.pk).exists())
+        self.assertTrue(os.path.exists(session.partial_path))
+        self.assertFalse(ItemImage.objects.exists())
+        self.assertEqual([files for _, _, files in os.walk(self.media_root) if files], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 201, response.content)
+        with open(ItemImage.objects.get().image.path, 'rb') as f:
+            self.assertEqual(f.read(), self.png)
+        self.assertFalse(os.path.exists(session.partial_path))
+
+    def test_losing_concurrent_chunk_is_not_written(self):
+        url = self.start()
+        session = ImageUploadSession.objects.get()
+        winner = b'\x00' * 16
+        receive_chunk = views.receive_chunk
+
+        def received_while_another_chunk_won(stream, expected):
+            spool = receive_chunk(stream, expected)
+            with open(session.partial_path, 'r+b') as destination:
+                destination.write(winner)
+            ImageUploadSession.objects.filter(pk=session.pk).update(received_bytes=len(winner))
+            return spool
+
+        with mock.patch('items.views.receive_chunk', received_while_another_chunk_won):
+            response = self.put(url, 0, 15)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['received_bytes'], len(winner))
+        with open(session.partial_path, 'rb') as f:
+            self.assertEqual(f.read(len(winner)), winner)
+
+    def test_invalid_content_range(self):
+        url = self.start()
+        self.assertEqual(self.client.put(url, b'x', content_type='application/octet-stream').status_code, 400)
+        response = self.client.put(url, b'x', content_type='application/octet-stream',
+                                   HTTP_CONTENT_RANGE='bytes 0-0/999999')
+        self.assertEqual(response.status_code, 416)
+
+    def test_only_the_uploader_sees_the_session(self):
+        url = self.start()
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        client = authenticated_client(other)
+        self.assertEqual(client.get(url).status_code, 404)
+        self.assertEqual(self.put(url, 0, len(self.png) - 1, client=client).status_code, 404)
+        self.assertEqual(client.post(url + 'finalize/').status_code, 404)
+
+    def test_finalize_after_the_item_changed_hands(self):
+        url = self.start()
+        self.put(url, 0, len(self.png) - 1)
+        new_owner = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        Item.objects.filter(pk=self.item.pk).update(owner=new_owner)
+
+        self.assertEqual(self.client.post(url + 'finalize/').status_code, 403)
+        self.assertFalse(ItemImage.objects.exists())
+        self.assertFalse(ImageUploadSession.objects.exists())
+
+    def test_concurrent_finalize_loses_cleanly(self):
+        url = self.start()
+        self.put(url, 0, len(self.png) - 1)
+        session = ImageUploadSession.objects.get()
+        # the other request claimed the session between our lookup and our claim
+        ImageUploadSession.objects.filter(pk=session.pk).delete()
+
+        with mock.patch('items.views.get_object_or_404', return_value=session):
+            response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(os.path.exists(session.partial_path))  # the winner's file is left alone
+
+    def test_invalid_image_is_discarded(self):
+        self.png = b'not an image' * 10
+        url = self.start()
+        self.put(url, 0, len(self.png) - 1)
+        self.assertEqual(self.client.post(url + 'finalize/').status_code, 400)
+        self.assertFalse(ImageUploadSession.objects.exists())
+
+    def test_starting_a_session_purges_expired_ones(self):
+        self.start()
+        stale = ImageUploadSession.objects.get()
+        ImageUploadSession.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(days=2))
+        self.start()
+        self.assertFalse(ImageUploadSession.objects.filter(pk=stale.pk).exists())
+        self.assertFalse(os.path.exists(stale.partial_path))
+        self.assertEqual(ImageUploadSession.objects.count(), 1)
+
+
+class MediaServingTests(TestCase):
+    """Uploads get content-hashed names, served immutable, with byte ranges or through the front proxy"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE='django')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.body = bytes(range(256)) * 4
+
+    def test_uploads_are_named_by_content(self):
+        name = default_storage.save('items/test/shirt.png', ContentFile(self.body))
+        self.assertRegex(name, settings.MEDIA_IMMUTABLE_PATTERN)
+        self.assertNotEqual(default_storage.save('items/test/shirt.png', ContentFile(b'other')), name)
+        # a second copy of the same bytes keeps the hash last
+        again = default_storage.save('items/test/shirt.png', ContentFile(self.body))
+        self.assertNotEqual(again, name)
+        self.assertRegex(again, settings.MEDIA_IMMUTABLE_PATTERN)
+
+    def test_cache_control(self):
+        name = default_storage.save('items/test/shirt.png', ContentFile(self.body))
+        response = self.client.get(f'/media/{name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.body)
+        self.assertIn('immutable', response['Cache-Control'])
+
+        FileSystemStorage().save('items/test/legacy.png', ContentFile(self.body))
+        legacy = self.client.get('/media/items/test/legacy.png')
+        self.assertEqual(legacy['Cache-Control'], f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}')
+
+    def test_ranges_and_validators(self):
+        name = default_storage.save('items/test/shirt.png', ContentFile(self.body))
+        url = f'/media/{name}'
+        etag = self.client.get(url)['ETag']
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(b''.join(partial.streaming_content), self.body[2:6])
+        self.assertEqual(partial['Content-Range'], f'bytes 2-5/{len(self.body)}')
+
+        suffix = self.client.get(url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(suffix.streaming_content), self.body[-3:])
+
+        unsatisfiable = self.client.get(url, HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable['Content-Range'], f'bytes */{len(self.body)}')
+
+        # the file changed since the client's copy: whole file instead of a range
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"').status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/media/items/test/missing.png').status_code, 404)
+
+    def test_offload_to_front_proxy(self):
+        name = default_storage.save('items/test/shirt.png', ContentFile(self.body))
+
+        with override_settings(MEDIA_SERVE_MODE='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/'):
+            response = self.client.get(f'/media/{name}', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 200)  # the proxy handles the range
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('immutable', response['Cache-Control'])
+
+        with override_settings(MEDIA_SERVE_MODE='x-sendfile'):
+            response = self.client.get(f'/media/{name}')
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, name))
+
+
+class ListConditionalRequestTests(TestCase):
+    """List ETags follow ListingVersion, which every write affecting a listing bumps on commit"""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item = make_item(self.owner)
+            make_item(self.owner, title='Other')
+        self.etag = self.client.get('/api/items/')['ETag']
+
+    def assertListChanged(self, changed=True):
+        response = self.client.get('/api/items/', HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 200 if changed else 304)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_not_modified(self):
+        self.assertListChanged(False)
+        with query_budget(1):  # the ListingVersion lookup only
+            self.client.get('/api/items/', HTTP_IF_NONE_MATCH=self.etag)
+
+    def test_if_match_precondition(self):
+        self.assertEqual(self.client.get('/api/items/', HTTP_IF_MATCH='"stale"').status_code, 412)
+        self.assertEqual(self.client.get('/api/items/', HTTP_IF_MATCH=self.etag).status_code, 200)
+
+    def test_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.delete()
+        self.assertListChanged()
+
+    def test_owner_renamed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.username = 'renamed'
+            self.owner.save()
+        self.assertListChanged()
+
+    def test_bulk_update_through_the_admin(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass12345'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/admin/items/item/', {
+                'action': 'unfeature_items', '_selected_action': [self.item.pk],
+            })
+        self.client.logout()
+        self.assertListChanged()
+
+    def test_login_does_not_change_listings(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.force_login(self.owner)
+        self.client.logout()
+        self.assertListChanged(False)
+
+    def test_profile_edits_and_new_users_do_not_change_listings(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.location = 'Lisbon'
+            self.owner.save()
+            User.objects.get(pk=self.owner.pk).save()
+            User.objects.create_user(username='new', email='new@example.com', password='pass12345')
+        self.assertListChanged(False)
+
+    def test_points_of_a_listed_owner(self):
+        owner = User.objects.get(pk=self.owner.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            owner.add_points(5)
+        self.assertListChanged()
+
+    def test_like_changes_the_list_but_not_updated_at(self):
+        updated_at = self.item.updated_at
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=bearer(User.objects.create_user(
+            username='fan', email='fan@example.com', password='pass12345'
+        )))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.post(f'/api/items/{self.item.pk}/like/').status_code, 200)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.like_count, 1)
+        self.assertEqual(self.item.updated_at, updated_at)
+        self.assertListChanged()
+
+    def test_version_is_spread_over_shards(self):
+        before = ListingVersion.current()
+        for key in range(ListingVersion.SHARDS * 2):
+            ListingVersion.bump(key)
+        self.assertEqual(ListingVersion.current(), before + ListingVersion.SHARDS * 2)
+        self.assertEqual(ListingVersion.objects.count(), ListingVersion.SHARDS)
+
+
+class AnonymousCacheTests(TestCase):
+    """Anonymous listings are cached; requests with credentials bypass the cache and writes purge it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        cls.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='pass12345')
+        cls.item = make_item(cls.owner, title='Cached')
+        ItemLike.objects.create(user=cls.viewer, item=cls.item)
+        Item.objects.filter(pk=cls.item.pk).update(like_count=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, client=None, **headers):
+        return (client or Client()).get('/api/items/', **headers)
+
+    def test_anonymous_lists_are_cached(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+    def test_credentials_bypass_the_cache(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')  # an anonymous copy is cached now
+
+        response = self.get(HTTP_AUTHORIZATION=bearer(self.viewer))
+        self.assertNotIn('X-Cache', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertTrue(response.json()['results'][0]['is_liked'])
+
+        session = Client()
+        session.force_login(self.viewer)
+        response = self.get(session)
+        self.assertNotIn('X-Cache', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_responses_to_credentials_are_not_stored(self):
+        self.get(HTTP_AUTHORIZATION=bearer(self.viewer))
+        session = Client()
+        session.force_login(self.viewer)
+        self.get(session)
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_writes_purge_the_listing(self):
+        self.get()
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+        client = authenticated_client(self.viewer)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/items/', {
+                'title': 'Just listed', 'description': 'desc', 'category': 'tops', 'size': 'M',
+                'condition': 'good', 'point_value': 10,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Just listed', [item['title'] for item in response.json()['results']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'/api/items/{self.item.pk}/like/')  # unlike
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        likes = {item['title']: item['like_count'] for item in response.json()['results']}
+        self.assertEqual(likes['Cached'], 0)
+
+
+class SyncViewPoolTests(SimpleTestCase):
+    """PooledASGIHandler bounds concurrent sync views and reuses its threads"""
+
+    def make_pool(self, threads, queue_limit=0):
+        pool = handlers.SyncViewPool(threads, queue_limit)
+        self.addCleanup(pool.executor.shutdown)
+        return pool
+
+    def test_concurrency_is_bounded(self):
+        pool = self.make_pool(2)
+        lock, running, peak = threading.Lock(), [0], [0]
+
+        def view(request):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return threading.get_ident()
+
+        async def burst():
+            return await asyncio.gather(*(pool.wrap(view)(None) for _ in range(6)))
+
+        threads = asyncio.run(burst())
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(len(set(threads)), 2)  # the same two threads served all six
+        snapshot = pool.snapshot()
+        self.assertEqual(snapshot['completed'], 6)
+        self.assertGreaterEqual(snapshot['peak_waiting'], 4)
+
+    def test_stock_django_starts_a_thread_per_request(self):
+        # what the pool replaces: sync views under ASGIHandler, one ThreadSensitiveContext per request
+        async def request():
+            async with ThreadSensitiveContext():
+                return await sync_to_async(threading.get_ident)()
+
+        async def burst():
+            return await asyncio.gather(*(request() for _ in range(3)))
+
+        self.assertEqual(len(set(asyncio.run(burst()))), 3)
+
+    def test_queue_limit_turns_requests_away(self):
+        pool = self.make_pool(1, queue_limit=1)
+        release = threading.Event()
+
+        def view(request):
+            release.wait(5)
+            return 'done'
+
+        async def burst():
+            first = asyncio.ensure_future(pool.wrap(view)(None))
+            second = asyncio.ensure_future(pool.wrap(view)(None))
+            await asyncio.sleep(0.05)
+            rejected = await pool.wrap(view)(None)
+            release.set()
+            return await first, await second, rejected
+
+        first, second, rejected = asyncio.run(burst())
+        self.assertEqual((first, second), ('done', 'done'))
+        self.assertEqual(rejected.status_code, 503)
+        self.assertEqual(rejected['Retry-After'], '1')
+        self.assertEqual(pool.snapshot()['rejected'], 1)
+
+    def test_handler_serves_sync_views_from_the_pool(self):
+        handler = handlers.PooledASGIHandler(threads=2, queue_limit=0)
+        self.addCleanup(handler.pool.executor.shutdown)
+
+        async def get(path, method='GET'):
+            communicator = ApplicationCommunicator(handler, {
+                'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+                'headers': [(b'host', b'testserver')], 'server': ('testserver', 80),
+            })
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(5)
+            body = await communicator.receive_output(5)
+            return start['status'], body['body']
+
+        status, body = asyncio.run(get('/api/items/categories/'))
+        self.assertEqual(status, 200)
+        self.assertIn('categories', json.loads(body))
+        self.assertEqual(handler.pool.snapshot()['completed'], 1)
+
+        if settings.ASYNC_READ_VIEWS:
+            # an async read endpoint sends writes to its DRF view, on the pool too
+            status, body = asyncio.run(get('/api/items/', method='POST'))
+            self.assertEqual(status, 401)
+            self.assertEqual(handler.pool.snapshot()['completed'], 2)
+
+
+@skipUnless(settings.ASYNC_READ_VIEWS, 'async read views are not routed')
+class AsyncReadParityTests(TestCase):
+    """The async read endpoints answer exactly what the DRF views behind them do, errors included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        cls.viewer = User.objects.create_user(username='viewer', email='viewer@example.com', password='pass12345')
+        cls.items = [make_item(cls.owner, title=f'Denim {number}', tags='denim') for number in range(3)]
+        cls.items[0].is_featured = True
+        cls.items[0].save()
+        ItemLike.objects.create(user=cls.viewer, item=cls.items[1])
+
+    def setUp(self):
+        cache.clear()
+
+    async def assertParity(self, path, user=None, headers=None, ignore=()):
+        headers = dict(headers or {})
+        if user is not None:
+            headers['Authorization'] = bearer(user)
+        response = await self.async_client.get(path, headers=headers)
+        expected = await sync_to_async(sync_view_response)(path, headers)
+        self.assertEqual(response.status_code, expected.status_code, response.content)
+        self.assertEqual(response.get('ETag'), expected.get('ETag'))
+        self.assertEqual(response.get('WWW-Authenticate'), expected.get('WWW-Authenticate'))
+        if expected.content:
+            actual, wanted = json.loads(response.content), json.loads(expected.content)
+            for data in (actual, wanted):
+                for key in ignore:
+                    data.pop(key, None)
+            self.assertEqual(actual, wanted)
+        return response
+
+    async def test_lists(self):
+        for user in (None, self.viewer):
+            await self.assertParity('/api/items/', user)
+            await self.assertParity('/api/items/?page_size=2&page=2', user)
+            await self.assertParity('/api/items/?ordering=-like_count&fields=id,title,is_liked', user)
+            await self.assertParity('/api/items/search/?q=denim&sort_by=oldest', user)
+            await self.assertParity('/api/items/featured/?limit=2', user)
+
+    async def test_detail(self):
+        for user in (None, self.viewer, self.owner):
+            # every read counts a view, so the two answers differ by one there
+            await self.assertParity(f'/api/items/{self.items[1].pk}/', user, ignore=('view_count',))
+
+    async def test_conditional_get(self):
+        etag = (await self.assertParity('/api/items/', self.viewer))['ETag']
+        response = await self.assertParity('/api/items/', self.viewer, {'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_error_paths(self):
+        await self.assertParity('/api/items/?page=99')  # invalid page
+        await self.assertParity('/api/items/999999/')  # not found
+        await self.assertParity('/api/items/', headers={'Authorization': 'Bearer not-a-token'})
+
+        gone = await User.objects.acreate(username='gone', email='gone@example.com')
+        token = bearer(gone)
+        await gone.adelete()
+        response = await self.assertParity('/api/items/', headers={'Authorization': token})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(json.loads(response.content)['code'], 'user_not_found')
+
+        inactive = await User.objects.acreate(username='inactive', email='inactive@example.com', is_active=False)
+        response = await self.assertParity('/api/items/', inactive)
+        self.assertEqual(json.loads(response.content)['code'], 'user_inactive')
+
+
+@override_settings(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=200, ANON_CACHE_ENABLED=False)
+class CompressionTests(TestCase):
+    """Responses are compressed, with GZipMiddleware's BREACH padding when the request has credentials"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        for number in range(5):
+            make_item(cls.user, title=f'Item {number}')
+
+    def get(self, path='/api/items/', encoding='gzip', **headers):
+        return self.client.get(path, HTTP_ACCEPT_ENCODING=encoding, **headers)
+
+    def test_anonymous(self):
+        identity = self.get(encoding='identity')
+        response = self.get()
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+        self.assertEqual(response['ETag'], 'W/' + identity['ETag'])
+
+    def test_credentialed_requests_are_padded(self):
+        authorization = bearer(self.user)
+        responses = [self.get(HTTP_AUTHORIZATION=authorization) for _ in range(5)]
+        for response in responses:
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertTrue(response.content[3] & gzip.FNAME)  # random length file name
+        self.assertEqual(len({gzip.decompress(response.content) for response in responses}), 1)
+        self.assertGreater(len({len(response.content) for response in responses}), 1)
+
+    def test_credentialed_requests_never_get_brotli(self):
+        with mock.patch('rewear.middleware.ENCODINGS', ('br', 'gzip')):
+            response = self.get(encoding='br', HTTP_AUTHORIZATION=bearer(self.user))
+        self.assertNotIn('Content-Encoding', response)
+
+    async def test_compressed_off_the_event_loop(self):
+        # in async mode, i.e. once everything inside it is async capable
+        async def view(request):
+            return HttpResponse(json.dumps({'data': 'x' * 1000}), content_type='application/json')
+
+        def compress_off_loop(*args, **kwargs):
+            with self.assertRaises(RuntimeError):
+                asyncio.get_running_loop()
+            return compress(*args, **kwargs)
+
+        middleware = CompressionMiddleware(view)
+        self.assertTrue(middleware.async_mode)
+        request = RequestFactory().get('/', headers={'Accept-Encoding': 'gzip'})
+        with mock.patch('rewear.middleware.compress', side_effect=compress_off_loop) as patched:
+            response = await middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        patched.assert_called_once()
+
+    @override_settings(COMPRESSION_ENABLED=False)
+    def test_disabled(self):
+        self.assertNotIn('Content-Encoding', self.get())
+        categories = self.get('/api/items/categories/')
+        self.assertNotIn('Content-Encoding', categories)
+        self.assertIn('categories', categories.json())
+
+
+class ORJSONRendererParserTests(SimpleTestCase):
+    """ORJSONRenderer/ORJSONParser behave exactly like DRF's JSONRenderer/JSONParser"""
+
+    def assertSameOutput(self, data):
+        expected = JSONRenderer().render(data)
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+        return expected
+
+    def test_datetimes(self):
+        moment = datetime(2025, 7, 1, 12, 30, 15, 123456)
+        self.assertEqual(
+            json.loads(self.assertSameOutput({
+                'utc': moment.replace(tzinfo=dt_timezone.utc),
+                'offset': moment.replace(tzinfo=dt_timezone(timedelta(hours=2))),
+                'naive': moment,
+                'date': moment.date(),
+                'time': moment.time(),
+                'duration': timedelta(minutes=5),
+            })),
+            {
+                'utc': '2025-07-01T12:30:15.123456Z',
+                'offset': '2025-07-01T12:30:15.123456+02:00',
+                'naive': '2025-07-01T12:30:15.123456',
+                'date': '2025-07-01',
+                'time': '12:30:15.123456',
+                'duration': '300.0',
+            },
+        )
+
+    def test_lazy_strings_uuids_and_decimals(self):
+        self.assertSameOutput({
+            'label': gettext_lazy('Available'),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'raw': Decimal('12.50'),
+            'separators': 'a b c',
+        })
+
+    def test_decimal_fields_follow_coerce_decimal_to_string(self):
+        class PriceSerializer(serializers.Serializer):
+            price = serializers.DecimalField(max_digits=6, decimal_places=2)
+
+        data = PriceSerializer({'price': Decimal('9.5')}).data
+        self.assertEqual(self.assertSameOutput(data), b'{"price":"9.50"}')
+
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'COERCE_DECIMAL_TO_STRING': False}):
+            data = PriceSerializer({'price': Decimal('9.5')}).data
+        self.assertEqual(self.assertSameOutput(data), b'{"price":9.5}')
+
+    def test_non_finite_numbers_raise(self):
+        for value in (float('nan'), float('inf'), Decimal('NaN')):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                ORJSONRenderer().render({'results': [{'score': value, 'note': None}]})
+        self.assertEqual(ORJSONRenderer().render({'score': 1.5, 'note': None}), b'{"score":1.5,"note":null}')
+
+    def test_parser(self):
+        body = '{"title": "Jacke ü", "count": 2, "price": 9.5, "tags": [null, true]}'.encode()
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+
+    def test_malformed_body_is_a_parse_error(self):
+        for body in (b'{"title": ', b'{"score": NaN}', b'\xff'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
+
+    def test_malformed_request_gets_400(self):
+        response = APIClient().post('/api/users/register/', b'{"username": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
@@ -21,6 +21,13 @@ DELETE /api/items/{id}/               - Delete item (owner only)
 ❤️ ENGAGEMENT
 POST   /api/items/{id}/like/          - Toggle like/favorite status (requires auth)
 
+📤 RESUMABLE IMAGE UPLOADS (owner only)
+POST   /api/items/{id}/upload-sessions/        - Start an upload session
+GET    /api/items/uploads/{upload_id}/         - Session state (received_bytes to resume from)
+PUT    /api/items/uploads/{upload_id}/         - Upload a chunk (Content-Range: bytes start-end/total)
+DELETE /api/items/uploads/{upload_id}/         - Abort the upload
+POST   /api/items/uploads/{upload_id}/finalize/ - Create the ItemImage from the uploaded bytes
+
 🔍 SEARCH PARAMETERS (for /api/items/ and /api/items/search/)
 - search: Text search in title, description, tags, brand
 - category: Filter by category (tops, bottoms, dresses, etc.)
@@ -37,23 +44,40 @@ POST   /api/items/{id}/like/          - Toggle like/favorite status (requires au
 GET /api/items/?category=tops&ordering=-like_count&page=1&page_size=12
 GET /api/items/search/?q=vintage&category=dresses&min_points=5&max_points=20
 POST /api/items/{id}/like/
+
+⚡ ASYNC_READ_VIEWS=True serves GET on /, /{id}/, /featured/ and /search/
+from native async views (items/async_views.py); other methods still go
+to ItemViewSet.
 """
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ItemViewSet, report_item
+from .async_views import item_detail, item_featured, item_list, item_search
+from .views import ItemViewSet, report_item, upload_session_detail, finalize_upload_session
 
 # Auto-generate RESTful URLs for the ItemViewSet
 router = DefaultRouter()
 router.register('', ItemViewSet, basename='item')
 
 urlpatterns = [
+    path('uploads/<uuid:upload_id>/', upload_session_detail, name='upload_session_detail'),
+    path('uploads/<uuid:upload_id>/finalize/', finalize_upload_session, name='finalize_upload_session'),
     path('', include(router.urls)),
    # path('')
     path('items/report/', report_item, name='report_item')
 
 ]
 
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        # same names as the router's, so reverse() and REQUEST_BUDGETS don't change
+        path('', item_list, name='item-list'),
+        path('featured/', item_featured, name='item-featured'),
+        path('search/', item_search, name='item-advanced-search'),
+        path('<int:pk>/', item_detail, name='item-detail'),
+    ] + urlpatterns
+
 # Generated URL patterns:
 # /api/items/                     -> ItemViewSet.list()
 # /api/items/create/              -> ItemViewSet.create() 
@@ -69,4 +93,5 @@ urlpatterns = [
 # /api/items/stats/               -> ItemViewSet.stats()
 # /api/items/search/              -> ItemViewSet.advanced_search()
 # /api/items/{id}/like/           -> ItemViewSet.like()
+# /api/items/{id}/upload-sessions/ -> ItemViewSet.create_upload_session()
 
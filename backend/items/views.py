@@ -1,14 +1,34 @@
+import os
+import re
+import shutil
+import tempfile
+
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from django.core.paginator import InvalidPage
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.core.files import File
+from django.db import transaction
 from django.db.models import Q, F
 from django.conf import settings
-from .models import Item, ItemLike, ItemImage, PlatformConfig
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from rewear.async_api import json_response
+from rewear.compression import PrecompressedPayload
+from rewear.conditional import make_etag, not_modified, set_validators, user_stamp
+from rewear.db_routers import ReplicaReadMixin
+from rewear.fieldsets import SparseQuerysetMixin
+from rewear.metrics import record_event
+from rewear.profiling import ProfiledViewMixin
+from .models import Item, ItemLike, ItemImage, PlatformConfig, ImageUploadSession, ListingVersion
+from .projections import ItemListProjection
 from .serializers import (
     ItemListSerializer, ItemDetailSerializer, 
-    ItemCreateUpdateSerializer, CategorySerializer, ItemReportCreateSerializer, ItemStatsSerializer
+    ItemCreateUpdateSerializer, CategorySerializer, ItemReportCreateSerializer, ItemStatsSerializer,
+    ImageUploadSessionSerializer
 )
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
@@ -38,6 +58,40 @@ class ItemPagination(PageNumberPagination):
             }
         })
 
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for the async read views (count and page via the async ORM)"""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+def _category_choices():
+    return {
+        'categories': [
+            {'value': choice[0], 'label': choice[1]} 
+            for choice in Item.Category.choices
+        ],
+        'conditions': [
+            {'value': choice[0], 'label': choice[1]} 
+            for choice in Item.Condition.choices
+        ]
+    }
+
+
+CATEGORIES_PAYLOAD = PrecompressedPayload(_category_choices, max_age=3600)
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """Custom permission: object owner can edit, others can only read"""
     def has_object_permission(self, request, view, obj):
@@ -48,7 +102,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
             return False
         return obj.owner == request.user
 
-class ItemViewSet(viewsets.ModelViewSet):
+class ItemViewSet(ProfiledViewMixin, ReplicaReadMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     🧥 ITEMS API - Complete clothing item management
     
@@ -64,14 +118,23 @@ class ItemViewSet(viewsets.ModelViewSet):
     search_fields = ['title', 'description', 'tags', 'brand', 'color']
     ordering_fields = ['created_at', 'view_count', 'like_count', 'point_value']
     ordering = ['-created_at']
+    
+    # ⚡ Read-only list actions served by ItemListProjection instead of
+    # ItemListSerializer (same output, a fixed number of queries per page)
+    projection_actions = {'list', 'advanced_search', 'my_items', 'featured'}
+    
+    # 🪶 ?fields= / ?omit= - related lookups are skipped when none of
+    # the fields that need them were requested
+    sparse_select_related = {'owner': ('owner', 'can_edit', 'can_swap_request')}
+    sparse_prefetch_related = {'images': ('images',)}
 
     def get_queryset(self):
         """Base queryset - all available items (auto-approved, excluding flagged ones)"""
-        return Item.objects.filter(
+        return self.with_related(Item.objects.filter(
             is_approved=True,
             is_flagged=False, 
             status='available'
-        ).select_related('owner').prefetch_related('images')
+        ))
 
     def get_serializer_class(self):
         """Choose appropriate serializer based on action"""
@@ -82,6 +145,97 @@ class ItemViewSet(viewsets.ModelViewSet):
         else:
             return ItemDetailSerializer
 
+    def liked_queryset(self, item_id):
+        """The current user's like of an item, None for anonymous users"""
+        if not self.request.user.is_authenticated:
+            return None
+        return ItemLike.objects.filter(user=self.request.user, item_id=item_id)
+
+    def is_liked(self, item_id):
+        liked = self.liked_queryset(item_id)
+        return liked is not None and liked.exists()
+
+    def detail_etag(self, item_id, updated_at, like_count, owner_points, is_liked):
+        """
+        Version stamp for a single item. view_count is left out on purpose:
+        it changes on every view and would make the ETag useless.
+        """
+        selection = self.get_field_selection()
+        if not selection.wants('owner'):
+            owner_points = None  # not in the representation, not loaded
+        return make_etag(
+            'item', item_id, updated_at, like_count, owner_points,
+            user_stamp(self.request), is_liked, selection.stamp
+        )
+
+    def detail_stamp(self, pk):
+        """Single-row query with everything detail_etag() needs"""
+        return self.get_queryset().filter(pk=pk).values(
+            'id', 'updated_at', 'like_count', 'owner__points'
+        )
+
+    def list_etag(self, version):
+        """
+        ETag for a list page: the ListingVersion plus what else the page
+        depends on (query string, viewer). No Last-Modified: there is no
+        timestamp that also moves when items are deleted or leave the list.
+        """
+        return make_etag('items', version, self.request.get_full_path(), user_stamp(self.request))
+
+    def get_list_projection(self):
+        """Projection fast path for this action, or None to use ItemListSerializer"""
+        if self.action in self.projection_actions:
+            return ItemListProjection(self.request)
+        return None
+
+    def serialize_list(self, items, projection=None):
+        """List payload from model instances, or from projected rows when a projection is given"""
+        if projection is not None:
+            return projection.build(items)
+        return ItemListSerializer(items, many=True, context={'request': self.request}).data
+
+    def list_response(self, queryset):
+        """Paginated list with conditional GET support"""
+        etag = self.list_etag(ListingVersion.current())
+        response = not_modified(self.request, etag)
+        if response is not None:
+            return response
+        
+        projection = self.get_list_projection()
+        if projection is not None:
+            queryset = projection.values(queryset)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(self.serialize_list(page, projection))
+        else:
+            response = Response(self.serialize_list(queryset, projection))
+        return set_validators(response, etag)
+
+    async def alist_response(self, queryset):
+        """list_response() for the async read views (items/async_views.py)"""
+        etag = self.list_etag(await ListingVersion.acurrent())
+        response = not_modified(self.request, etag)
+        if response is not None:
+            return response
+        
+        projection = self.get_list_projection()
+        page = await self.paginator.apaginate_queryset(projection.values(queryset), self.request, self)
+        if page is not None:
+            data = self.get_paginated_response(await projection.abuild(page)).data
+        else:
+            data = await projection.abuild([row async for row in projection.values(queryset)])
+        return set_validators(json_response(data), etag)
+
+    def list(self, request, *args, **kwargs):
+        """
+        📋 GET /api/items/
+        
+        Paginated list of available items. Supports If-None-Match and
+        answers 304 without serializing when the page has not changed.
+        """
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
     def retrieve(self, request, *args, **kwargs):
         """
         📱 GET /api/items/{id}/
@@ -95,7 +249,26 @@ class ItemViewSet(viewsets.ModelViewSet):
         - Owner information
         - Like status for authenticated users
         - Swap eligibility
+        
+        Sends ETag / Last-Modified. Conditional requests are checked against
+        a single-row version stamp and answered with 304 before the item is
+        loaded or serialized.
         """
+        if request.headers.get('If-None-Match') or request.headers.get('If-Modified-Since'):
+            try:
+                stamp = self.detail_stamp(kwargs[self.lookup_field]).first()
+            except (TypeError, ValueError):
+                stamp = None  # let get_object() produce the 404
+            if stamp:
+                etag = self.detail_etag(
+                    stamp['id'], stamp['updated_at'], stamp['like_count'], stamp['owner__points'],
+                    self.is_liked(stamp['id'])
+                )
+                response = not_modified(request, etag, stamp['updated_at'])
+                if response is not None:
+                    Item.objects.filter(id=stamp['id']).update(view_count=F('view_count') + 1)
+                    return response
+        
         instance = self.get_object()
         
         # Increment view count (non-blocking)
@@ -104,8 +277,15 @@ class ItemViewSet(viewsets.ModelViewSet):
         except:
             pass  # Don't fail if view count update fails
             
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        is_liked = self.is_liked(instance.id)
+        serializer = self.get_serializer(
+            instance, context={**self.get_serializer_context(), 'liked_ids': {instance.id} if is_liked else set()}
+        )
+        owner_points = instance.owner.points if self.get_field_selection().wants('owner') else None
+        etag = self.detail_etag(
+            instance.id, instance.updated_at, instance.like_count, owner_points, is_liked
+        )
+        return set_validators(Response(serializer.data), etag, instance.updated_at)
 
     @action(detail=False, methods=['get'], url_path='featured', permission_classes=[permissions.AllowAny])
     def featured(self, request):
@@ -132,49 +312,58 @@ class ItemViewSet(viewsets.ModelViewSet):
         """
         # Get admin-configured default count
         config = PlatformConfig.get_config()
-        default_count = config.featured_items_count
+        limit = self.featured_limit(config.featured_items_count)
         
-        # Get number of items requested (default from admin config, max 20 for performance)
-        try:
-            limit = int(request.query_params.get('limit', default_count))
-            limit = min(max(limit, 1), settings.FEATURED_ITEMS_MAX_COUNT)  # Clamp between 1 and max
-        except (ValueError, TypeError):
-            limit = default_count
+        projection = self.get_list_projection()
+        prepare = projection.values if projection else (lambda queryset: queryset)
         
-        # Step 1: Get admin-featured items first (curated by admin)
-        admin_featured = self.get_queryset().filter(is_featured=True).order_by('-created_at')
-        
-        # Step 2: If we need more items, get most liked items (algorithmic)
+        admin_featured, most_liked = self.featured_querysets()
         featured_count = admin_featured.count()
         
         if featured_count < limit:
-            # Get most liked items that aren't already admin-featured
-            most_liked = self.get_queryset().exclude(
-                id__in=admin_featured.values_list('id', flat=True)
-            ).order_by('-like_count', '-view_count', '-created_at')
-            
             # Combine admin featured + most liked to get requested amount
             remaining_needed = limit - featured_count
-            additional_items = most_liked[:remaining_needed]
-            
-            # Combine the querysets
-            featured_items = list(admin_featured) + list(additional_items)
+            featured_items = list(prepare(admin_featured)) + list(prepare(most_liked[:remaining_needed]))
         else:
             # We have enough admin-featured items, just take the requested amount
-            featured_items = admin_featured[:limit]
+            featured_items = prepare(admin_featured[:limit])
         
-        serializer = ItemListSerializer(featured_items, many=True, context={'request': request})
-        return Response({
-            'results': serializer.data,
-            'count': len(featured_items),
+        return Response(self.featured_payload(
+            self.serialize_list(featured_items, projection), featured_count, limit
+        ))
+
+    def featured_limit(self, default_count):
+        """Number of items requested (default from admin config, max 20 for performance)"""
+        try:
+            limit = int(self.request.query_params.get('limit', default_count))
+            return min(max(limit, 1), settings.FEATURED_ITEMS_MAX_COUNT)  # Clamp between 1 and max
+        except (ValueError, TypeError):
+            return default_count
+
+    def featured_querysets(self):
+        """
+        Step 1: admin-featured items first (curated by admin)
+        Step 2: most liked items that aren't already admin-featured, to fill
+        the remaining slots (algorithmic)
+        """
+        admin_featured = self.get_queryset().filter(is_featured=True).order_by('-created_at')
+        most_liked = self.get_queryset().exclude(
+            id__in=admin_featured.values_list('id', flat=True)
+        ).order_by('-like_count', '-view_count', '-created_at')
+        return admin_featured, most_liked
+
+    def featured_payload(self, results, featured_count, limit):
+        return {
+            'results': results,
+            'count': len(results),
             'limit': limit,
             'strategy': {
                 'admin_featured': min(featured_count, limit),
                 'algorithmic_popular': max(0, limit - featured_count),
-                'total': len(featured_items)
+                'total': len(results)
             },
             'message': f'Featured items (admin curated + popular fallback)'
-        })
+        }
 
     @action(detail=False, methods=['get'], url_path='my', permission_classes=[permissions.IsAuthenticated])
     def my_items(self, request):
@@ -189,15 +378,8 @@ class ItemViewSet(viewsets.ModelViewSet):
         - Approval status
         - Edit capabilities
         """
-        user_items = Item.objects.filter(owner=request.user).prefetch_related('images')
-        page = self.paginate_queryset(user_items)
-        
-        if page is not None:
-            serializer = ItemListSerializer(page, many=True, context={'request': request})
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = ItemListSerializer(user_items, many=True, context={'request': request})
-        return Response(serializer.data)
+        user_items = self.with_related(Item.objects.filter(owner=request.user))
+        return self.list_response(user_items)
 
     @action(detail=False, methods=['get'], url_path='categories')
     def categories(self, request):
@@ -207,22 +389,15 @@ class ItemViewSet(viewsets.ModelViewSet):
         Get all available item categories for frontend dropdowns.
         Returns category choices with values and display labels.
         
+        The choices only change with a deploy, so the body is rendered and
+        gzip/brotli compressed once and served from memory.
+        
         Perfect for:
         - Category dropdown in forms
         - Filter options
         - Category navigation
         """
-        categories = [
-            {'value': choice[0], 'label': choice[1]} 
-            for choice in Item.Category.choices
-        ]
-        return Response({
-            'categories': categories,
-            'conditions': [
-                {'value': choice[0], 'label': choice[1]} 
-                for choice in Item.Condition.choices
-            ]
-        })
+        return CATEGORIES_PAYLOAD.response(request)
 
     @action(detail=False, methods=['get'], url_path='stats')
     def stats(self, request):
@@ -276,8 +451,9 @@ class ItemViewSet(viewsets.ModelViewSet):
             liked = False
         else:
             liked = True
+        record_event('item_liked' if liked else 'item_unliked')
         
-        # Update like count
+        # Update like count (detail ETags include it, list ETags follow ListingVersion)
         item.like_count = item.likes.count()
         item.save(update_fields=['like_count'])
         
@@ -331,6 +507,7 @@ class ItemViewSet(viewsets.ModelViewSet):
         # If this is set as primary, remove primary status from other images
         if item_image.is_primary:
             ItemImage.objects.filter(item=item).exclude(id=item_image.id).update(is_primary=False)
+        item.touch()
         
         return Response({
             'id': item_image.id,
@@ -341,6 +518,42 @@ class ItemViewSet(viewsets.ModelViewSet):
             'message': 'Image uploaded successfully'
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated],
+            url_path='upload-sessions')
+    def create_upload_session(self, request, pk=None):
+        """
+        📤 POST /api/items/{id}/upload-sessions/
+        
+        Start a resumable image upload. Only item owner can upload images.
+        
+        Request Body:
+        - filename: Original file name (required, must be an image extension)
+        - total_size: File size in bytes (required)
+        - alt_text / is_primary / order: Same as upload-image (optional)
+        
+        Response: Upload session with upload_url and received_bytes.
+        Send the file with PUT requests to upload_url, then POST to
+        upload_url + 'finalize/' to turn it into an item image.
+        """
+        item = self.get_object()
+        
+        if item.owner != request.user:
+            return Response(
+                {'error': 'You can only upload images to your own items'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = ImageUploadSessionSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(item=item, owner=request.user)
+        ImageUploadSession.purge_if_due()
+        
+        # Pre-create the partial file so chunks can be written at any offset
+        os.makedirs(settings.IMAGE_UPLOAD_TEMP_DIR, exist_ok=True)
+        open(session.partial_path, 'wb').close()
+        
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'], url_path='search')
     def advanced_search(self, request):
         """
@@ -360,10 +573,15 @@ class ItemViewSet(viewsets.ModelViewSet):
         
         Example: /api/items/search/?q=vintage&category=tops&sort=popular
         """
-        queryset = self.get_queryset()
+        # Paginate results
+        return self.list_response(self.search_queryset(self.get_queryset()))
+
+    def search_queryset(self, queryset):
+        """Apply the advanced_search() filters and sort option to `queryset`"""
+        params = self.request.query_params
         
         # Text search
-        search_query = request.query_params.get('q', '')
+        search_query = params.get('q', '')
         if search_query:
             queryset = queryset.filter(
                 Q(title__icontains=search_query) |
@@ -374,32 +592,32 @@ class ItemViewSet(viewsets.ModelViewSet):
             )
         
         # Filters
-        category = request.query_params.get('category')
+        category = params.get('category')
         if category:
             queryset = queryset.filter(category=category)
             
-        condition = request.query_params.get('condition')
+        condition = params.get('condition')
         if condition:
             queryset = queryset.filter(condition=condition)
             
-        size = request.query_params.get('size')
+        size = params.get('size')
         if size:
             queryset = queryset.filter(size__iexact=size)
             
-        color = request.query_params.get('color')
+        color = params.get('color')
         if color:
             queryset = queryset.filter(color__icontains=color)
         
         # Point range
-        min_points = request.query_params.get('min_points')
-        max_points = request.query_params.get('max_points')
+        min_points = params.get('min_points')
+        max_points = params.get('max_points')
         if min_points:
             queryset = queryset.filter(point_value__gte=min_points)
         if max_points:
             queryset = queryset.filter(point_value__lte=max_points)
         
         # Sorting
-        sort_option = request.query_params.get('sort', 'newest')
+        sort_option = params.get('sort', 'newest')
         sort_mapping = {
             'newest': '-created_at',
             'oldest': 'created_at',
@@ -412,14 +630,7 @@ class ItemViewSet(viewsets.ModelViewSet):
         if sort_option in sort_mapping:
             queryset = queryset.order_by(sort_mapping[sort_option])
         
-        # Paginate results
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = ItemListSerializer(page, many=True, context={'request': request})
-            return self.get_paginated_response(serializer.data)
-            
-        serializer = ItemListSerializer(queryset, many=True, context={'request': request})
-        return Response(serializer.data)
+        return queryset
 
     def create(self, request, *args, **kwargs):
         """
@@ -496,7 +707,7 @@ def report_item(request):
 
     # enforce unique_together: one report per user per item
     report, created = ItemReport.objects.get_or_create(
-        item_id=serializer.validated_data['item'],
+        item=serializer.validated_data['item'],
         reported_by=request.user,
         defaults={'reason': serializer.validated_data['reason']},
     )
@@ -507,3 +718,180 @@ def report_item(request):
         )
 
     return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+UPLOAD_READ_SIZE = 64 * 1024
+
+
+def receive_chunk(stream, expected):
+    """Read up to `expected` body bytes into a temporary file; returns (file, bytes received)"""
+    spool = tempfile.TemporaryFile(dir=settings.IMAGE_UPLOAD_TEMP_DIR)
+    received = 0
+    while stream is not None and received < expected:
+        chunk = stream.read(min(UPLOAD_READ_SIZE, expected - received))
+        if not chunk:
+            break
+        spool.write(chunk)
+        received += len(chunk)
+    spool.seek(0)
+    return spool, received
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_session_detail(request, upload_id):
+    """
+    📤 /api/items/uploads/{upload_id}/
+    
+    GET    - Current session state (use received_bytes to resume)
+    PUT    - Upload a chunk. Raw bytes in the body with a header like
+             `Content-Range: bytes 0-1048575/5242880`. The first byte must
+             equal received_bytes, otherwise 409 is returned with the
+             offset the client should resume from.
+    DELETE - Abort the upload and discard received bytes
+    """
+    session = get_object_or_404(ImageUploadSession, id=upload_id, owner=request.user)
+    
+    if request.method == 'GET':
+        return Response(ImageUploadSessionSerializer(session, context={'request': request}).data)
+    
+    if request.method == 'DELETE':
+        session.discard()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    match = CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+    if not match:
+        return Response(
+            {'error': 'A Content-Range header like "bytes 0-1023/4096" is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    start, end, total = (int(value) for value in match.groups())
+    
+    if total != session.total_size or end < start or end >= total:
+        return Response(
+            {'error': 'Content-Range does not match the upload session'},
+            status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+    
+    if start != session.received_bytes:
+        return Response({
+            'error': 'Chunk does not start at the next expected byte',
+            'received_bytes': session.received_bytes
+        }, status=status.HTTP_409_CONFLICT)
+    
+    # Receive the body into a file of its own, never holding more than one
+    # read buffer in memory, and no transaction while the client sends it
+    expected = end - start + 1
+    spool, written = receive_chunk(request.stream, expected)
+    
+    # Claim the range, then write it: of two requests for the same offset
+    # only one moves received_bytes on, and only its bytes reach the shared
+    # partial file. The row stays locked until they are written, and a
+    # failed write rolls the claim back. Whatever arrived, even from a
+    # dropped connection, is kept so the client can resume from there.
+    with spool, transaction.atomic():
+        updated = ImageUploadSession.objects.filter(
+            id=session.id, received_bytes=start
+        ).update(received_bytes=start + written, updated_at=timezone.now())
+        if updated and written:
+            with open(session.partial_path, 'r+b') as destination:
+                destination.seek(start)
+                shutil.copyfileobj(spool, destination, UPLOAD_READ_SIZE)
+    session.refresh_from_db()
+    
+    if not updated:
+        return Response({
+            'error': 'Another chunk was uploaded concurrently',
+            'received_bytes': session.received_bytes
+        }, status=status.HTTP_409_CONFLICT)
+    
+    if written < expected:
+        return Response({
+            'error': f'Incomplete chunk: expected {expected} bytes, received {written}',
+            'received_bytes': session.received_bytes
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(ImageUploadSessionSerializer(session, context={'request': request}).data)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finalize_upload_session(request, upload_id):
+    """
+    ✅ POST /api/items/uploads/{upload_id}/finalize/
+    
+    Turn a fully received upload into an ItemImage.
+    
+    Response: Created ItemImage data with image URL (same as upload-image)
+    """
+    session = get_object_or_404(
+        ImageUploadSession.objects.select_related('item'), id=upload_id, owner=request.user
+    )
+    item = session.item
+    
+    # The item may have changed hands (swap, redemption) since the upload started
+    if item.owner_id != request.user.id:
+        session.discard()
+        return Response(
+            {'error': 'You can only upload images to your own items'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    if not session.is_complete:
+        return Response({
+            'error': 'Upload is not complete yet',
+            'received_bytes': session.received_bytes,
+            'total_size': session.total_size
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    with transaction.atomic():
+        # Deleting the row claims the upload: of two concurrent finalizes only
+        # one deletes it, the other gets 409. If creating the image fails the
+        # delete rolls back and the client can finalize again - so the partial
+        # file is copied into storage, and only removed once this commits.
+        claimed, _ = ImageUploadSession.objects.filter(id=session.id).delete()
+        if not claimed:
+            return Response(
+                {'error': 'Upload is already being finalized'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        try:
+            with Image.open(session.partial_path) as img:
+                img.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            session.discard()
+            return Response(
+                {'error': 'Uploaded file is not a valid image'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        item_image = ItemImage(
+            item=item,
+            alt_text=session.alt_text,
+            is_primary=session.is_primary,
+            order=session.order
+        )
+        with open(session.partial_path, 'rb') as fh:
+            item_image.image.save(session.filename, File(fh), save=False)
+        try:
+            item_image.save()
+            
+            # If this is set as primary, remove primary status from other images
+            if item_image.is_primary:
+                ItemImage.objects.filter(item=item).exclude(id=item_image.id).update(is_primary=False)
+            item.touch()
+        except Exception:
+            item_image.image.delete(save=False)  # the copy; the next finalize makes a new one
+            raise
+        transaction.on_commit(session.remove_partial_file)
+    
+    return Response({
+        'id': item_image.id,
+        'image': request.build_absolute_uri(item_image.image.url),
+        'alt_text': item_image.alt_text,
+        'is_primary': item_image.is_primary,
+        'order': item_image.order,
+        'message': 'Image uploaded successfully'
+    }, status=status.HTTP_201_CREATED)
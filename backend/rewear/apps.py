@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+
+
+class RewearConfig(AppConfig):
+    name = 'rewear'
+    verbose_name = 'ReWear platform'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core import checks
+        from django.db.backends.signals import connection_created
+        from . import db, db_routers, instrumentation, stats
+
+        checks.register(db_routers.check_pin_cache, checks.Tags.caches)
+
+        connection_created.connect(db.count_connect)
+        stats.register('databases', db.connection_stats)
+
+        connection_created.connect(instrumentation.install_query_recorder)
+        stats.register('requests', instrumentation.request_stats.snapshot)
+
+        if settings.SLOW_QUERY_MS > 0:
+            from . import slow_queries
+            connection_created.connect(slow_queries.install)
+            stats.register('slow_queries', slow_queries.recorder.snapshot)
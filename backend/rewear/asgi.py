@@ -5,12 +5,23 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+With SYNC_VIEW_THREADS > 0 sync views run on a bounded pool of
+long-lived threads instead of a new thread per request (see
+rewear/handlers.py).
 """
 
 import os
 
+import django
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rewear.settings')
 
-application = get_asgi_application()
+if settings.SYNC_VIEW_THREADS > 0:
+    django.setup(set_prefix=False)
+    from .handlers import PooledASGIHandler
+    application = PooledASGIHandler()
+else:
+    application = get_asgi_application()
@@ -0,0 +1,147 @@
+"""
+Plumbing for native async read endpoints (ASYNC_READ_VIEWS).
+
+DRF views are synchronous, so under ASGI every request ties up a thread
+for its whole lifetime - including the time spent waiting on slow
+clients. `async_read_view` pairs a coroutine serving GET/HEAD with the
+existing DRF view for everything else:
+
+- reads authenticate the JWT in the event loop (only the user lookup
+  touches the database, through the async ORM), reuse the viewset for
+  query building and render with ORJSONRenderer; like ReplicaReadMixin
+  they read from a replica unless the user is pinned to the primary
+- writes, and browsable-API requests from a browser, go to the DRF view
+  unchanged, on the SyncViewPool when PooledASGIHandler serves the app
+
+Read coroutines receive `(request, user, **kwargs)` and must not call
+the sync ORM; build querysets with the viewset helpers and evaluate them
+with `aget()` / `acount()` / `async for`.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .db_routers import aenable_replica_reads, replica_reads
+from .renderers import ORJSONRenderer
+
+_authentication = JWTAuthentication()
+_renderer = ORJSONRenderer()
+
+
+async def authenticate(request):
+    """
+    Async twin of JWTAuthentication.authenticate - returns the user or
+    AnonymousUser. Raises simplejwt's AuthenticationFailed, like the sync
+    one, so error bodies carry the same "code".
+    """
+    header = _authentication.get_header(request)
+    raw_token = _authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return AnonymousUser()
+
+    token = _authentication.get_validated_token(raw_token)
+    try:
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise AuthenticationFailed(
+            'Token contained no recognizable user identification', code='token_not_valid'
+        ) from e
+
+    user_model = _authentication.user_model
+    try:
+        user = await user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+    except user_model.DoesNotExist as e:
+        raise AuthenticationFailed('User not found', code='user_not_found') from e
+
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    if jwt_settings.CHECK_REVOKE_TOKEN and (
+        token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+    ):
+        raise AuthenticationFailed(
+            "The user's password has been changed.", code='password_changed'
+        )
+    return user
+
+
+def read_view(viewset_class, request, user, action, kwargs=None):
+    """
+    A viewset instance for query building only - it is never dispatched,
+    so its filters, pagination and helpers work without DRF's sync
+    request cycle.
+    """
+    drf_request = Request(request, authenticators=())
+    drf_request.user = user
+    # @action(permission_classes=...) etc. apply just as they do through the router
+    initkwargs = getattr(getattr(viewset_class, action, None), 'kwargs', {})
+    view = viewset_class(
+        **initkwargs, request=drf_request, action=action, args=(), kwargs=kwargs or {},
+        format_kwarg=None, headers={}
+    )
+    try:
+        view.check_permissions(drf_request)
+    except exceptions.PermissionDenied:
+        if not user.is_authenticated:
+            raise exceptions.NotAuthenticated()  # DRF answers 401 here, as no credentials were sent
+        raise
+    return view
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(_renderer.render(data), status=status, content_type=_renderer.media_type)
+
+
+def error_response(exc):
+    """The same body and status DRF's exception handler would produce"""
+    if isinstance(exc, Http404):
+        exc = exceptions.NotFound(*exc.args)
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {'detail': exc.detail}
+    response = json_response(data, status=exc.status_code)
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        response.status_code = status.HTTP_401_UNAUTHORIZED
+        response['WWW-Authenticate'] = _authentication.authenticate_header(request=None)
+    return response
+
+
+def wants_browsable_api(request):
+    accept = request.headers.get('Accept', '')
+    return 'text/html' in accept or request.GET.get('format') == 'api'
+
+
+def async_read_view(read, sync_view, run_sync=None):
+    """
+    Serve GET/HEAD with the `read` coroutine and any other request with
+    `sync_view`, called through the `run_sync` coroutine. That defaults
+    to sync_to_async(); PooledASGIHandler passes its SyncViewPool so the
+    fallback shares the pool's thread bound and queue limit.
+    """
+    if run_sync is None:
+        run_sync = sync_to_async(sync_view)
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD') and not wants_browsable_api(request):
+            try:
+                with replica_reads():
+                    user = await authenticate(request)
+                    request.user = user
+                    await aenable_replica_reads(user)
+                    return await read(request, user, *args, **kwargs)
+            except (exceptions.APIException, Http404) as exc:
+                return error_response(exc)
+        return await run_sync(request, *args, **kwargs)
+
+    view.read = read
+    view.sync_view = sync_view
+    return view
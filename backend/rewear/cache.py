@@ -0,0 +1,36 @@
+"""
+Tag-based invalidation for the anonymous response cache.
+
+Every cached response is stored under a key that embeds the current
+version of each of its tags. Purging a tag just gives it a new version,
+so all entries built on the old one stop matching and age out on their
+own TTL - no key scanning needed, and it works the same on LocMem,
+Memcached or Redis.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+TAG_KEY = 'anoncache:tag:{}'
+
+
+def tag_versions(tags):
+    """Current version string for each tag, in the given order"""
+    keys = [TAG_KEY.format(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    return [versions.get(key, '0') for key in keys]
+
+
+def purge_tags(*tags):
+    """
+    Invalidate every cached response carrying any of `tags`.
+
+    Runs after the current transaction commits, so a concurrent request
+    cannot re-cache data that is about to change.
+    """
+    def purge():
+        cache.set_many({TAG_KEY.format(tag): uuid.uuid4().hex for tag in tags}, timeout=None)
+
+    transaction.on_commit(purge)
@@ -0,0 +1,144 @@
+"""
+Content-Encoding negotiation shared by CompressionMiddleware and
+precompressed payloads.
+
+gzip is always available; brotli is used when the `brotli` package is
+installed and the client accepts it.
+
+BREACH: a response that carries a secret (JWTs, CSRF tokens, personal
+data) and reflects attacker-controlled input lets the compressed length
+leak the secret. Responses to requests with credentials are therefore
+compressed the way Django's GZipMiddleware does it: gzip only, with a
+random number of padding bytes in the header so lengths vary between
+identical responses ("Heal the BREACH"). brotli has no such padding and
+is only used for requests without credentials.
+"""
+
+import gzip
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.text import compress_string
+
+from .conditional import make_etag
+from .renderers import ORJSONRenderer
+
+try:
+    import brotli
+except ImportError:  # optional, gzip only
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def accepted_encodings(request):
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def has_credentials(request):
+    """Whether the response may carry secrets of the requesting user"""
+    return 'Authorization' in request.headers or settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def negotiate(request, encodings=ENCODINGS):
+    """Best of `encodings` this request accepts, or None for identity"""
+    accepted = accepted_encodings(request)
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type):
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    return any(
+        content_type.startswith(prefix) or content_type.endswith('+json')
+        for prefix in settings.COMPRESSION_CONTENT_TYPES
+    )
+
+
+def compress(content, encoding, best=False, padded=False):
+    """
+    Compress `content`. Dynamic responses use the cheaper configured
+    levels; `best=True` is for payloads compressed once and reused.
+    `padded=True` is GZipMiddleware's BREACH mitigation, gzip only.
+    """
+    if padded:
+        return compress_string(content, max_random_bytes=GZipMiddleware.max_random_bytes)
+    if encoding == 'br':
+        quality = 11 if best else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(content, quality=quality)
+    level = 9 if best else settings.COMPRESSION_GZIP_LEVEL
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_all(content):
+    """{encoding: body} for every encoding that makes `content` smaller, and None: `content`"""
+    bodies = {None: content}
+    for encoding in ENCODINGS:
+        compressed = compress(content, encoding, best=True)
+        if len(compressed) < len(content):
+            bodies[encoding] = compressed
+    return bodies
+
+
+class PrecompressedPayload:
+    """
+    📦 A static JSON body rendered and compressed once, served from memory
+
+    `build` returns the data; it runs on first use and every encoding is
+    compressed at maximum level up front, so requests only pick bytes.
+    Compression is free at request time, so COMPRESSION_MIN_SIZE does not
+    apply - any encoding that makes the body smaller is offered.
+    Use for endpoints whose output only changes with a deploy. With
+    COMPRESSION_ENABLED=False only the uncompressed body is served.
+    """
+
+    content_type = 'application/json'
+
+    def __init__(self, build, max_age=3600):
+        self.build = build
+        self.max_age = max_age
+        self.bodies = None
+        self.etag = None
+
+    def prepare(self):
+        if self.bodies is None:
+            self.set_bodies(compress_all(ORJSONRenderer().render(self.build())))
+        return self.bodies
+
+    def set_bodies(self, bodies):
+        """{encoding: body}, None being the uncompressed content"""
+        self.etag = make_etag('payload', bodies[None])
+        self.bodies = bodies
+
+    def response(self, request):
+        bodies = self.prepare()
+        encoding = negotiate(request) if settings.COMPRESSION_ENABLED else None
+        if encoding not in bodies:
+            encoding = None
+
+        response = HttpResponse(bodies[encoding], content_type=self.content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['ETag'] = f'W/{self.etag}' if encoding else self.etag
+        patch_vary_headers(response, ['Accept-Encoding'])
+        patch_cache_control(response, public=True, max_age=self.max_age)
+        return get_conditional_response(request, etag=self.etag, response=response)
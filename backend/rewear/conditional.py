@@ -0,0 +1,47 @@
+"""
+Conditional GET helpers for API views.
+
+Views derive an ETag from cheap version stamps (updated_at, counters,
+aggregates) and call `not_modified()` before doing any serialization work.
+When the client's If-None-Match / If-Modified-Since still matches, a bare
+304 is returned; otherwise the view builds its response as usual and tags
+it with `set_validators()`.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Quoted strong ETag from any number of version stamp values"""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def user_stamp(request):
+    """Per-user part of a version stamp - responses include is_liked/can_edit etc."""
+    user = request.user
+    return user.pk if user.is_authenticated else None
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Return a 304 response if the client's validators still match,
+    otherwise None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Representations include per-user fields
+    patch_vary_headers(response, ['Authorization'])
+    return response
@@ -0,0 +1,52 @@
+"""
+Database connection stats, exposed through rewear.stats as "databases".
+
+Per alias: the connection mode, how many connections this process has
+opened (with a pool: taken from the pool) and, for pooled aliases,
+psycopg_pool's own counters (pool_size, pool_available,
+requests_waiting, requests_wait_ms, connections_errors, ...). The pool
+counters are also exported as rewear_db_pool_* Prometheus metrics
+(rewear/metrics.py).
+"""
+
+import threading
+from collections import Counter
+
+from django.db import connections
+
+_lock = threading.Lock()
+_connects = Counter()
+
+
+def count_connect(sender, connection, **kwargs):
+    with _lock:
+        _connects[connection.alias] += 1
+
+
+def is_pooled(alias):
+    return bool(connections.settings[alias].get('OPTIONS', {}).get('pool'))
+
+
+def pool_stats():
+    """psycopg_pool stats of each pooled alias"""
+    return {alias: connections[alias].pool.get_stats() for alias in connections if is_pooled(alias)}
+
+
+def connection_stats():
+    result = {}
+    for alias in connections:
+        config = connections.settings[alias]
+        pooled = is_pooled(alias)
+        with _lock:
+            connects = _connects[alias]
+        entry = {
+            'vendor': connections[alias].vendor,
+            'mode': 'pool' if pooled else ('persistent' if config['CONN_MAX_AGE'] else 'per-request'),
+            'conn_max_age': config['CONN_MAX_AGE'],
+            'health_checks': config['CONN_HEALTH_CHECKS'],
+            'connects': connects,
+        }
+        if pooled:
+            entry['pool'] = connections[alias].pool.get_stats()
+        result[alias] = entry
+    return result
@@ -0,0 +1,162 @@
+"""
+Read-replica routing.
+
+Reads go to a replica only inside a request that opted in: GET/HEAD/
+OPTIONS requests served by a viewset using ReplicaReadMixin (or the
+async read views, see rewear/async_api.py). Everything else, including
+every write and every read inside a transaction, stays on "default".
+
+Read-your-writes: after any successful unsafe request (viewset or
+function view, see ReplicaPinMiddleware) the user is pinned to the
+primary for REPLICA_STICKY_SECONDS, so e.g. a new listing shows up in
+my_items right away. The pin lives in the default cache, so it only
+holds across worker processes when that cache is shared
+(redis/memcached); `manage.py check` warns (rewear.W001) when replicas
+are configured with a per-process cache.
+
+Fallback: a replica that fails to connect is skipped for
+REPLICA_RETRY_SECONDS; with no healthy replica left reads go to the
+primary.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+class ReadState:
+    """Routing decision for the current request"""
+    __slots__ = ('enabled', 'alias')
+
+    def __init__(self):
+        self.enabled = False
+        self.alias = None
+
+
+_state = ContextVar('rewear_replica_reads', default=None)
+
+_lock = threading.Lock()
+_down_until = {}
+
+
+def pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+
+@contextmanager
+def replica_reads():
+    """Scope of one request; reads stay on the primary until enable_replica_reads()"""
+    token = _state.set(ReadState())
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def _enable(pinned):
+    state = _state.get()
+    if state is not None:
+        state.enabled = not pinned
+
+
+def enable_replica_reads(user):
+    """Call once the request is authenticated"""
+    _enable(user.is_authenticated and cache.get(pin_key(user)) is not None)
+
+
+async def aenable_replica_reads(user):
+    _enable(user.is_authenticated and await cache.aget(pin_key(user)) is not None)
+
+
+def pin_to_primary(user):
+    if settings.REPLICA_DATABASES and user.is_authenticated and settings.REPLICA_STICKY_SECONDS > 0:
+        cache.set(pin_key(user), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_pin_cache(app_configs, **kwargs):
+    """Replica pins kept in a per-process cache are not seen by the other workers"""
+    if not settings.REPLICA_DATABASES or settings.REPLICA_STICKY_SECONDS <= 0:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [checks.Warning(
+        'Read replicas are configured but the default cache is per process, so a user pinned '
+        'to the primary after a write is only pinned in the worker that handled it.',
+        hint='Point DJANGO_CACHE_BACKEND at Redis or Memcached, or run a single worker process.',
+        id='rewear.W001',
+    )]
+
+
+def mark_down(alias):
+    with _lock:
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+def is_healthy(alias):
+    with _lock:
+        if _down_until.get(alias, 0) > time.monotonic():
+            return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        mark_down(alias)
+        return False
+    return True
+
+
+def pick_replica():
+    replicas = list(settings.REPLICA_DATABASES)
+    random.shuffle(replicas)
+    for alias in replicas:
+        if is_healthy(alias):
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry - see the module docstring"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.enabled or not settings.REPLICA_DATABASES:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            # one replica per request, so its reads see a consistent snapshot
+            state.alias = pick_replica()
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+
+class ReplicaReadMixin:
+    """Viewset mixin: safe-method requests read from a replica (writes pin the user in ReplicaPinMiddleware)"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            enable_replica_reads(request.user)
@@ -0,0 +1,121 @@
+"""
+Sparse fieldsets: `?fields=` / `?omit=` on read endpoints.
+
+    GET /api/items/?fields=id,title,primary_image,point_value
+    GET /api/swaps/?omit=requester
+
+`fields` keeps only the listed top-level fields, `omit` drops the listed
+ones; both take a comma separated list and unknown names are ignored.
+
+Two halves work from the same `FieldSelection`:
+- `SparseFieldsetMixin` (serializers) drops the fields before
+  serialization, so pruned SerializerMethodFields never run their queries.
+- `SparseQuerysetMixin` (viewsets) maps fields to the select_related /
+  prefetch_related lookups behind them and only keeps the ones still needed.
+"""
+
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _split(value):
+    return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+
+class FieldSelection:
+    """Top-level fields requested by the client"""
+
+    def __init__(self, only=None, omit=frozenset()):
+        self.only = only
+        self.omit = omit
+
+    @classmethod
+    def from_request(cls, request):
+        params = getattr(request, 'query_params', None)
+        if params is None:
+            params = getattr(request, 'GET', {})
+        only = params.get(FIELDS_PARAM)
+        return cls(
+            only=_split(only) if only else None,
+            omit=_split(params.get(OMIT_PARAM, '')),
+        )
+
+    def __bool__(self):
+        return self.only is not None or bool(self.omit)
+
+    @property
+    def stamp(self):
+        """Order-independent value for ETags - each selection is its own representation"""
+        only = tuple(sorted(self.only)) if self.only is not None else None
+        return only, tuple(sorted(self.omit))
+
+    def wants(self, name):
+        return (self.only is None or name in self.only) and name not in self.omit
+
+    def wants_any(self, names):
+        return any(self.wants(name) for name in names)
+
+    def filter(self, names):
+        """`names` narrowed to the selection, original order kept"""
+        return [name for name in names if self.wants(name)]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that honours `?fields=` / `?omit=`.
+
+    Only the top-level representation is pruned - nested serializers
+    (e.g. the items inside a swap) keep all their fields - and only when
+    the serializer is used for output.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or hasattr(self, 'initial_data') or not self._is_top_level():
+            return fields
+        selection = FieldSelection.from_request(request)
+        if not selection:
+            return fields
+        return {name: field for name, field in fields.items() if selection.wants(name)}
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, serializers.ListSerializer) and parent.parent is None
+        )
+
+
+class SparseQuerysetMixin:
+    """
+    ViewSet mixin that prunes related lookups for fields the client dropped.
+
+    `sparse_select_related` / `sparse_prefetch_related` map each lookup to
+    the serializer fields that need it. Writes always get every lookup,
+    since permissions and actions use the relations too.
+    """
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
+
+    def get_field_selection(self):
+        return FieldSelection.from_request(self.request)
+
+    def with_related(self, queryset):
+        """Apply the select/prefetch lookups the requested fields need"""
+        select = list(self.sparse_select_related)
+        prefetch = list(self.sparse_prefetch_related)
+        if self.request.method in SAFE_METHODS:
+            selection = self.get_field_selection()
+            if selection:
+                select = [lookup for lookup in select
+                          if selection.wants_any(self.sparse_select_related[lookup])]
+                prefetch = [lookup for lookup in prefetch
+                            if selection.wants_any(self.sparse_prefetch_related[lookup])]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
@@ -0,0 +1,165 @@
+"""
+ASGI handler that runs sync views on a bounded thread pool.
+
+Stock Django runs every sync view under ASGI with
+`sync_to_async(thread_sensitive=True)` inside a per-request
+ThreadSensitiveContext: each request in flight gets a thread of its own,
+started for the request and discarded after it. Nothing bounds how many
+there are, so a burst of slow requests means as many threads and
+database connections as requests, and since every thread is new a
+connection is never reused across requests, whatever CONN_MAX_AGE says.
+PooledASGIHandler hands sync views to a pool of SYNC_VIEW_THREADS
+long-lived threads instead: at most that many sync views run at once
+per process, the rest wait their turn, and each thread keeps its
+database connection from one request to the next. Async views are left
+alone.
+
+Each pooled request runs entirely on its worker thread: the view, any
+ATOMIC_REQUESTS transaction and, when no process_template_response
+middleware is installed, rendering the DRF Response. Database connections
+are per thread, so close_old_connections() runs on that thread before
+and after the view. That gives the CONN_MAX_AGE / health check handling
+the request_started / request_finished signals do on the request's own
+thread, which never touches the pool thread's connection. With
+persistent connections every pool thread keeps its own connection, so
+SYNC_VIEW_THREADS bounds the connections a worker holds.
+
+Requests waiting for a free thread are counted. Past
+SYNC_VIEW_QUEUE_LIMIT they are turned away with 503 instead of piling
+up. Counters are exposed through rewear.stats as "sync_view_pool" and
+as rewear_sync_view_pool_* Prometheus metrics.
+
+Async read endpoints (rewear/async_api.py) stay async for GET/HEAD, but
+the DRF view they fall back to for writes and the browsable API is a
+sync view like any other, so it is sent to the pool as well.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+from . import stats
+from .async_api import async_read_view
+from .metrics import POOL_REJECTED, POOL_RUNNING, POOL_WAITING
+
+
+class SyncViewPool:
+    """Bounded executor for sync views plus queue-depth bookkeeping"""
+
+    def __init__(self, threads, queue_limit=0):
+        self.threads = threads
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='rewear-view')
+        self.lock = threading.Lock()
+        self.waiting = 0
+        self.running = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'threads': self.threads,
+                'queue_limit': self.queue_limit,
+                'running': self.running,
+                'waiting': self.waiting,
+                'peak_waiting': self.peak_waiting,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_wait_ms': round(self.wait_seconds / self.completed * 1000, 3) if self.completed else 0.0,
+            }
+
+    def wrap(self, view, render=True):
+        """Coroutine that runs the sync `view` on the pool"""
+        pool = self
+
+        def run(ticket, request, *args, **kwargs):
+            with pool.lock:
+                ticket['started'] = True
+                pool.waiting -= 1
+                pool.running += 1
+                pool.wait_seconds += time.perf_counter() - ticket['queued_at']
+            POOL_WAITING.dec()
+            POOL_RUNNING.inc()
+            close_old_connections()
+            try:
+                response = view(request, *args, **kwargs)
+                if render and callable(getattr(response, 'render', None)):
+                    response = response.render()
+                return response
+            finally:
+                close_old_connections()
+                with pool.lock:
+                    pool.running -= 1
+                    pool.completed += 1
+                POOL_RUNNING.dec()
+
+        run_async = sync_to_async(run, thread_sensitive=False, executor=self.executor)
+
+        async def pooled_view(request, *args, **kwargs):
+            with pool.lock:
+                if pool.queue_limit and pool.waiting >= pool.queue_limit:
+                    pool.rejected += 1
+                    POOL_REJECTED.inc()
+                    return pool.overloaded()
+                pool.waiting += 1
+                pool.peak_waiting = max(pool.peak_waiting, pool.waiting)
+            POOL_WAITING.inc()
+            ticket = {'queued_at': time.perf_counter(), 'started': False}
+            try:
+                return await run_async(ticket, request, *args, **kwargs)
+            except asyncio.CancelledError:
+                # client went away while queued - the job never ran
+                with pool.lock:
+                    if not ticket['started']:
+                        pool.waiting -= 1
+                        POOL_WAITING.dec()
+                raise
+
+        return pooled_view
+
+    def overloaded(self):
+        response = JsonResponse({'detail': 'Server is busy, please retry shortly.'}, status=503)
+        response['Retry-After'] = '1'
+        return response
+
+
+class PooledASGIHandler(ASGIHandler):
+    """ASGIHandler that dispatches sync views to a SyncViewPool"""
+
+    def __init__(self, threads=None, queue_limit=None):
+        super().__init__()
+        self.pool = SyncViewPool(
+            threads or settings.SYNC_VIEW_THREADS,
+            settings.SYNC_VIEW_QUEUE_LIMIT if queue_limit is None else queue_limit,
+        )
+        stats.register('sync_view_pool', self.pool.snapshot)
+        self.read_views = {}
+
+    def make_view_atomic(self, view):
+        if getattr(view, 'sync_view', None) is not None:
+            return self.pooled_read_view(view)
+        view = super().make_view_atomic(view)
+        if iscoroutinefunction(view):
+            return view
+        # rendering on the worker thread is only safe when no template
+        # response middleware needs the unrendered response afterwards
+        return self.pool.wrap(view, render=not self._template_response_middleware)
+
+    def pooled_read_view(self, view):
+        """The async read endpoint `view`, falling back to its sync view on the pool"""
+        pooled = self.read_views.get(view)
+        if pooled is None:
+            pooled = self.read_views[view] = async_read_view(
+                view.read, view.sync_view, run_sync=self.make_view_atomic(view.sync_view)
+            )
+        return pooled
@@ -0,0 +1,218 @@
+"""
+Per-request instrumentation: query count, DB time, serializer time and
+render time.
+
+RequestMetricsMiddleware (rewear/middleware.py) opens a RequestMetrics
+for every request. It lives in a contextvar, so it follows the request
+into sync_to_async threads and the sync view pool. It is fed by
+
+- `record_query`, an execute wrapper installed on every database
+  connection (RewearConfig.ready): number of queries and their wall time
+- `timed('serialize')` around `.data` of the serializers views return
+  (TimedSerializerMixin, TimedListSerializer) and ItemListProjection;
+  includes the queries the serializer runs, which is where N+1s show up
+- `timed('render')` in ORJSONRenderer
+
+Work done for the request but not by it, like storing its profile
+(rewear/profiling.py), runs `untracked()` and is not counted.
+
+On the way out the numbers go to a Server-Timing header (SERVER_TIMING,
+shown by browser dev tools), the Prometheus metrics (rewear/metrics.py)
+and one JSON line on the "rewear.requests" logger. Requests over their
+budget - REQUEST_BUDGET, overridden per URL name for GET and HEAD in
+REQUEST_BUDGETS - are logged at WARNING with the exceeded limits under
+"over_budget"; the rest at INFO.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import orjson
+from django.conf import settings
+from rest_framework import serializers
+
+from .metrics import observe_request
+
+logger = logging.getLogger('rewear.requests')
+
+_current = ContextVar('rewear_request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('request', 'started', 'queries', 'db_seconds', 'phases', 'open')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+        self.open = set()
+
+
+def current():
+    """RequestMetrics of the request being served, or None"""
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # connection_created fires again on every reconnect of the same connection object
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to `phase`; nested blocks of a phase count once"""
+    metrics = _current.get()
+    if metrics is None or phase in metrics.open:
+        yield
+        return
+    metrics.open.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.open.discard(phase)
+        metrics.phases[phase] = metrics.phases.get(phase, 0.0) + time.perf_counter() - started
+
+
+@contextmanager
+def untracked():
+    """Queries and phases of the block don't count toward the current request"""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class TimedSerializerMixin:
+    """
+    Times `.data` as the "serialize" phase. For serializers views return;
+    nested ones only run to_representation(). Listed with many=True, the
+    serializer's list_serializer_class needs it too (TimedListSerializer).
+    """
+
+    @property
+    def data(self):
+        with timed('serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class RequestStats:
+    """Totals since process start, for rewear.stats"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.over_budget = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def add(self, metrics, over_budget):
+        with self.lock:
+            self.requests += 1
+            self.over_budget += bool(over_budget)
+            self.queries += metrics.queries
+            self.db_seconds += metrics.db_seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'over_budget': self.over_budget,
+                'queries': self.queries,
+                'db_ms': round(self.db_seconds * 1000, 1),
+            }
+
+
+request_stats = RequestStats()
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return match.view_name or match.route
+
+
+def budget_for(endpoint, method='GET'):
+    """Limits for a request; the per-endpoint ones are for reads, writes get REQUEST_BUDGET"""
+    if method not in ('GET', 'HEAD'):
+        return dict(settings.REQUEST_BUDGET)
+    return {**settings.REQUEST_BUDGET, **settings.REQUEST_BUDGETS.get(endpoint, {})}
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+def report(request, response, metrics):
+    """Server-Timing header, log line and stats for a finished request"""
+    total = time.perf_counter() - metrics.started
+    endpoint = endpoint_name(request)
+    measured = {
+        'queries': metrics.queries,
+        'db_ms': milliseconds(metrics.db_seconds),
+        'serialize_ms': milliseconds(metrics.phases.get('serialize', 0.0)),
+        'render_ms': milliseconds(metrics.phases.get('render', 0.0)),
+        'total_ms': milliseconds(total),
+    }
+    budget = budget_for(endpoint, request.method)
+    over_budget = [name for name, limit in budget.items() if limit and measured[name] > limit]
+    request_stats.add(metrics, over_budget)
+    observe_request(request.method, endpoint, response.status_code, total, metrics.queries, metrics.db_seconds)
+
+    if settings.SERVER_TIMING:
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={measured["db_ms"]};desc="{metrics.queries} queries"',
+            f'serialize;dur={measured["serialize_ms"]}',
+            f'render;dur={measured["render_ms"]}',
+            f'total;dur={measured["total_ms"]}',
+        ))
+
+    level = logging.WARNING if over_budget else logging.INFO
+    if logger.isEnabledFor(level):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            **measured,
+        }
+        if over_budget:
+            record['over_budget'] = over_budget
+            record['budget'] = budget
+        logger.log(level, orjson.dumps(record).decode())
+    return response
+
+
+@contextmanager
+def measure(request=None):
+    """Scope of one request - yields its RequestMetrics"""
+    metrics = RequestMetrics(request)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
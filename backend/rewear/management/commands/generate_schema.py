@@ -0,0 +1,28 @@
+"""
+Management command to build the OpenAPI schema of this code version.
+
+Writes it, plus its gzip (and brotli, if installed) variants, to
+SCHEMA_CACHE_DIR, from where /swagger/ and /redoc/ serve it
+(rewear/schema.py); files of other versions are removed. Run it once per
+deploy, e.g. while building the image.
+
+Usage: CODE_VERSION=$(git rev-parse HEAD) python manage.py generate_schema
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from rewear.schema import OPENAPI_SCHEMA, code_version, compress_all, generate, schema_path
+
+
+class Command(BaseCommand):
+    help = 'Build the OpenAPI schema for this code version and save it to SCHEMA_CACHE_DIR'
+
+    def handle(self, *args, **options):
+        if schema_path() is None:
+            raise CommandError(
+                'No code version to store the schema under: set CODE_VERSION (or run from a git '
+                'checkout) with DJANGO_DEBUG=False'
+            )
+        bodies = compress_all(generate())
+        path = OPENAPI_SCHEMA.save(bodies)
+        sizes = ', '.join(f'{encoding or "json"} {len(body)} B' for encoding, body in bodies.items())
+        self.stdout.write(self.style.SUCCESS(f'Wrote the schema of {code_version()} to {path} ({sizes})'))
@@ -0,0 +1,167 @@
+"""
+Production media serving for uploaded item and profile images.
+
+MEDIA_SERVE_MODE picks how files under MEDIA_ROOT reach the client:
+
+- "x-accel-redirect": nginx serves the file from an internal location
+  (MEDIA_ACCEL_REDIRECT_PREFIX), Django only checks it exists
+- "x-sendfile": same for Apache/lighttpd, using the absolute file path
+- "django": Django streams the file itself with FileResponse, supporting
+  single byte ranges, ETag/If-None-Match and If-Modified-Since
+- "off": media is not routed at all (served by something else)
+
+Uploads are stored with a content hash in their file name
+(rewear/storage.py). Paths matching MEDIA_IMMUTABLE_PATTERN, i.e. with
+such a hash, are sent with a one year immutable Cache-Control; everything
+else, like files uploaded before hashing was introduced, gets
+MEDIA_CACHE_MAX_AGE.
+"""
+
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class FileRange:
+    """Read-only view of `length` bytes of an open file starting at `start`"""
+
+    def __init__(self, fileobj, start, length):
+        self.fileobj = fileobj
+        self.remaining = length
+        fileobj.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fileobj.close()
+
+
+def file_etag(statobj):
+    """Cheap validator from size and modification time - no hashing of the file"""
+    return f'"{statobj.st_mtime_ns:x}-{statobj.st_size:x}"'
+
+
+def cache_control(path):
+    if re.search(settings.MEDIA_IMMUTABLE_PATTERN, path):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable byte range, None when the
+    header should be ignored (absent, malformed or multi-range) and raise
+    ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError
+    return start, min(end, size - 1)
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT according to MEDIA_SERVE_MODE"""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        statobj = os.stat(fullpath)
+    except (OSError, ValueError):
+        raise Http404('Media file not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('Media file not found')
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    etag = file_etag(statobj)
+    mode = settings.MEDIA_SERVE_MODE
+
+    if mode in ('x-accel-redirect', 'x-sendfile'):
+        # The front proxy handles ranges and conditional requests itself
+        response = HttpResponse(content_type=content_type)
+        if mode == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + path
+        else:
+            response['X-Sendfile'] = fullpath
+        response['Cache-Control'] = cache_control(path)
+        return response
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        not_modified = '*' in if_none_match or etag.strip('"') in (
+            tag.removeprefix('W/').strip('"') for tag in parse_etags(if_none_match)
+        )
+    else:
+        not_modified = not was_modified_since(request.headers.get('If-Modified-Since'), statobj.st_mtime)
+    if not_modified:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control(path)
+        return response
+
+    size = statobj.st_size
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = size
+    elif byte_range is None:
+        # A plain file object lets the server use sendfile where it can
+        response = FileResponse(open(fullpath, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            FileRange(open(fullpath, 'rb'), start, length),
+            content_type=content_type,
+            status=206
+        )
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(statobj.st_mtime)
+    response['Cache-Control'] = cache_control(path)
+    return response
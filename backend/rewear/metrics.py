@@ -0,0 +1,194 @@
+"""
+Prometheus metrics, served as text at /metrics.
+
+- rewear_http_requests_total / rewear_http_request_duration_seconds per
+  method and URL name (requests that resolve to no URL are "unmatched"),
+  plus the query count and DB time of each endpoint; fed by
+  `instrumentation.report` for every request
+- rewear_cache_requests_total: anonymous response cache lookups, hit or
+  miss (hit ratio = hit / (hit + miss))
+- rewear_sync_view_pool_*: requests waiting for / running on the sync
+  view pool (rewear/handlers.py) and those turned away
+- rewear_image_upload_*: resumable image uploads not finalized yet, read
+  from the database when scraped
+- rewear_db_pool_*: psycopg connection pool sizes, waits and errors per
+  database alias (rewear/db.py), read from the pools when scraped
+- rewear_events_total: likes, swaps and redemptions, counted when their
+  transaction commits (`record_event`)
+
+gunicorn forks WEB_CONCURRENCY workers and a scrape reaches only one of
+them, so per-process counters would be wrong. gunicorn.conf.py sets
+PROMETHEUS_MULTIPROC_DIR: prometheus_client then keeps every worker's
+values in mmap files there and /metrics adds up the files of all
+workers, including ones that have exited (their gauges are dropped by
+`mark_process_dead` in child_exit). Without it (runserver, tests) the
+process serves its own registry. Connection pools are per process and
+only the scraped worker's can be read, so under gunicorn their series
+carry a "pid" label.
+"""
+
+import hmac
+import os
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Count, F, Sum
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from . import db
+
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+REQUESTS = Counter(
+    'rewear_http_requests_total', 'HTTP requests served',
+    ['method', 'endpoint', 'status'],
+)
+LATENCY = Histogram(
+    'rewear_http_request_duration_seconds', 'Time from the first to the last middleware',
+    ['method', 'endpoint'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_QUERIES = Counter('rewear_db_queries_total', 'Database queries run by requests', ['endpoint'])
+DB_TIME = Counter('rewear_db_query_seconds_total', 'Time requests spent in database queries', ['endpoint'])
+
+CACHE_REQUESTS = Counter('rewear_cache_requests_total', 'Cache lookups', ['cache', 'result'])
+
+POOL_WAITING = Gauge(
+    'rewear_sync_view_pool_waiting', 'Requests queued for a sync view thread', multiprocess_mode='livesum'
+)
+POOL_RUNNING = Gauge(
+    'rewear_sync_view_pool_running', 'Sync views running on the pool', multiprocess_mode='livesum'
+)
+POOL_REJECTED = Counter('rewear_sync_view_pool_rejected_total', 'Requests answered 503 because the pool queue was full')
+
+EVENTS = Counter('rewear_events_total', 'Committed business events', ['event'])
+EVENT_NAMES = (
+    'item_liked', 'item_unliked', 'item_redeemed',
+    'swap_requested', 'swap_accepted', 'swap_rejected', 'swap_completed', 'swap_cancelled',
+)
+for name in EVENT_NAMES:
+    EVENTS.labels(name)  # export zeros rather than no series at all
+
+
+def observe_request(method, endpoint, status, seconds, queries, db_seconds):
+    endpoint = endpoint or 'unmatched'
+    REQUESTS.labels(method, endpoint, status).inc()
+    LATENCY.labels(method, endpoint).observe(seconds)
+    if queries:
+        DB_QUERIES.labels(endpoint).inc(queries)
+        DB_TIME.labels(endpoint).inc(db_seconds)
+
+
+def record_event(event):
+    """Count `event` once the current transaction commits (right away outside one)"""
+    transaction.on_commit(EVENTS.labels(event).inc)
+
+
+class UploadQueueCollector:
+    """Open resumable image uploads, counted in the database at scrape time"""
+
+    def describe(self):
+        yield GaugeMetricFamily('rewear_image_upload_sessions', 'Image upload sessions not finalized yet')
+        yield GaugeMetricFamily('rewear_image_upload_pending_bytes', 'Bytes still expected by open upload sessions')
+
+    def collect(self):
+        from items.models import ImageUploadSession
+
+        try:
+            totals = ImageUploadSession.objects.aggregate(
+                sessions=Count('id'), pending=Sum(F('total_size') - F('received_bytes'))
+            )
+        except DatabaseError:
+            return  # the rest of the scrape is still worth having
+        yield GaugeMetricFamily(
+            'rewear_image_upload_sessions', 'Image upload sessions not finalized yet',
+            value=totals['sessions'],
+        )
+        yield GaugeMetricFamily(
+            'rewear_image_upload_pending_bytes', 'Bytes still expected by open upload sessions',
+            value=totals['pending'] or 0,
+        )
+
+
+class DatabasePoolCollector:
+    """psycopg_pool.get_stats() of this process' pools, per database alias"""
+
+    # levels, and counters since the pool opened (psycopg_pool leaves out zero counters)
+    GAUGES = {
+        'pool_min': 'Minimum connections the pool keeps open',
+        'pool_max': 'Maximum connections the pool opens',
+        'pool_size': 'Connections open, in use or idle',
+        'pool_available': 'Idle connections in the pool',
+        'requests_waiting': 'Requests waiting for a connection',
+    }
+    COUNTERS = {
+        'requests_num': ('requests', 'Connections requested from the pool', 1),
+        'requests_queued': ('requests_queued', 'Requests that had to wait for a connection', 1),
+        'requests_wait_ms': ('requests_wait_seconds', 'Time requests waited for a connection', 1000),
+        'requests_errors': ('requests_errors', 'Requests that timed out or failed', 1),
+        'usage_ms': ('usage_seconds', 'Time connections spent out of the pool', 1000),
+        'returns_bad': ('returns_bad', 'Connections returned to the pool in a bad state', 1),
+        'connections_num': ('connections', 'Connections opened', 1),
+        'connections_ms': ('connections_seconds', 'Time spent opening connections', 1000),
+        'connections_errors': ('connections_errors', 'Failed connection attempts', 1),
+        'connections_lost': ('connections_lost', 'Connections found broken by a health check', 1),
+    }
+
+    def families(self):
+        labels = ['alias', 'pid'] if MULTIPROCESS else ['alias']
+        for stat, documentation in self.GAUGES.items():
+            yield stat, 1, GaugeMetricFamily(f'rewear_db_pool_{stat}', documentation, labels=labels)
+        for stat, (name, documentation, scale) in self.COUNTERS.items():
+            yield stat, scale, CounterMetricFamily(f'rewear_db_pool_{name}', documentation, labels=labels)
+
+    def describe(self):
+        for stat, scale, family in self.families():
+            yield family
+
+    def collect(self):
+        pools = db.pool_stats()
+        if not pools:
+            return
+        pid = [str(os.getpid())] if MULTIPROCESS else []
+        for stat, scale, family in self.families():
+            for alias, stats in pools.items():
+                family.add_metric([alias, *pid], stats.get(stat, 0) / scale)
+            yield family
+
+
+upload_queue = UploadQueueCollector()
+database_pools = DatabasePoolCollector()
+if not MULTIPROCESS:
+    REGISTRY.register(upload_queue)
+    REGISTRY.register(database_pools)
+
+
+def registry():
+    """What a scrape returns: all workers' values when running under gunicorn"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(upload_queue)
+    registry.register(database_pools)
+    return registry
+
+
+@require_GET
+def metrics_view(request):
+    """
+    📊 GET /metrics
+
+    Prometheus text exposition. With METRICS_TOKEN set the scraper must
+    send it as "Authorization: Bearer <token>".
+    """
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'.encode()
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+            return HttpResponse(status=401)
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,294 @@
+"""
+Project-wide middleware.
+
+Everything here is both sync and async capable and runs its hooks inline,
+so it does not force a thread hop when requests are served under ASGI.
+Hooks must therefore never touch the database or do heavy CPU work
+(ProfilingMiddleware only touches the database for the requests it
+profiles, and CompressionMiddleware compresses, through sync_to_async).
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.permissions import SAFE_METHODS
+
+from . import instrumentation, profiling
+from .cache import tag_versions
+from .compression import ENCODINGS, compress, has_credentials, is_compressible, negotiate
+from .db_routers import pin_to_primary
+from .metrics import CACHE_REQUESTS
+
+
+class HookMiddleware:
+    """
+    Minimal replacement for MiddlewareMixin: `process_request` may return a
+    response to short-circuit, `process_response` must return one.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_request(self, request):
+        return None
+
+    def process_response(self, request, response):
+        return response
+
+
+class AnonymousCacheMiddleware(HookMiddleware):
+    """
+    🗄️ Response cache for anonymous GETs on public endpoints
+
+    ANON_CACHE_RULES lists (path regex, ttl seconds, tags). Matching
+    requests without credentials are answered from the cache, keyed on
+    host + path + normalized query string + Accept header + tag versions
+    (pagination links are absolute, so the host matters).
+    Responses get public Cache-Control/Vary headers so a CDN can cache them
+    too. Requests carrying an Authorization header or a session cookie
+    always bypass the cache and are marked private.
+
+    Tags are invalidated by `rewear.cache.purge_tags`, wired to item
+    writes in items/signals.py. Hits and misses are counted in
+    rewear_cache_requests_total{cache="anon_response"}.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.rules = [
+            (re.compile(pattern), ttl, tuple(tags))
+            for pattern, ttl, tags in settings.ANON_CACHE_RULES
+        ]
+
+    def match(self, request):
+        if not settings.ANON_CACHE_ENABLED or request.method not in ('GET', 'HEAD'):
+            return None
+        for pattern, ttl, tags in self.rules:
+            if pattern.match(request.path_info):
+                return ttl, tags
+        return None
+
+    def is_anonymous(self, request):
+        return (
+            'Authorization' not in request.headers and
+            settings.SESSION_COOKIE_NAME not in request.COOKIES
+        )
+
+    def cache_key(self, request, tags):
+        query = urlencode(sorted(parse_qsl(request.META.get('QUERY_STRING', ''), keep_blank_values=True)))
+        parts = [
+            request.scheme, request.get_host(), request.path_info, query,
+            request.headers.get('Accept', ''), *tag_versions(tags)
+        ]
+        return 'anoncache:page:' + hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+
+    def process_request(self, request):
+        rule = self.match(request)
+        if rule is None or not self.is_anonymous(request):
+            return None
+
+        ttl, tags = rule
+        request._anon_cache_key = self.cache_key(request, tags)
+        cached = cache.get(request._anon_cache_key)
+        CACHE_REQUESTS.labels('anon_response', 'miss' if cached is None else 'hit').inc()
+        if cached is None:
+            return None
+
+        status, content, headers = cached
+        response = HttpResponse(content, status=status)
+        for header, value in headers.items():
+            response[header] = value
+        response['X-Cache'] = 'HIT'
+        return get_conditional_response(request, etag=response.get('ETag'), response=response)
+
+    def process_response(self, request, response):
+        rule = self.match(request)
+        if rule is None:
+            return response
+        ttl, tags = rule
+        patch_vary_headers(response, ['Authorization'])
+
+        key = getattr(request, '_anon_cache_key', None)
+        if key is None:
+            if not self.is_anonymous(request):
+                patch_cache_control(response, private=True)
+            return response
+        if response.get('X-Cache') == 'HIT':
+            return response
+
+        cacheable = (
+            response.status_code == 200 and
+            not response.streaming and
+            not response.has_header('Content-Encoding') and
+            not response.cookies and
+            'private' not in response.get('Cache-Control', '')
+        )
+        if cacheable:
+            patch_cache_control(response, public=True, max_age=ttl)
+            headers = {
+                header: value for header, value in response.items()
+                if header.lower() not in ('set-cookie', 'x-cache')
+            }
+            cache.set(key, (response.status_code, response.content, headers), ttl)
+            response['X-Cache'] = 'MISS'
+        return response
+
+
+class CompressionMiddleware(HookMiddleware):
+    """
+    🗜️ gzip / brotli for API responses
+
+    Compresses non-streaming responses of a compressible content type
+    (COMPRESSION_CONTENT_TYPES) that are at least COMPRESSION_MIN_SIZE
+    bytes, using the best encoding the client accepts. Media, file
+    downloads and anything already carrying a Content-Encoding (e.g. a
+    PrecompressedPayload or WhiteNoise static file) are passed through.
+    Requests with credentials get GZipMiddleware's padded gzip and never
+    brotli (BREACH, see rewear/compression.py).
+
+    Under ASGI the compression itself runs in a worker thread, off the
+    event loop.
+
+    Sits outside AnonymousCacheMiddleware so cached bodies stay
+    uncompressed and work for every Accept-Encoding.
+    """
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.choose_encoding(request, response)
+        if encoding is None:
+            return response
+        return await sync_to_async(self.compress_response, thread_sensitive=False)(request, response, encoding)
+
+    def process_response(self, request, response):
+        encoding = self.choose_encoding(request, response)
+        if encoding is None:
+            return response
+        return self.compress_response(request, response, encoding)
+
+    def choose_encoding(self, request, response):
+        """The encoding to compress `response` with, None to leave it as it is"""
+        if (
+            not settings.COMPRESSION_ENABLED or
+            response.streaming or
+            response.has_header('Content-Encoding') or
+            response.status_code in (204, 206, 304) or
+            not is_compressible(response.get('Content-Type', ''))
+        ):
+            return None
+
+        # the body depends on Accept-Encoding even when it is not compressed
+        patch_vary_headers(response, ['Accept-Encoding'])
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return None
+        return negotiate(request, ('gzip',) if has_credentials(request) else ENCODINGS)
+
+    def compress_response(self, request, response, encoding):
+        compressed = compress(response.content, encoding, padded=has_credentials(request))
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # the bytes differ from the identity body, so a strong ETag must become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+class RequestMetricsMiddleware(HookMiddleware):
+    """
+    📏 Query count, DB, serializer and render time for every request
+
+    Reported as Server-Timing and on the "rewear.requests" logger, with
+    per-endpoint budgets (rewear/instrumentation.py). Should be the
+    outermost middleware so "total" covers the whole stack.
+    """
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with instrumentation.measure(request) as metrics:
+            response = self.get_response(request)
+        return instrumentation.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        with instrumentation.measure(request) as metrics:
+            response = await self.get_response(request)
+        return instrumentation.report(request, response, metrics)
+
+
+class ProfilingMiddleware(HookMiddleware):
+    """
+    🔬 cProfile for requests with the X-Profile header carrying
+    PROFILING_TOKEN and a sample of all requests (rewear/profiling.py). Goes right after
+    RequestMetricsMiddleware so the stored profile has the query stats.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        capture = profiling.start(request)
+        if capture is None:
+            return self.get_response(request)
+        with capture:
+            response = self.get_response(request)
+        return capture.finish(request, response)
+
+    async def __acall__(self, request):
+        capture = profiling.start(request)
+        if capture is None:
+            return await self.get_response(request)
+        with capture:
+            response = await self.get_response(request)
+        return await sync_to_async(capture.finish)(request, response)
+
+
+class ReplicaPinMiddleware(HookMiddleware):
+    """
+    📌 Read-your-writes for replica reads (rewear/db_routers.py): after any
+    successful unsafe request, by a viewset or a function view alike, the
+    user reads from the primary for REPLICA_STICKY_SECONDS. Goes after
+    AuthenticationMiddleware; the user is the one DRF authenticated, which
+    it sets on the request it wraps.
+    """
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None:
+                pin_to_primary(user)
+        return response
@@ -0,0 +1,209 @@
+"""
+On-demand request profiling.
+
+ProfilingMiddleware (rewear/middleware.py), off unless PROFILING_ENABLED,
+runs a request under cProfile when
+
+- its PROFILING_HEADER header carries PROFILING_TOKEN
+  ("X-Profile: <token>"); without a token configured the header is
+  ignored, or
+- it is picked at random, PROFILING_SAMPLE_RATE of all requests.
+
+The middleware runs before DRF authenticates the request, so the header
+is checked against the token rather than the user: a client without it
+can neither get a request profiled nor keep others from being profiled.
+
+The profile is written to PROFILING_DIR as a pstats file (open it with
+`python -m pstats`, snakeviz, ...) and recorded as an
+admin_panel.RequestProfile row with the endpoint and the request's query
+stats from rewear/instrumentation.py; the admin lists and downloads them.
+The response carries its id in X-Profile-Id. Only the newest
+PROFILING_KEEP profiles are kept.
+
+A request's view does not always run in the middleware's thread: with
+SYNC_VIEW_THREADS (rewear/handlers.py) it runs on a pool thread. Views
+with ProfiledViewMixin (the API's viewsets) are then profiled there
+separately and the profiles are merged; function views are only
+profiled in the middleware's thread. Up to Python 3.11 cProfile only
+sees the thread it is enabled in and both profilers run side by side.
+From 3.12 it hooks sys.monitoring for the whole process and only one
+profiler can be enabled at a time, so the middleware's profiler is
+paused while the view's runs; each sees the calls of every thread in
+its window, including whatever else the process ran meanwhile. When
+another tool (a debugger, coverage) holds the profiling slot the
+request is served without a profile.
+
+One request per process is profiled at a time; others arriving
+meanwhile run normally.
+"""
+
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+_capture = ContextVar('rewear_profile_capture', default=None)
+_busy = threading.Lock()
+# cProfile on sys.monitoring: one enabled profiler per process
+PROCESS_WIDE = sys.version_info >= (3, 12)
+
+
+def trigger(request):
+    """Why this request should be profiled, or None"""
+    token = request.headers.get(settings.PROFILING_HEADER)
+    if token and settings.PROFILING_TOKEN and hmac.compare_digest(token, settings.PROFILING_TOKEN):
+        return 'header'
+    if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+def start(request):
+    """A Capture for this request, or None if it is not profiled"""
+    reason = trigger(request)
+    if reason is None or not _busy.acquire(blocking=False):
+        return None
+    return Capture(reason)
+
+
+def enabled_profile():
+    """A running cProfile.Profile, or None if another profiler holds the process-wide slot"""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        logger.warning('Another profiling tool is active, request not profiled')
+        return None
+    return profile
+
+
+class Capture:
+    """cProfile data of one request, from every thread it ran in"""
+
+    def __init__(self, trigger):
+        self.trigger = trigger
+        self.thread = threading.get_ident()
+        self.lock = threading.Lock()
+        self.profiles = []
+        self.active = False
+
+    def __enter__(self):
+        self.token = _capture.set(self)
+        self.started = time.perf_counter()
+        self.profile = enabled_profile()
+        self.active = self.profile is not None
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self.lock:
+            if self.active:
+                self.profile.disable()
+                self.profiles.append(self.profile)
+            self.active = False
+        self.seconds = time.perf_counter() - self.started
+        _capture.reset(self.token)
+        _busy.release()
+
+    @contextmanager
+    def other_thread(self):
+        """Profile the current (non-request) thread for the duration of the block"""
+        with self.lock:
+            paused = PROCESS_WIDE and self.active
+            if paused:
+                self.profile.disable()
+            profile = enabled_profile()
+        try:
+            yield
+        finally:
+            with self.lock:
+                if profile is not None:
+                    profile.disable()
+                    self.profiles.append(profile)
+                # not if the request finished meanwhile (its client went away)
+                if paused and self.active:
+                    self.profile.enable()
+
+    def stats(self):
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def finish(self, request, response):
+        """store(), but a profile that can't be saved must not fail the request"""
+        if not self.profiles:
+            return response
+        metrics = instrumentation.current()
+        try:
+            # the queries that store it are not the request's
+            with instrumentation.untracked():
+                self.store(request, response, metrics)
+        except Exception:
+            logger.exception('Could not store the profile of %s %s', request.method, request.path)
+        return response
+
+    def store(self, request, response, metrics=None):
+        """Save the profile to disk and the database; returns the RequestProfile or None"""
+        from admin_panel.models import RequestProfile
+
+        user = getattr(request, 'user', None)
+        is_staff = bool(user is not None and user.is_authenticated and user.is_staff)
+
+        endpoint = instrumentation.endpoint_name(request) or ''
+        now = timezone.now()
+        filename = f'{now:%Y%m%d-%H%M%S}-{slugify(endpoint) or "unresolved"}-{uuid.uuid4().hex[:8]}.prof'
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        stats = self.stats()
+        stats.dump_stats(os.path.join(settings.PROFILING_DIR, filename))
+
+        summary = io.StringIO()
+        stats.stream = summary
+        stats.sort_stats('cumulative').print_stats(30)
+
+        phases = metrics.phases if metrics else {}
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:500],
+            endpoint=endpoint,
+            status_code=response.status_code,
+            trigger=self.trigger,
+            user=user if is_staff and self.trigger == 'header' else None,
+            total_ms=instrumentation.milliseconds(self.seconds),
+            queries=metrics.queries if metrics else 0,
+            db_ms=instrumentation.milliseconds(metrics.db_seconds) if metrics else 0,
+            serialize_ms=instrumentation.milliseconds(phases.get('serialize', 0.0)),
+            render_ms=instrumentation.milliseconds(phases.get('render', 0.0)),
+            filename=filename,
+            summary=summary.getvalue(),
+        )
+        RequestProfile.prune(settings.PROFILING_KEEP)
+        response['X-Profile-Id'] = str(profile.pk)
+        return profile
+
+
+class ProfiledViewMixin:
+    """Follow a profiled request into the thread its DRF view runs in"""
+
+    def dispatch(self, request, *args, **kwargs):
+        capture = _capture.get()
+        if capture is None or capture.thread == threading.get_ident():
+            return super().dispatch(request, *args, **kwargs)
+        with capture.other_thread():
+            return super().dispatch(request, *args, **kwargs)
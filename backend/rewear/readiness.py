@@ -0,0 +1,84 @@
+"""
+Readiness probe: GET /readyz for load balancers and orchestrators.
+
+Migrations and collectstatic no longer run when a container starts
+(start.sh): static files are collected at image build and migrations
+applied by a one-shot release step (`start.sh release`). A worker
+therefore starts serving right away, possibly against a database the
+release step has not migrated yet. /readyz answers 200 once the worker
+
+- is warm: warm_up() ran, in gunicorn's master before forking
+  (rewear/warmup.py) or otherwise on the first probe, and
+- can reach the database, and
+- finds every migration of this code applied there
+
+and 503 with the reason otherwise. The migration check reads the
+migration files and django_migrations once (a few ms); once it passed
+it is not repeated, until then every probe retries it.
+"""
+
+import logging
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from .schema import code_version
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """What this process knows about being ready; inherited by forked workers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.warm = False
+        self.migrated = False
+        self.pending = []
+
+    def check_migrations(self):
+        """True once every migration on disk is applied to the default database"""
+        if not self.migrated:
+            from django.db.migrations.executor import MigrationExecutor
+
+            executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+            plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+            self.pending = [f'{migration.app_label}.{migration.name}' for migration, _ in plan]
+            self.migrated = not self.pending
+        return self.migrated
+
+    def ensure_warm(self):
+        if not self.warm:
+            with self.lock:
+                if not self.warm:
+                    from .warmup import warm_up
+                    warm_up()
+
+
+state = Readiness()
+
+
+@never_cache
+@require_GET
+def readyz(request):
+    """
+    🚦 GET /readyz
+
+    200 {"ready": true, ...} once this worker is warm, the database is
+    reachable and fully migrated; 503 with the failing check otherwise.
+    """
+    state.ensure_warm()
+    report = {'ready': False, 'warm': state.warm, 'database': 'ok', 'pending_migrations': [],
+              'version': code_version()}
+    try:
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        report['ready'] = state.check_migrations()
+        report['pending_migrations'] = state.pending
+    except DatabaseError as exc:
+        logger.warning('Not ready, database unavailable: %s', exc)
+        report['database'] = 'unavailable'
+    return JsonResponse(report, status=200 if report['ready'] else 503)
@@ -0,0 +1,69 @@
+"""
+Fast JSON rendering for the API.
+
+ORJSONRenderer is a drop-in replacement for DRF's JSONRenderer built on
+orjson. Output matches the stock renderer byte for byte for compact
+responses: datetimes are passed back to DRF's encoder so UTC keeps the
+"Z" suffix, and lazy translation strings, Decimals, UUIDs and querysets go
+through the same encoder as before. Indented output (browsable API,
+`; indent=N` media types) falls back to the stock renderer.
+
+orjson writes NaN and Infinity as null where the stock renderer raises
+ValueError (STRICT_JSON) or writes NaN. When the output has a null the
+data is checked for non-finite floats and Decimals, and if it holds any
+it is rendered by the stock renderer instead, with the stock result.
+"""
+
+from decimal import Decimal
+from math import isfinite
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .instrumentation import timed
+
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+_encoder = JSONEncoder()
+
+
+def has_non_finite(data):
+    """Whether `data` holds a NaN or infinite float or Decimal, at any depth"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, Decimal) and not value.is_finite():
+            return True
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        with timed('render'):
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        if b'null' in ret and has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as DRF: escape U+2028/U+2029 so the output is a strict
+        # javascript subset
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
@@ -0,0 +1,179 @@
+"""
+OpenAPI documentation views (/swagger/, /redoc/).
+
+drf_yasg and what it pulls in (jsonschema, swagger_spec_validator,
+uritemplate, ...) take about as long to import as the whole rest of the
+URLconf, for pages that are hardly ever opened in production. The URLconf
+only references the thin views below; drf_yasg is imported by the first
+request to one of them, in the process that serves it.
+
+The schema itself (?format=openapi, what both UIs load) introspects every
+view and serializer, so it is built once per code version rather than per
+request: `manage.py generate_schema` writes it with its gzip/brotli
+variants to SCHEMA_CACHE_DIR (at image build), gunicorn's master loads
+those files before forking and a process that finds none generates the
+schema on first use and saves it for the others. The version is
+CODE_VERSION, else the git commit; a file written for another version is
+never read. With DEBUG on, or no version to go by, the schema is only
+kept in memory, per process.
+"""
+
+import functools
+import os
+import re
+import subprocess
+import tempfile
+import threading
+
+from django.conf import settings
+from django.views.decorators.csrf import csrf_exempt
+
+from .compression import ENCODINGS, PrecompressedPayload, compress_all
+
+SUFFIXES = {None: '', 'gzip': '.gz', 'br': '.br'}
+
+
+@functools.cache
+def schema_view():
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    return get_schema_view(info(), public=True, permission_classes=[permissions.AllowAny])
+
+
+@functools.cache
+def ui_view(renderer):
+    return schema_view().with_ui(renderer, cache_timeout=0)
+
+
+def info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="ReWear API",
+        default_version='v1',
+        description="API documentation for the ReWear app",
+        contact=openapi.Contact(email="team@rewear.dev"),
+    )
+
+
+def generate():
+    """
+    The OpenAPI document as JSON: every endpoint, as seen by an anonymous
+    GET. Without host and schemes, so the UIs call the host that served it.
+    """
+    from django.test import RequestFactory
+    from drf_yasg.codecs import OpenAPICodecJson
+    from rest_framework.views import APIView
+
+    request = APIView().initialize_request(RequestFactory().get('/swagger/', {'format': 'openapi'}))
+    # a url keeps the generator from asking the request for its host (ALLOWED_HOSTS)
+    generator = schema_view().generator_class(info(), url='http://localhost/')
+    schema = generator.get_schema(request=request, public=True)
+    schema.pop('host', None)
+    schema.pop('schemes', None)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def code_version():
+    """CODE_VERSION, else the checked out git commit; None when neither is known"""
+    return settings.CODE_VERSION or git_commit()
+
+
+@functools.cache
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def schema_path():
+    """The file the schema of this code version lives in, or None if it must not be cached on disk"""
+    version = code_version()
+    if settings.DEBUG or not version:
+        return None
+    return os.path.join(settings.SCHEMA_CACHE_DIR, 'openapi-%s.json' % re.sub(r'[^\w.-]', '_', version))
+
+
+class SchemaPayload(PrecompressedPayload):
+    """📖 The OpenAPI document, precompressed, from SCHEMA_CACHE_DIR or built on first use"""
+
+    content_type = 'application/openapi+json'
+
+    def __init__(self):
+        super().__init__(build=None, max_age=0)  # revalidate: the ETag changes with a deploy
+        self.lock = threading.Lock()
+
+    def prepare(self):
+        if self.bodies is None:
+            with self.lock:
+                if self.bodies is None and not self.load():
+                    bodies = compress_all(generate())
+                    self.save(bodies)
+                    self.set_bodies(bodies)
+        return self.bodies
+
+    def load(self):
+        """Take the schema saved for this code version, if there is one; returns whether there was"""
+        path = schema_path()
+        if path is None:
+            return False
+        bodies = {}
+        for encoding in (None, *ENCODINGS):
+            try:
+                with open(path + SUFFIXES[encoding], 'rb') as f:
+                    bodies[encoding] = f.read()
+            except FileNotFoundError:
+                if encoding is None:
+                    return False
+        self.set_bodies(bodies)
+        return True
+
+    def save(self, bodies):
+        """Write the schema for this code version and drop the files of older ones; returns the path"""
+        path = schema_path()
+        if path is None:
+            return None
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        stale = {name for name in os.listdir(directory) if name.startswith('openapi-')}
+        # compressed files first: a reader only looks for them once the plain one exists
+        for encoding in sorted(bodies, key=lambda encoding: encoding is None):
+            target = path + SUFFIXES[encoding]
+            stale.discard(os.path.basename(target))
+            with tempfile.NamedTemporaryFile(dir=directory, prefix='.openapi-', delete=False) as f:
+                f.write(bodies[encoding])
+            os.chmod(f.name, 0o644)
+            os.replace(f.name, target)
+        for name in stale:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass  # another process cleaned up first
+        return path
+
+
+OPENAPI_SCHEMA = SchemaPayload()
+
+
+def wants_schema(request):
+    return request.method in ('GET', 'HEAD') and request.GET.get('format') == 'openapi'
+
+
+@csrf_exempt
+def swagger_ui(request, *args, **kwargs):
+    """📘 Swagger UI; ?format=openapi returns the schema itself"""
+    if wants_schema(request):
+        return OPENAPI_SCHEMA.response(request)
+    return ui_view('swagger')(request, *args, **kwargs)
+
+
+@csrf_exempt
+def redoc_ui(request, *args, **kwargs):
+    """📕 ReDoc; ?format=openapi returns the schema itself"""
+    if wants_schema(request):
+        return OPENAPI_SCHEMA.response(request)
+    return ui_view('redoc')(request, *args, **kwargs)
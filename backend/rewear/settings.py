@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     'corsheaders',
 
     # local
+    'rewear',
     'users',
     'items',
     'swaps',
@@ -43,13 +44,18 @@ INSTALLED_APPS = [
 
 # middleware
 MIDDLEWARE = [
+    'rewear.middleware.RequestMetricsMiddleware',
+    'rewear.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'rewear.middleware.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'rewear.middleware.AnonymousCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'rewear.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,11 +93,60 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST", "localhost"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        # re-validate a kept connection before the first query of a request
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+# database connections
+# DB_POOL=True: psycopg 3 connection pool, one per worker process and shared
+# by its threads (size it for SYNC_VIEW_THREADS). Otherwise each thread keeps
+# its connection for DB_CONN_MAX_AGE seconds (0 = reconnect on every request).
+# Stats: /api/internal/stats/ -> "databases"
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    DATABASES["default"]["CONN_MAX_AGE"] = 0  # Django requires 0 with a pool
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_idle": int(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            "check": ConnectionPool.check_connection if DATABASES["default"]["CONN_HEALTH_CHECKS"] else None,
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+# read replicas (rewear/db_routers.py)
+# DB_REPLICA_HOSTS=host1,host2 adds aliases replica_1, replica_2, ... with the
+# primary's credentials. Safe-method requests of the item, user and swap
+# viewsets read from them; a user who just wrote is pinned to the primary
+# for DB_REPLICA_STICKY_SECONDS (kept in the default cache: with several
+# worker processes it has to be shared, Redis or Memcached); an unreachable
+# replica is skipped for DB_REPLICA_RETRY_SECONDS.
+REPLICA_DATABASES = []
+for number, host in enumerate(filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), 1):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {**DATABASES["default"], "HOST": host.strip(), "TEST": {"MIRROR": "default"}}
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ["rewear.db_routers.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = int(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
 AUTH_USER_MODEL = "users.User"
 
+# cache
+# per-process memory by default; point at redis/memcached to share across workers
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "rewear"),
+    }
+}
+
 # password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -117,6 +172,21 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    # uploads get a content hash in their name (see rewear/storage.py)
+    "default": {"BACKEND": "rewear.storage.HashedFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# production media serving (see rewear/media.py)
+# "django" | "x-accel-redirect" (nginx) | "x-sendfile" (apache) | "off"
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "django")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", "3600"))
+# uploads are stored under content-hashed names (rewear/storage.py), which never
+# change, so they can be cached forever
+MEDIA_IMMUTABLE_PATTERN = os.getenv("MEDIA_IMMUTABLE_PATTERN", r"\.[0-9a-f]{16}\.\w+$")
+
 # cors
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -128,6 +198,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    # orjson-backed JSON (rewear/renderers.py, rewear/parsers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'rewear.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rewear.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # jwt authentication
@@ -165,6 +245,133 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 FEATURED_ITEMS_DEFAULT_COUNT = int(os.getenv("FEATURED_ITEMS_DEFAULT_COUNT", "6"))
 FEATURED_ITEMS_MAX_COUNT = int(os.getenv("FEATURED_ITEMS_MAX_COUNT", "20"))
 
+# Anonymous Response Cache (rewear/middleware.py)
+# (path regex, ttl seconds, purge tags) - item writes purge the "items" tag
+ANON_CACHE_ENABLED = os.getenv("ANON_CACHE_ENABLED", "True") == "True"
+ANON_CACHE_RULES = [
+    (r'^/api/items/$', 30, ['items']),
+    (r'^/api/items/search/$', 30, ['items']),
+    (r'^/api/items/featured/$', 60, ['items']),
+    (r'^/api/items/stats/$', 60, ['items']),
+]
+
+# Native async read endpoints (rewear/async_api.py) - GET on the item
+# list/detail/featured/search and /users/me/ skip DRF's sync view cycle
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "True") == "True"
+
+# Sync view thread pool under ASGI (rewear/handlers.py)
+# Bounds how many sync views run at once per process and lets their
+# threads reuse database connections. 0 keeps Django's default of a new,
+# unbounded thread per request. Over SYNC_VIEW_QUEUE_LIMIT waiting
+# requests (0 = no limit) are answered with 503.
+SYNC_VIEW_THREADS = int(os.getenv("SYNC_VIEW_THREADS", "0"))
+SYNC_VIEW_QUEUE_LIMIT = int(os.getenv("SYNC_VIEW_QUEUE_LIMIT", "0"))
+
+# Request Instrumentation (rewear/instrumentation.py)
+# query count, DB/serializer/render time per request as a Server-Timing
+# header and a JSON log line on "rewear.requests" (REQUEST_LOG_LEVEL=INFO
+# logs every request, WARNING only those over budget). Budget limits are
+# queries / db_ms / total_ms; REQUEST_BUDGETS overrides them per URL name
+# for GET/HEAD (writes keep REQUEST_BUDGET), 0 disables a limit. The
+# per-endpoint query budgets are also asserted by the test suite
+# (rewear/testing.py).
+SERVER_TIMING = os.getenv("SERVER_TIMING", "True") == "True"
+REQUEST_BUDGET = {
+    'queries': int(os.getenv("REQUEST_BUDGET_QUERIES", "30")),
+    'db_ms': int(os.getenv("REQUEST_BUDGET_DB_MS", "200")),
+    'total_ms': int(os.getenv("REQUEST_BUDGET_TOTAL_MS", "1000")),
+}
+REQUEST_BUDGETS = {
+    'item-list': {'queries': 6},
+    'item-advanced-search': {'queries': 6},
+    'item-featured': {'queries': 8},
+    'item-detail': {'queries': 8},
+    'item-my-items': {'queries': 6},
+    'user-me': {'queries': 6},
+    'user-dashboard': {'queries': 3},
+    'user-my-swaps': {'queries': 5},
+    'user-complete-dashboard': {'queries': 8},
+    'user-my-activity': {'queries': 6},
+    'user-liked-items': {'queries': 7},
+    'swap-list': {'queries': 6},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'rewear.requests': {
+            'handlers': ['console'],
+            'level': os.getenv("REQUEST_LOG_LEVEL", "WARNING"),
+            'propagate': False,
+        },
+    },
+}
+
+# Prometheus Metrics (rewear/metrics.py)
+# GET /metrics; with METRICS_TOKEN set the scraper must send it as a bearer
+# token. Under gunicorn the workers' values are aggregated through
+# PROMETHEUS_MULTIPROC_DIR (set in gunicorn.conf.py).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Slow Query Capture (rewear/slow_queries.py)
+# Statements taking SLOW_QUERY_MS or longer (0 = off) are recorded with the
+# endpoint and code line that ran them plus an EXPLAIN plan, fetched on a
+# background thread. They go to the rotating SLOW_QUERY_LOG ("{pid}" is
+# replaced by the process id, empty = no log file) and to the admin under
+# Slow queries, which keeps the newest SLOW_QUERY_KEEP.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "True") == "True"
+SLOW_QUERY_EXPLAIN_TTL = int(os.getenv("SLOW_QUERY_EXPLAIN_TTL", "300"))  # seconds a plan is reused
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", str(BASE_DIR / 'logs' / 'slow_queries.log'))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+SLOW_QUERY_KEEP = int(os.getenv("SLOW_QUERY_KEEP", "1000"))
+
+# Request Profiling (rewear/profiling.py)
+# Off by default. Requests whose PROFILING_HEADER header carries
+# PROFILING_TOKEN (empty = header ignored), plus a PROFILING_SAMPLE_RATE
+# fraction (0-1) of all requests, run under cProfile.
+# Profiles go to PROFILING_DIR and are listed in the admin under Request
+# profiles; only the newest PROFILING_KEEP are kept.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / 'profiles'))
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "200"))
+
+# OpenAPI Schema (rewear/schema.py)
+# /swagger/ and /redoc/ serve a precompressed schema built once per code
+# version: `manage.py generate_schema` saves it to SCHEMA_CACHE_DIR (at
+# image build), otherwise the first process to need it does. CODE_VERSION
+# defaults to the git commit; with DEBUG on the schema is not saved.
+CODE_VERSION = os.getenv("CODE_VERSION", "")
+SCHEMA_CACHE_DIR = os.getenv("SCHEMA_CACHE_DIR", str(BASE_DIR / 'openapi'))
+
+# Response Compression (rewear/middleware.py, rewear/compression.py)
+# brotli is used when the package is installed, gzip otherwise
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "True") == "True"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_CONTENT_TYPES = (
+    'application/json', 'application/javascript', 'application/xml',
+    'text/', 'image/svg+xml',
+)
+
+# Resumable Image Uploads
+# Partial files must stay outside MEDIA_ROOT, which is served publicly
+IMAGE_UPLOAD_TEMP_DIR = os.getenv("IMAGE_UPLOAD_TEMP_DIR", str(BASE_DIR / 'uploads'))
+IMAGE_UPLOAD_MAX_SIZE = int(os.getenv("IMAGE_UPLOAD_MAX_SIZE", str(20 * 1024 * 1024)))  # bytes
+IMAGE_UPLOAD_CHUNK_SIZE = int(os.getenv("IMAGE_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # suggested chunk size for clients
+IMAGE_UPLOAD_SESSION_TTL_HOURS = int(os.getenv("IMAGE_UPLOAD_SESSION_TTL_HOURS", "24"))
+IMAGE_UPLOAD_PURGE_INTERVAL = int(os.getenv("IMAGE_UPLOAD_PURGE_INTERVAL", "3600"))  # seconds between purges on session start
+
 UNFOLD = {
     "SITE_TITLE": _("ReWear Admin"),
     "SITE_HEADER": _("ReWear Admin Panel"),
@@ -0,0 +1,269 @@
+"""
+Slow query capture.
+
+With SLOW_QUERY_MS > 0 an execute wrapper on every database connection
+times each statement. One that takes at least that long is recorded with
+the endpoint and path of the request that ran it and the first frame of
+project code on the stack (e.g. "swaps/views.py:30 get_queryset").
+
+The request only pays for the timing and the stack walk: the rest
+happens on a background thread per process, which
+
+- runs EXPLAIN on its own connection to the same database (plain EXPLAIN
+  - no ANALYZE - on PostgreSQL and MySQL, EXPLAIN QUERY PLAN on SQLite),
+  reusing the plan of the same statement for SLOW_QUERY_EXPLAIN_TTL
+  seconds, so a hot slow query is not explained on every call
+- appends a JSON line to SLOW_QUERY_LOG, rotated at
+  SLOW_QUERY_LOG_MAX_BYTES with SLOW_QUERY_LOG_BACKUPS old files. Each
+  process rotates on its own; a "{pid}" in the path gives every worker
+  its own file
+- stores an admin_panel.SlowQuery row, listed in the admin; only the
+  newest SLOW_QUERY_KEEP are kept
+
+Query parameters are used for EXPLAIN but not stored as such. A plan
+can still show them: PostgreSQL prints the bound values in its
+conditions ("Index Cond: (id = 42)", "Filter: (title ~~ '%denim%'::text)").
+`redact_plan` replaces those literals with "?" before the plan is
+logged or stored, as the SQL itself has placeholders. SQLite's EXPLAIN
+QUERY PLAN and MySQL's tabular EXPLAIN don't contain values. A failed
+EXPLAIN is stored with the error class only, as the message may quote a
+value.
+
+When the queue is full (a burst of slow queries) further ones are
+dropped and counted.
+"""
+
+import hashlib
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+import orjson
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+log = logging.getLogger('rewear.slow_queries')
+
+EXPLAINABLE = re.compile(r'^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+# a quoted literal, with '' escapes: '%denim%'::text, '{1,2}'::integer[]
+QUOTED_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# a number that isn't part of a name like items_item_2 or a qualified column
+NUMERIC_LITERAL = re.compile(r'(?<![\w.$])-?\d+(?:\.\d+)?(?![\w.])')
+# the conditions of a PostgreSQL plan node, where bound values show up
+PLAN_CONDITION = re.compile(r'^(\s*(?:[\w-]+ )*(?:Cond|Filter): )(.*)$')
+QUEUE_SIZE = 500
+NO_PARAMS = object()
+
+# request plumbing that sits on the stack of every query
+PLUMBING = frozenset(
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('slow_queries.py', 'instrumentation.py', 'middleware.py', 'handlers.py', 'profiling.py')
+)
+
+
+def fingerprint(sql):
+    """Same statement whatever the length of its IN lists"""
+    normalized = IN_LIST.sub('IN (...)', ' '.join(sql.split()))
+    return hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()
+
+
+def call_site():
+    """
+    First frame of project code that led to the query, as 'path:line
+    function'. Empty when the query ran from a native async view: the
+    ORM call is then made on a worker thread whose stack does not lead
+    back to the view, so only the endpoint is known.
+    """
+    base = str(settings.BASE_DIR) + os.sep
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base) and filename not in PLUMBING and 'site-packages' not in filename:
+            return f'{filename[len(base):]}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return ''
+
+
+def explain_params(params, many):
+    """Parameters to EXPLAIN with: the first set of an executemany(), if it is still there"""
+    if not many:
+        return params
+    return params[0] if isinstance(params, (list, tuple)) and params else NO_PARAMS
+
+
+def explain_sql(vendor, sql):
+    if not EXPLAINABLE.match(sql):
+        return None
+    if vendor == 'postgresql':
+        return 'EXPLAIN (ANALYZE off) ' + sql
+    if vendor == 'mysql':
+        return 'EXPLAIN ' + sql
+    if vendor == 'sqlite':
+        return 'EXPLAIN QUERY PLAN ' + sql
+    return None
+
+
+def format_plan(vendor, rows):
+    if vendor == 'sqlite':
+        # (id, parent, notused, detail)
+        return '\n'.join(str(row[-1]) for row in rows)
+    return '\n'.join(' | '.join(str(column) for column in row) for row in rows)
+
+
+def redact_condition(condition):
+    return NUMERIC_LITERAL.sub('?', QUOTED_LITERAL.sub("'?'", condition))
+
+
+def redact_plan(plan):
+    """The plan with the literals in its conditions replaced by ?; costs and row estimates stay"""
+    lines = []
+    for line in plan.splitlines():
+        match = PLAN_CONDITION.match(line)
+        lines.append(match.group(1) + redact_condition(match.group(2)) if match else line)
+    return '\n'.join(lines)
+
+
+class Recorder:
+    """Background thread turning slow statements into plans, log lines and rows"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.thread = None
+        self.queue = None
+        self.plans = {}
+        self.dropped = 0
+
+    def submit(self, job):
+        with self.lock:
+            # a thread started before a fork does not exist in the child
+            if self.pid != os.getpid() or not self.thread.is_alive():
+                self.pid = os.getpid()
+                self.queue = queue.Queue(QUEUE_SIZE)
+                self.plans = {}
+                self.thread = threading.Thread(target=self.run, name='rewear-slow-queries', daemon=True)
+                self.thread.start()
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            self.dropped += 1
+
+    def snapshot(self):
+        return {
+            'queued': self.queue.qsize() if self.queue is not None and self.pid == os.getpid() else 0,
+            'dropped': self.dropped,
+        }
+
+    def in_worker(self):
+        return threading.current_thread() is self.thread
+
+    def drain(self):
+        """Wait until everything submitted so far is stored"""
+        if self.queue is not None and self.pid == os.getpid():
+            self.queue.join()
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self.store(job)
+            except Exception:
+                logger.exception('Could not record a slow query')
+            finally:
+                self.queue.task_done()
+                if self.queue.empty():
+                    # no request cycle here to close connections for us
+                    connections.close_all()
+
+    def explain(self, job):
+        if not settings.SLOW_QUERY_EXPLAIN:
+            return ''
+        cached = self.plans.get(job['fingerprint'])
+        if cached and time.monotonic() - cached[0] < settings.SLOW_QUERY_EXPLAIN_TTL:
+            return cached[1]
+
+        connection = connections[job['database']]
+        statement = explain_sql(connection.vendor, job['sql'])
+        if statement is None or job['params'] is NO_PARAMS:
+            return ''
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(statement, job['params'])
+                plan = redact_plan(format_plan(connection.vendor, cursor.fetchall()))
+        except DatabaseError as exc:
+            plan = f'EXPLAIN failed: {type(exc).__name__}'
+        self.plans[job['fingerprint']] = (time.monotonic(), plan)
+        return plan
+
+    def store(self, job):
+        from admin_panel.models import SlowQuery
+
+        job['plan'] = self.explain(job)
+        del job['params']
+        configure_log()
+        if log.handlers:
+            log.warning(orjson.dumps(job).decode())
+        SlowQuery.objects.create(**job)
+        SlowQuery.prune(settings.SLOW_QUERY_KEEP)
+
+
+recorder = Recorder()
+
+
+def configure_log():
+    """Point the rotating log at SLOW_QUERY_LOG, if it moved since the last call"""
+    path = settings.SLOW_QUERY_LOG.replace('{pid}', str(os.getpid()))
+    path = os.path.abspath(path) if path else ''
+    if path == (log.handlers[0].baseFilename if log.handlers else ''):
+        return
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+        handler.close()
+    log.propagate = False
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    log.addHandler(logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+        encoding='utf-8',
+    ))
+
+
+def record_slow_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        threshold = settings.SLOW_QUERY_MS
+        if threshold and seconds * 1000 >= threshold and not recorder.in_worker():
+            metrics = instrumentation.current()
+            request = metrics.request if metrics else None
+            recorder.submit({
+                'database': context['connection'].alias,
+                'duration_ms': instrumentation.milliseconds(seconds),
+                'sql': sql,
+                'params': explain_params(params, many),
+                'fingerprint': fingerprint(sql),
+                'endpoint': (instrumentation.endpoint_name(request) or '') if request else '',
+                'method': request.method if request else '',
+                'path': request.path[:500] if request else '',
+                'source': call_site()[:300],
+            })
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created receiver, connected when SLOW_QUERY_MS > 0"""
+    if record_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_slow_query)
@@ -0,0 +1,37 @@
+"""
+Process-local runtime stats.
+
+Components register a callable returning a JSON-serializable dict; the
+staff-only /api/internal/stats/ endpoint returns all of them for the
+worker process that served the request (run several requests to see
+every worker).
+"""
+
+import os
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+_sources = {}
+
+
+def register(name, source):
+    """Expose `source()` under `name` in the stats payload"""
+    _sources[name] = source
+
+
+def collect():
+    return {name: source() for name, source in _sources.items()}
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def runtime_stats(request):
+    """
+    📈 GET /api/internal/stats/
+
+    Runtime counters of the worker process that served this request.
+    Staff only.
+    """
+    return Response({'pid': os.getpid(), **collect()})
@@ -0,0 +1,44 @@
+"""
+Storage for uploaded media with content-hashed file names.
+
+Every upload is saved as `<name>.<hash><ext>`, the hash being the first
+HASH_LENGTH hex digits of the SHA-256 of its content
+(items/2025/07/shirt.3f2a9c0b1d4e5f67.jpg). A name therefore never
+points at different bytes, even when a file is deleted and a later
+upload of the same name takes its place, and rewear/media.py can send
+names matching MEDIA_IMMUTABLE_PATTERN with a one year immutable
+Cache-Control. Files stored before this storage was configured keep
+their names and MEDIA_CACHE_MAX_AGE.
+"""
+
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.crypto import get_random_string
+
+HASH_LENGTH = 16
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """🔒 FileSystemStorage that puts a hash of the content in every file name"""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        root, ext = os.path.splitext(name)
+        return super().save(f'{root}.{content_hash(content)}{ext}', content, max_length=max_length)
+
+    def get_alternative_name(self, file_root, file_ext):
+        # keep the hash right before the extension when the name is taken
+        root, dot, digest = file_root.rpartition('.')
+        if not dot:
+            return super().get_alternative_name(file_root, file_ext)
+        return f'{root}_{get_random_string(7)}.{digest}{file_ext}'
@@ -0,0 +1,33 @@
+"""
+Settings for the test suite:
+
+    python manage.py test --settings=rewear.test_settings
+
+SQLite instead of PostgreSQL, plus a second database "replica" standing
+in for a read replica (rewear/db_routers.py). It is a separate database,
+not a mirror, so tests can tell which one served a read. Replica routing
+stays off unless a test enables REPLICA_DATABASES.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+SECRET_KEY = 'rewear-test-secret-key'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-default.sqlite3',
+        # a file rather than Django's shared in-memory database: threads
+        # then wait for each other's write locks instead of failing with
+        # "database table is locked" (swaps.tests concurrency tests)
+        'TEST': {'NAME': BASE_DIR / 'test-default.sqlite3'},
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test-replica.sqlite3',
+    },
+}
+REPLICA_DATABASES = []
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
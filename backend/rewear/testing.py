@@ -0,0 +1,117 @@
+"""
+Query budget assertions for the test suite.
+
+    with query_budget(6):
+        client.get('/api/items/')
+
+    @query_budget(6)
+    def test_something(self): ...
+
+QueryBudgetMixin.assertConstantQueries is the N+1 detector: it calls an
+endpoint, adds more rows, calls it again and fails if the number of
+queries changed.
+
+Requests should carry a real JWT (`authenticated_client`, `bearer`): the
+anonymous response cache and the APIClient.force_authenticate shortcut
+would both hide queries the production path runs, and the async read
+endpoints only trust the token, so they ignore force_authenticate.
+
+`sync_view_response` answers a GET with the DRF view behind an async
+read endpoint (rewear/async_api.py), for parity tests against the
+async one.
+"""
+
+from contextlib import ContextDecorator
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+def format_queries(captured):
+    return '\n'.join(f'{number}. {query["sql"]}' for number, query in enumerate(captured, 1))
+
+
+class query_budget(ContextDecorator):
+    """Fail if the block runs more than `max_queries` queries on `using`"""
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        return self.context.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and len(self.context) > self.max_queries:
+            raise AssertionError(
+                f'{len(self.context)} queries executed, budget is {self.max_queries}:\n'
+                f'{format_queries(self.context.captured_queries)}'
+            )
+
+
+def make_item(owner, title='Item', image=True, **extra):
+    """An approved, available item, by default with a primary image"""
+    from items.models import Item, ItemImage
+
+    item = Item.objects.create(
+        owner=owner, title=title, description='desc', category='tops', size='M', **extra
+    )
+    if image:
+        ItemImage.objects.create(item=item, image=f'items/test/{item.pk}.jpg', is_primary=True)
+    return item
+
+
+def bearer(user):
+    """Authorization header value with an access token for `user` (no database access)"""
+    return f'Bearer {AccessToken.for_user(user)}'
+
+
+def sync_view_response(path, headers=None):
+    """What the DRF view behind the async read endpoint at `path` answers to the same GET"""
+    request = RequestFactory().get(path, headers=headers)
+    match = resolve(request.path_info)
+    response = match.func.sync_view(request, *match.args, **match.kwargs)
+    return response.render() if hasattr(response, 'render') else response
+
+
+def authenticated_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+class QueryBudgetMixin:
+    """TestCase mixin for asserting endpoints run a constant number of queries"""
+
+    def count_queries(self, client, path, using=DEFAULT_DB_ALIAS):
+        cache.clear()
+        with CaptureQueriesContext(connections[using]) as context:
+            response = client.get(path)
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        return context.captured_queries
+
+    def assertConstantQueries(self, client, path, grow, max_queries=None):
+        """
+        GET `path`, call `grow()` to add rows, GET it again: the query count
+        must not change (and stay within `max_queries` when given).
+        """
+        before = self.count_queries(client, path)
+        grow()
+        after = self.count_queries(client, path)
+        self.assertEqual(
+            len(before), len(after),
+            f'{path}: {len(before)} queries before adding rows, {len(after)} after:\n'
+            f'{format_queries(after)}'
+        )
+        if max_queries is not None:
+            self.assertLessEqual(
+                len(after), max_queries,
+                f'{path}: {len(after)} queries, budget is {max_queries}:\n{format_queries(after)}'
+            )
@@ -1,33 +1,26 @@
+import re
+
 from django.contrib import admin
 from django.urls import path , include
 from django.http import JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="ReWear API",
-        default_version='v1',
-        description="API documentation for the ReWear app",
-        contact=openapi.Contact(email="team@rewear.dev"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+from django.urls import path, include, re_path
+from .media import serve_media
+from .metrics import metrics_view
+from .readiness import readyz
+from .schema import redoc_ui, swagger_ui
+from .stats import runtime_stats
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", lambda r: JsonResponse({"status": "rewear backend running"})),
+    path('readyz', readyz, name='readyz'),  # readiness probe: warm + database migrated
 
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # drf_yasg is imported on the first hit (rewear/schema.py)
+    path('swagger/', swagger_ui, name='schema-swagger-ui'),
+    path('redoc/', redoc_ui, name='schema-redoc'),
 
     # DJOSER auth endpoints - DISABLED to avoid conflicts DJOOSOSOOSOORORO
     # path('auth/', include('djoser.urls')),          # user, register, me
@@ -40,9 +33,18 @@ urlpatterns = [
     path('api/', include('users.urls')),           # User management, auth, dashboard
     path('api/items/', include('items.urls')),     # Item listings, search, management
     path('api/swaps/', include('swaps.urls')),     # Swap requests and negotiations
+    path('api/internal/stats/', runtime_stats, name='runtime_stats'),  # staff only
 ]
 
+if settings.METRICS_ENABLED:
+    urlpatterns += [path('metrics', metrics_view, name='metrics')]  # Prometheus scrape target
+
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 # to serve media files in dev
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# production: offload to the front proxy or stream with range/ETag support
+elif settings.MEDIA_SERVE_MODE != 'off':
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media),
+    ]
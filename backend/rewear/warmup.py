@@ -0,0 +1,62 @@
+"""
+Pre-fork warm-up for the gunicorn master (see gunicorn.conf.py).
+
+With preload_app the master imports Django once and the workers are
+forked from it. Whatever is built here before the fork is shared between
+the workers copy-on-write instead of being rebuilt by each worker on its
+first requests: URLconf and every view/serializer module it imports, the
+precompressed categories payload, the saved OpenAPI schema, and so on.
+
+gc.freeze() moves everything allocated so far into the permanent
+generation. Otherwise the first collection in a worker writes to the
+GC headers of all these objects and un-shares the pages they live on.
+
+Database connections are the one thing that must not be shared: the
+master talks to the database (the migration check), and with DB_POOL a
+psycopg pool lives in a class attribute that forked workers would
+inherit, sockets and all, together with a pool whose worker threads did
+not survive the fork. close_connections() closes both, before the first
+fork and before every later one.
+"""
+
+import gc
+import time
+
+from django.db import connections
+from django.urls import get_resolver
+
+
+def warm_up():
+    """Load what the workers would otherwise load lazily; returns seconds spent"""
+    started = time.perf_counter()
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # imports every urls/views module and builds the lookup tables
+
+    from items.views import CATEGORIES_PAYLOAD
+    CATEGORIES_PAYLOAD.prepare()
+
+    # only if generate_schema saved it: building it here would import drf_yasg
+    from .schema import OPENAPI_SCHEMA
+    OPENAPI_SCHEMA.load()
+
+    from .readiness import state
+    state.warm = True
+    return time.perf_counter() - started
+
+
+def close_connections():
+    """Close every database connection of this process, and with DB_POOL the pools too"""
+    for connection in connections.all():
+        connection.close()
+        # only the PostgreSQL backend pools; close_pool() forgets the pool, a worker opens its own
+        close_pool = getattr(connection, 'close_pool', None)
+        if close_pool is not None:
+            close_pool()
+
+
+def prepare_fork():
+    """Run in the master right before forking workers"""
+    # a connection opened in the master must never be shared with children
+    close_connections()
+    gc.freeze()
@@ -1,12 +1,17 @@
 #!/bin/sh
+#   start.sh            serve (gunicorn, see gunicorn.conf.py)
+#   start.sh release    one-shot release step: apply migrations, then exit
+#
+# Nothing is prepared per boot: static files are collected when the image
+# is built and migrations are applied once per deploy by the release step,
+# not by every replica racing on start. Workers serve right away; /readyz
+# answers 503 until they are warm and the database is migrated.
 
-# run setup
 . .venv/bin/activate
 
-python manage.py makemigrations --noinput
-python manage.py migrate --noinput
-python manage.py collectstatic --noinput
-
-# start server
-exec uvicorn rewear.asgi:application --host 0.0.0.0 --port 8000
+if [ "$1" = "release" ]; then
+    exec python manage.py migrate --noinput
+fi
 
+# gunicorn forking WEB_CONCURRENCY uvicorn workers (gunicorn.conf.py)
+exec gunicorn -c gunicorn.conf.py
@@ -1,5 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
+
+
+class TransitionConflict(Exception):
+    """The swap ('swap') or one of its items ('items') was not in the state the transition starts from"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
 
 class SwapRequest(models.Model):
     class Status(models.TextChoices):
@@ -17,8 +27,46 @@ class SwapRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # transition: (swap status from, to, both items' status from, to)
+    TRANSITIONS = {
+        'accept': (Status.PENDING, Status.ACCEPTED, ('available', 'pending')),
+        'reject': (Status.PENDING, Status.REJECTED, None),
+        'complete': (Status.ACCEPTED, Status.COMPLETED, ('pending', 'swapped')),
+    }
+
     class Meta:
         unique_together = ['requester', 'requested_item', 'offered_item']
+
+    def transition(self, name):
+        """
+        Move the swap and both its items on in one transaction.
+
+        Every row changes with a conditional UPDATE ... WHERE status = <from>,
+        never from a status read earlier: of two requests racing for the
+        same swap or item exactly one matches, the other raises
+        TransitionConflict and its transaction leaves nothing changed.
+        Rows are locked swap first, then the items by id, so two
+        transitions never wait on each other in opposite orders.
+        """
+        from items.models import Item
+
+        source, target, item_statuses = self.TRANSITIONS[name]
+        now = timezone.now()
+        with transaction.atomic():
+            if not SwapRequest.objects.filter(pk=self.pk, status=source).update(status=target, updated_at=now):
+                raise TransitionConflict('swap')
+            if item_statuses:
+                for item_id in sorted({self.requested_item_id, self.offered_item_id}):
+                    claimed = Item.objects.filter(pk=item_id, status=item_statuses[0]).update(
+                        status=item_statuses[1], updated_at=now
+                    )
+                    if not claimed:
+                        raise TransitionConflict('items')
+
+        self.status, self.updated_at = target, now
+        if item_statuses:
+            for item in (self.requested_item, self.offered_item):
+                item.status, item.updated_at = item_statuses[1], now
         
     def __str__(self):
         return f"{self.requester.username} wants {self.requested_item.title} for {self.offered_item.title}"
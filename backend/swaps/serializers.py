@@ -1,9 +1,30 @@
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
 from .models import SwapRequest
-from items.serializers import ItemListSerializer
-from users.serializers import PublicUserSerializer
+from items.serializers import ItemListSerializer, prepare_item_batch
+from users.serializers import PublicUserSerializer, public_user_stats
+from rewear.fieldsets import SparseFieldsetMixin
+from rewear.instrumentation import TimedSerializerMixin
 
-class SwapRequestSerializer(serializers.ModelSerializer):
+class SwapRequestListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """
+    many=True for SwapRequestSerializer - the nested items' images/likes
+    and the requesters' counters are looked up once for the whole list
+    """
+
+    def to_representation(self, data):
+        swaps = list(data.all() if isinstance(data, BaseManager) else data)
+        fields = self.child.fields
+        prepare_item_batch(self.context, [
+            getattr(swap, name) for swap in swaps
+            for name in ('requested_item', 'offered_item') if name in fields
+        ])
+        if 'requester' in fields:
+            self.context['public_user_stats'] = public_user_stats({swap.requester_id for swap in swaps})
+        return super().to_representation(swaps)
+
+
+class SwapRequestSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Detailed serializer for swap requests"""
     requester = PublicUserSerializer(read_only=True)
     requested_item = ItemListSerializer(read_only=True)
@@ -15,6 +36,7 @@ class SwapRequestSerializer(serializers.ModelSerializer):
             'id', 'requester', 'requested_item', 'offered_item', 
             'status', 'message', 'created_at', 'updated_at'
         )
+        list_serializer_class = SwapRequestListSerializer
 
 class SwapRequestCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating swap requests"""
@@ -1,3 +1,170 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.test import TestCase, TransactionTestCase
+from items.models import Item
+from rewear.testing import QueryBudgetMixin, authenticated_client, make_item
+
+from .models import SwapRequest
+from .views import SwapRequestViewSet
+
+User = get_user_model()
+
+
+def post_together(requests):
+    """POST (user, path, data) requests from one thread each; returns their status codes"""
+
+    def post(user, path, data=None):
+        try:
+            return authenticated_client(user).post(path, data, format='json').status_code
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(len(requests)) as pool:
+        return list(pool.map(lambda request: post(*request), requests))
+
+
+class SwapQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """The swap list runs the same queries however many swaps it returns"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+
+    def setUp(self):
+        self.client = authenticated_client(self.owner)
+        self.add_swaps(2)
+
+    def add_swaps(self, count):
+        for _ in range(count):
+            requester = User.objects.create_user(
+                username=f'requester{User.objects.count()}', email=f'r{User.objects.count()}@example.com',
+                password='pass12345'
+            )
+            SwapRequest.objects.create(
+                requester=requester,
+                requested_item=make_item(self.owner, title='Wanted'),
+                offered_item=make_item(requester, title='Offered'),
+            )
+
+    def test_list(self):
+        self.assertConstantQueries(
+            self.client, '/api/swaps/', lambda: self.add_swaps(6),
+            max_queries=settings.REQUEST_BUDGETS['swap-list']['queries'],
+        )
+
+
+class ConcurrentSwapTransitionTests(TransactionTestCase):
+    """
+    Requests racing for the same item: every request has read the swap
+    (pending, items available) before any of them writes, the moment the
+    old read-check-write code let all of them through.
+    """
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        self.wanted = make_item(self.owner, title='Wanted')
+        self.swaps = []
+        for number in range(3):
+            requester = User.objects.create_user(
+                username=f'requester{number}', email=f'r{number}@example.com', password='pass12345'
+            )
+            self.swaps.append(SwapRequest.objects.create(
+                requester=requester, requested_item=self.wanted, offered_item=make_item(requester, title='Offered')
+            ))
+
+    def race(self, requests):
+        """Run (user, path) requests in threads released together once all have loaded their swap"""
+        barrier = threading.Barrier(len(requests), timeout=10)
+        get_object = SwapRequestViewSet.get_object
+
+        def loaded_then_wait(view):
+            swap = get_object(view)
+            barrier.wait()
+            return swap
+
+        with mock.patch.object(SwapRequestViewSet, 'get_object', loaded_then_wait):
+            return post_together(requests)
+
+    def test_item_is_never_in_two_accepted_swaps(self):
+        statuses = self.race([(self.owner, f'/api/swaps/{swap.pk}/accept/') for swap in self.swaps])
+
+        self.assertEqual(statuses.count(200), 1, statuses)
+        accepted = SwapRequest.objects.filter(status='accepted')
+        self.assertEqual(accepted.count(), 1)
+        self.assertEqual(SwapRequest.objects.filter(status='pending').count(), 2)
+        # only the winner's offered item was reserved along with the wanted one
+        reserved = set(Item.objects.filter(status='pending').values_list('pk', flat=True))
+        self.assertEqual(reserved, {self.wanted.pk, accepted.get().offered_item_id})
+
+    def test_swap_is_completed_once(self):
+        swap = self.swaps[0]
+        swap.transition('accept')
+        path = f'/api/swaps/{swap.pk}/complete/'
+        statuses = self.race([(self.owner, path), (swap.requester, path)])
+
+        self.assertEqual(sorted(statuses), [200, 400])
+        self.assertEqual(User.objects.get(pk=self.owner.pk).points, self.owner.points + 5)
+        self.assertEqual(User.objects.get(pk=swap.requester.pk).points, swap.requester.points + 5)
+
+
+class ConcurrentRedemptionTests(TransactionTestCase):
+    """
+    Redemptions racing for the same item or the same points: every request
+    has passed the availability and balance checks before any of them
+    writes.
+    """
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@example.com', password='pass12345')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@example.com', password='pass12345')
+        self.items = [make_item(self.seller, title=f'Item {number}', point_value=20) for number in range(2)]
+
+    def race(self, requests):
+        """Run (user, item) redemptions in threads released together right before their transaction"""
+        barrier = threading.Barrier(len(requests), timeout=10)
+        gated = mock.Mock(wraps=transaction)
+
+        def checked_then_wait(*args, **kwargs):
+            barrier.wait()
+            return transaction.atomic(*args, **kwargs)
+
+        gated.atomic.side_effect = checked_then_wait
+        with mock.patch('swaps.views.transaction', gated):
+            return post_together([
+                (user, '/api/swaps/redeem/', {'item_id': item.pk}) for user, item in requests
+            ])
+
+    def set_points(self, user, points):
+        User.objects.filter(pk=user.pk).update(points=points)
+
+    def points(self, user):
+        return User.objects.get(pk=user.pk).points
+
+    def test_item_is_redeemed_once(self):
+        self.set_points(self.buyer, 100)
+        seller_points = self.points(self.seller)
+        item = self.items[0]
+        statuses = self.race([(self.buyer, item), (self.buyer, item)])
+
+        self.assertEqual(sorted(statuses), [200, 400])
+        item.refresh_from_db()
+        self.assertEqual((item.owner, item.status), (self.buyer, 'swapped'))
+        self.assertEqual(self.points(self.buyer), 80)
+        self.assertEqual(self.points(self.seller), seller_points + 10)
+
+    def test_points_are_spent_once(self):
+        self.set_points(self.buyer, 20)  # enough for one of the two
+        seller_points = self.points(self.seller)
+        statuses = self.race([(self.buyer, item) for item in self.items])
+
+        self.assertEqual(sorted(statuses), [200, 400])
+        self.assertEqual(self.points(self.buyer), 0)
+        self.assertEqual(self.points(self.seller), seller_points + 10)
+        # the losing redemption's claim on its item was rolled back
+        owners = Item.objects.filter(pk__in=[item.pk for item in self.items]).values_list('owner', 'status')
+        self.assertCountEqual(owners, [(self.buyer.pk, 'swapped'), (self.seller.pk, 'available')])
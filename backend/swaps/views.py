@@ -1,12 +1,19 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q
-from .models import SwapRequest
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import SwapRequest, TransitionConflict
 from .serializers import SwapRequestSerializer, SwapRequestCreateSerializer
-from items.models import Item
+from users.models import User
+from items.signals import listings_changed
+from rewear.db_routers import ReplicaReadMixin
+from rewear.fieldsets import SparseQuerysetMixin
+from rewear.metrics import record_event
+from rewear.profiling import ProfiledViewMixin
 
-class SwapRequestViewSet(viewsets.ModelViewSet):
+class SwapRequestViewSet(ProfiledViewMixin, ReplicaReadMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     🔄 SWAP REQUEST API - Handle item exchange requests
     
@@ -16,14 +23,21 @@ class SwapRequestViewSet(viewsets.ModelViewSet):
     
     permission_classes = [permissions.IsAuthenticated]
     
+    # 🪶 ?fields= / ?omit= - skip the joins for relations left out
+    sparse_select_related = {
+        'requester': ('requester',),
+        'requested_item__owner': ('requested_item',),
+        'offered_item__owner': ('offered_item',),
+    }
+    
     def get_queryset(self):
         """Get swap requests related to the current user"""
+        if getattr(self, 'swagger_fake_view', False):  # OpenAPI schema generation, no user
+            return SwapRequest.objects.none()
         user = self.request.user
-        return SwapRequest.objects.filter(
+        return self.with_related(SwapRequest.objects.filter(
             Q(requester=user) | Q(requested_item__owner=user)
-        ).select_related(
-            'requester', 'requested_item', 'offered_item'
-        ).order_by('-created_at')
+        )).order_by('-created_at')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -46,6 +60,7 @@ class SwapRequestViewSet(viewsets.ModelViewSet):
         
         # Get the created swap instance and return detailed data
         if response.status_code == 201:
+            record_event('swap_requested')
             try:
                 # Get the swap ID from response data or find by unique combination
                 swap_id = response.data.get('id')
@@ -87,28 +102,16 @@ class SwapRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check if swap is still pending
-        if swap.status != 'pending':
-            return Response(
-                {'error': 'This swap request is no longer pending'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Check if items are still available
-        if (swap.requested_item.status != 'available' or 
-            swap.offered_item.status != 'available'):
-            return Response(
-                {'error': 'One or both items are no longer available'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Accept the swap
-        swap.status = 'accepted'
-        swap.save()
-        
-        # Update item statuses to prevent other swaps
-        Item.objects.filter(id=swap.requested_item.id).update(status='pending')
-        Item.objects.filter(id=swap.offered_item.id).update(status='pending')
+        # Pending swap and both items available - checked by the updates
+        # themselves, so two owners racing for an item can't both win
+        try:
+            swap.transition('accept')
+        except TransitionConflict as conflict:
+            error = ('This swap request is no longer pending' if conflict.reason == 'swap'
+                     else 'One or both items are no longer available')
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        listings_changed()
+        record_event('swap_accepted')
         
         return Response({
             'message': 'Swap request accepted! Items are now reserved.',
@@ -131,16 +134,15 @@ class SwapRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check if swap is still pending
-        if swap.status != 'pending':
+        # Reject the swap if it is still pending
+        try:
+            swap.transition('reject')
+        except TransitionConflict:
             return Response(
                 {'error': 'This swap request is no longer pending'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Reject the swap
-        swap.status = 'rejected'
-        swap.save()
+        record_event('swap_rejected')
         
         return Response({
             'message': 'Swap request rejected.',
@@ -165,26 +167,23 @@ class SwapRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check if swap is accepted
-        if swap.status != 'accepted':
-            return Response(
-                {'error': 'Swap must be accepted before it can be completed'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Complete the swap
-        swap.status = 'completed'
-        swap.save()
-        
-        # Update item statuses
-        Item.objects.filter(id=swap.requested_item.id).update(status='swapped')
-        Item.objects.filter(id=swap.offered_item.id).update(status='swapped')
-        
-        # Award points to both users (incentive for platform engagement)
-        swap.requester.points += 5
-        swap.requested_item.owner.points += 5
-        swap.requester.save()
-        swap.requested_item.owner.save()
+        # Complete the swap, mark both items swapped and award points to both
+        # users (incentive for platform engagement) - all or nothing, and
+        # only once however many times both parties press complete
+        participants = (swap.requester, swap.requested_item.owner)
+        try:
+            with transaction.atomic():
+                swap.transition('complete')
+                for user in participants:
+                    User.objects.filter(pk=user.pk).update(points=F('points') + 5)
+        except TransitionConflict as conflict:
+            error = ('Swap must be accepted before it can be completed' if conflict.reason == 'swap'
+                     else 'One or both items are no longer reserved for this swap')
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        for user in participants:
+            user.points += 5
+        listings_changed()
+        record_event('swap_completed')
         
         return Response({
             'message': 'Swap completed successfully! Both parties earned 5 points.',
@@ -207,15 +206,14 @@ class SwapRequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Can only cancel pending swaps
-        if swap.status != 'pending':
+        # Can only cancel pending swaps - not one the owner accepts meanwhile
+        deleted, _ = SwapRequest.objects.filter(pk=swap.pk, status=SwapRequest.Status.PENDING).delete()
+        if not deleted:
             return Response(
                 {'error': 'Only pending swaps can be cancelled'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Cancel the swap
-        swap.delete()
+        record_event('swap_cancelled')
         
         return Response({
             'message': 'Swap request cancelled.'
@@ -256,7 +254,6 @@ def redeem_item(request):
     """
     from items.models import Item
     from items.serializers import ItemDetailSerializer
-    from django.db import transaction
     
     item_id = request.data.get('item_id')
     
@@ -297,26 +294,49 @@ def redeem_item(request):
             'message': f'Insufficient points. You need {required_points} points but only have {user.points}.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Perform the redemption (atomic transaction)
+    # Perform the redemption (atomic transaction). The checks above are
+    # repeated by the updates themselves: of two users redeeming the same
+    # item, or one user spending the same points twice, one gets a 400
+    original_owner = item.owner
+    insufficient_points = False
     try:
         with transaction.atomic():
-            # Deduct points from user
-            user.points -= required_points
-            user.save()
-            
-            # Update item status and ownership
-            original_owner = item.owner
-            item.owner = user
-            item.status = 'swapped'  # Mark as redeemed/swapped
-            item.save()
+            # Update item status and ownership - only if nobody got it first
+            claimed = Item.objects.filter(
+                pk=item.pk, owner=original_owner, status='available', is_approved=True
+            ).update(owner=user, status='swapped', updated_at=timezone.now())  # Mark as redeemed/swapped
+            if not claimed:
+                return Response({
+                    'message': 'This item is not available for redemption.'
+                }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Award points to original owner (incentive for listing items)
-            original_owner.points += (required_points // 2)  # Give half the points back as reward
-            original_owner.save()
+            # Deduct points from user and award points to original owner
+            # (incentive for listing items: half the points back as reward),
+            # rows in id order so two redemptions between the same two users
+            # can't deadlock
+            changes = {user.pk: -required_points, original_owner.pk: required_points // 2}
+            for pk in sorted(changes):
+                users = User.objects.filter(pk=pk)
+                if pk == user.pk:
+                    users = users.filter(points__gte=required_points)  # unless a concurrent redemption spent them
+                if not users.update(points=F('points') + changes[pk]):
+                    insufficient_points = True
+                    transaction.set_rollback(True)  # the item goes back too
+                    break
+            if not insufficient_points:
+                # the list ETag bump and the event count still wait for the commit
+                listings_changed()
+                record_event('item_redeemed')
             
             # Create a record for this redemption (optional - for tracking)
             # We could create a Redemption model later for better tracking
-            
+        
+        user.refresh_from_db(fields=['points'])
+        if insufficient_points:
+            return Response({
+                'message': f'Insufficient points. You need {required_points} points but only have {user.points}.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        item.owner, item.status = user, 'swapped'
         return Response({
             'message': 'Item redeemed successfully! You now own this item.',
             'points_deducted': required_points,
@@ -0,0 +1,31 @@
+"""
+⚡ Native async user read endpoints (ASYNC_READ_VIEWS)
+
+Async version of UserViewSet.me - same ETag and payload, aggregates
+through the async ORM. See rewear/async_api.py.
+"""
+
+from rewear.async_api import async_read_view, json_response, read_view
+from rewear.conditional import not_modified, set_validators
+from swaps.models import SwapRequest
+from .serializers import UserProfileSerializer
+from .views import PROFILE_ITEM_STAMP, PROFILE_SWAP_STAMP, UserViewSet
+
+
+async def current_user(request, user):
+    """👤 GET /api/users/me/"""
+    view = read_view(UserViewSet, request, user, 'me')
+    items = await user.items.aaggregate(**PROFILE_ITEM_STAMP)
+    swaps = await SwapRequest.objects.filter(requester=user).aaggregate(**PROFILE_SWAP_STAMP)
+    etag = view.profile_etag(user, items, swaps)
+    response = not_modified(request, etag)
+    if response is not None:
+        return response
+
+    serializer = UserProfileSerializer(user, context=view.profile_context(items, swaps))
+    return set_validators(json_response(serializer.data), etag)
+
+
+user_me = async_read_view(
+    current_user, UserViewSet.as_view({'get': 'me'}, basename='user', detail=False, **UserViewSet.me.kwargs)
+)
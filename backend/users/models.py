@@ -10,9 +10,22 @@ class User(AbstractUser):
     profile_picture = models.ImageField(upload_to="profiles/", blank=True, null=True)
     is_private = models.BooleanField(default=False, help_text="Hide profile from public view")
 
+    # shown with each of the user's items in listings (items/projections.py)
+    LISTED_FIELDS = ('username', 'points')
+
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user.listed = user.listed_values()
+        return user
+
+    def listed_values(self):
+        """Current LISTED_FIELDS values (None for deferred ones)"""
+        return tuple(self.__dict__.get(name) for name in self.LISTED_FIELDS)
+
     def can_redeem_item(self, item):
         """Check if user can redeem a specific item"""
         return (
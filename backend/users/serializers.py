@@ -1,12 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.db.models import Count, Q
 from items.models import Item
 from swaps.models import SwapRequest
+from rewear.fieldsets import SparseFieldsetMixin
+from rewear.instrumentation import TimedSerializerMixin
 
 User = get_user_model()
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for user profile information"""
     total_items = serializers.SerializerMethodField()
     items_swapped = serializers.SerializerMethodField()
@@ -23,22 +26,39 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'username', 'email', 'date_joined')
 
+    def precomputed(self, name):
+        """Counter already aggregated by the view (context['profile_stats']), if any"""
+        stats = self.context.get('profile_stats')
+        return stats.get(name) if stats is not None else None
+
     def get_total_items(self, obj):
+        total = self.precomputed('total_items')
+        if total is not None:
+            return total
         return obj.items.filter(is_approved=True).count()
 
     def get_items_swapped(self, obj):
+        total = self.precomputed('items_swapped')
+        if total is not None:
+            return total
         return obj.items.filter(status='swapped').count()
 
     def get_active_swaps(self, obj):
+        total = self.precomputed('active_swaps')
+        if total is not None:
+            return total
         return SwapRequest.objects.filter(
             requester=obj, 
             status__in=['pending', 'accepted']
         ).count()
 
     def get_total_likes_received(self, obj):
+        total = self.precomputed('total_likes_received')
+        if total is not None:
+            return total
         return sum(item.like_count for item in obj.items.all())
 
-class UserDashboardStatsSerializer(serializers.Serializer):
+class UserDashboardStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Comprehensive dashboard statistics"""
     # Profile stats
     total_points = serializers.IntegerField()
@@ -65,7 +85,19 @@ class UserDashboardStatsSerializer(serializers.Serializer):
     new_likes_this_week = serializers.IntegerField()
     new_views_this_week = serializers.IntegerField()
 
-class PublicUserSerializer(serializers.ModelSerializer):
+def public_user_stats(user_ids):
+    """PublicUserSerializer counters for many users in one query, keyed by user id"""
+    stats = {user_id: {'total_items': 0, 'successful_swaps': 0} for user_id in user_ids}
+    rows = Item.objects.filter(owner_id__in=stats).order_by().values('owner_id').annotate(
+        total_items=Count('id', filter=Q(is_approved=True, status='available')),
+        successful_swaps=Count('id', filter=Q(status='swapped')),
+    )
+    for row in rows:
+        stats[row.pop('owner_id')] = row
+    return stats
+
+
+class PublicUserSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Limited user info for public display - privacy friendly"""
     total_items = serializers.SerializerMethodField()
     successful_swaps = serializers.SerializerMethodField()
@@ -78,14 +110,27 @@ class PublicUserSerializer(serializers.ModelSerializer):
             'total_items', 'successful_swaps', 'member_since'
         )
 
+    def precomputed(self, obj, name):
+        """Counter looked up in one batch for a whole list (context['public_user_stats']), if any"""
+        stats = self.context.get('public_user_stats')
+        if stats is not None and obj.pk in stats:
+            return stats[obj.pk][name]
+        return None
+
     def get_total_items(self, obj):
         if obj.is_private:
             return None
+        total = self.precomputed(obj, 'total_items')
+        if total is not None:
+            return total
         return obj.items.filter(is_approved=True, status='available').count()
 
     def get_successful_swaps(self, obj):
         if obj.is_private:
             return None
+        total = self.precomputed(obj, 'successful_swaps')
+        if total is not None:
+            return total
         return obj.items.filter(status='swapped').count()
 
     def get_member_since(self, obj):
@@ -1,3 +1,98 @@
+import json
+from unittest import skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+from items.models import ItemLike
+from rewear.testing import QueryBudgetMixin, authenticated_client, bearer, make_item, sync_view_response
+from swaps.models import SwapRequest
+
+User = get_user_model()
+
+
+class DashboardQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Dashboard endpoints run the same queries however much activity the user has"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member', email='member@example.com', password='pass12345')
+
+    def setUp(self):
+        self.client = authenticated_client(self.user)
+        self.add_activity(2)
+
+    def add_activity(self, count):
+        """Listings, likes and swaps in both directions"""
+        for _ in range(count):
+            number = User.objects.count()
+            other = User.objects.create_user(
+                username=f'other{number}', email=f'other{number}@example.com', password='pass12345'
+            )
+            mine, theirs = make_item(self.user, title='Mine'), make_item(other, title='Theirs')
+            ItemLike.objects.create(user=self.user, item=theirs)
+            SwapRequest.objects.create(requester=self.user, requested_item=theirs, offered_item=mine)
+            SwapRequest.objects.create(
+                requester=other, requested_item=make_item(self.user, title='Wanted'),
+                offered_item=make_item(other, title='Offered'),
+            )
+
+    def assert_constant(self, path, endpoint):
+        self.assertConstantQueries(
+            self.client, path, lambda: self.add_activity(6),
+            max_queries=settings.REQUEST_BUDGETS[endpoint]['queries'],
+        )
+
+    def test_dashboard(self):
+        self.assert_constant('/api/users/dashboard/', 'user-dashboard')
+
+    def test_my_swaps(self):
+        self.assert_constant('/api/users/my_swaps/', 'user-my-swaps')
+
+    def test_complete_dashboard(self):
+        self.assert_constant('/api/users/complete_dashboard/', 'user-complete-dashboard')
+
+    def test_my_activity(self):
+        self.assert_constant('/api/users/my_activity/', 'user-my-activity')
+
+    def test_liked_items(self):
+        self.assert_constant('/api/users/liked_items/', 'user-liked-items')
+
+
+@skipUnless(settings.ASYNC_READ_VIEWS, 'async read views are not routed')
+class AsyncCurrentUserParityTests(TestCase):
+    """GET /api/users/me/ answers the same through the async view as through UserViewSet.me"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='member', email='member@example.com', password='pass12345')
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        SwapRequest.objects.create(
+            requester=cls.user, requested_item=make_item(other), offered_item=make_item(cls.user)
+        )
+
+    async def get_both(self, headers):
+        response = await self.async_client.get('/api/users/me/', headers=headers)
+        expected = await sync_to_async(sync_view_response)('/api/users/me/', headers)
+        self.assertEqual(response.status_code, expected.status_code, response.content)
+        self.assertEqual(response.get('ETag'), expected.get('ETag'))
+        if expected.content:
+            self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        return response
+
+    async def test_profile_and_not_modified(self):
+        headers = {'Authorization': bearer(self.user)}
+        etag = (await self.get_both(headers))['ETag']
+        self.assertEqual((await self.get_both({**headers, 'If-None-Match': etag})).status_code, 304)
+
+    async def test_anonymous(self):
+        response = await self.get_both({})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
 
-# Create your tests here.
+    def test_only_the_token_authenticates(self):
+        client = APIClient()
+        client.force_authenticate(self.user)  # a test client hook, not a credential
+        self.assertEqual(client.get('/api/users/me/').status_code, 401)
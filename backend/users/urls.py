@@ -89,8 +89,10 @@ const getLikedItems = async (token) => {
 };
 """
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .async_views import user_me
 from .views import UserViewSet, register_user, login_user, reported_by_me, reported_about_me
 
 # Create router for user viewset
@@ -109,6 +111,10 @@ urlpatterns = [
     path('reported-about-me/', reported_about_me, name='reported_about_me'),
 ]
 
+if settings.ASYNC_READ_VIEWS:
+    # GET /api/users/me/ from the native async view (users/async_views.py)
+    urlpatterns = [path('users/me/', user_me, name='user-me')] + urlpatterns
+
 # Generated URL patterns from router:
 # GET    /api/users/                    -> UserViewSet.list() [Admin only]
 # GET    /api/users/{id}/               -> UserViewSet.retrieve() [Public with privacy]
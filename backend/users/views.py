@@ -1,5 +1,5 @@
 from django.contrib.auth import authenticate
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, Max
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework import status, permissions
@@ -8,7 +8,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.tokens import RefreshToken
-from items.models import Item, ItemLike
+from items.models import Item, ItemImage, ItemLike
 from items.serializers import ItemListSerializer
 from swaps.models import SwapRequest
 from .models import User
@@ -21,10 +21,64 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
 from django.conf import settings
+from rewear.conditional import make_etag, not_modified, set_validators
+from rewear.db_routers import ReplicaReadMixin
+from rewear.fieldsets import FieldSelection
+from rewear.profiling import ProfiledViewMixin
 import secrets
 import string
 
-class UserViewSet(ModelViewSet):
+# Aggregates behind /users/me/ - they version the ETag and feed the profile counters
+PROFILE_ITEM_STAMP = {
+    'last_updated': Max('updated_at'),
+    'approved': Count('id', filter=Q(is_approved=True)),
+    'swapped': Count('id', filter=Q(status='swapped')),
+    'likes': Sum('like_count'),
+}
+PROFILE_SWAP_STAMP = {
+    'last_updated': Max('updated_at'),
+    'active': Count('id', filter=Q(status__in=['pending', 'accepted'])),
+}
+
+
+def item_summary(user):
+    """Counters over the user's items for the dashboards, in one query"""
+    return user.items.aggregate(
+        total=Count('id'),
+        approved=Count('id', filter=Q(is_approved=True)),
+        pending_approval=Count('id', filter=Q(is_approved=False)),
+        available=Count('id', filter=Q(status='available', is_approved=True)),
+        swapped=Count('id', filter=Q(status='swapped')),
+        flagged=Count('id', filter=Q(is_flagged=True)),
+        views=Sum('view_count'),
+        likes=Sum('like_count'),
+    )
+
+
+def swap_summary(user):
+    """Counters over the swaps the user requested or received, in one query"""
+    return SwapRequest.objects.filter(Q(requester=user) | Q(requested_item__owner=user)).aggregate(
+        requested=Count('id', filter=Q(requester=user)),
+        received=Count('id', filter=Q(requested_item__owner=user)),
+        pending_requests=Count('id', filter=Q(requester=user, status='pending')),
+        pending_responses=Count('id', filter=Q(requested_item__owner=user, status='pending')),
+        active_requested=Count('id', filter=Q(requester=user, status__in=['pending', 'accepted'])),
+        active=Count('id', filter=Q(status__in=['pending', 'accepted'])),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+
+
+def primary_image_urls(request, items):
+    """item id -> absolute URL of the item's is_primary image (None without one), in one query"""
+    urls = dict.fromkeys(item.id for item in items)
+    images = ItemImage.objects.filter(item_id__in=urls, is_primary=True).order_by('item_id', 'order', 'id')
+    for image in images:
+        if urls[image.item_id] is None:
+            urls[image.item_id] = request.build_absolute_uri(image.image.url)
+    return urls
+
+
+class UserViewSet(ProfiledViewMixin, ReplicaReadMixin, ModelViewSet):
     """
     👤 USER MANAGEMENT API - Complete user profile and dashboard
     
@@ -80,9 +134,38 @@ class UserViewSet(ModelViewSet):
         👤 GET /api/users/me/
         
         Get current user's complete profile information.
+        Supports If-None-Match: the version stamp covers every field the
+        profile serializer derives, so a 304 skips its count queries.
         """
-        serializer = UserProfileSerializer(request.user, context={'request': request})
-        return Response(serializer.data)
+        user = request.user
+        items = user.items.aggregate(**PROFILE_ITEM_STAMP)
+        swaps = SwapRequest.objects.filter(requester=user).aggregate(**PROFILE_SWAP_STAMP)
+        etag = self.profile_etag(user, items, swaps)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        
+        serializer = UserProfileSerializer(user, context=self.profile_context(items, swaps))
+        return set_validators(Response(serializer.data), etag)
+
+    def profile_etag(self, user, items, swaps):
+        return make_etag(
+            'me', user.pk, user.username, user.email, user.first_name, user.last_name,
+            user.points, user.location, str(user.profile_picture), user.is_private,
+            *items.values(), *swaps.values(), FieldSelection.from_request(self.request).stamp
+        )
+
+    def profile_context(self, items, swaps):
+        """Serializer context carrying the stamp aggregates, so the profile's counters need no queries"""
+        return {
+            'request': self.request,
+            'profile_stats': {
+                'total_items': items['approved'],
+                'items_swapped': items['swapped'],
+                'active_swaps': swaps['active'],
+                'total_likes_received': items['likes'] or 0,
+            },
+        }
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def dashboard(self, request):
@@ -104,34 +187,29 @@ class UserViewSet(ModelViewSet):
         month_ago = now - timedelta(days=30)
 
         # Calculate comprehensive stats
-        user_items = user.items.all()
+        items = item_summary(user)
+        swaps = swap_summary(user)
         
         # Point stats (placeholder for future point earning system)
         total_points = user.points
         points_earned_this_month = 0  # TODO: Implement point earning tracking
 
         # Item statistics
-        total_items = user_items.count()
-        pending_approval = user_items.filter(is_approved=False).count()  # Items waiting for approval
-        available_items = user_items.filter(status='available', is_approved=True).count()
-        swapped_items = user_items.filter(status='swapped').count()
+        total_items = items['total']
+        pending_approval = items['pending_approval']  # Items waiting for approval
+        available_items = items['available']
+        swapped_items = items['swapped']
 
         # Engagement statistics
-        total_views = user_items.aggregate(total=Sum('view_count'))['total'] or 0
-        total_likes = user_items.aggregate(total=Sum('like_count'))['total'] or 0
+        total_views = items['views'] or 0
+        total_likes = items['likes'] or 0
         profile_views = 0  # TODO: Implement profile view tracking
 
         # Swap statistics
-        swaps_requested = SwapRequest.objects.filter(requester=user).count()
-        swaps_received = SwapRequest.objects.filter(requested_item__owner=user).count()
-        successful_swaps = SwapRequest.objects.filter(
-            Q(requester=user) | Q(requested_item__owner=user),
-            status='completed'
-        ).count()
-        active_negotiations = SwapRequest.objects.filter(
-            Q(requester=user) | Q(requested_item__owner=user),
-            status__in=['pending', 'accepted']
-        ).count()
+        swaps_requested = swaps['requested']
+        swaps_received = swaps['received']
+        successful_swaps = swaps['completed']
+        active_negotiations = swaps['active']
 
         # Recent activity (placeholder - would need activity tracking)
         new_likes_this_week = 0  # TODO: Track like timestamps
@@ -182,7 +260,7 @@ class UserViewSet(ModelViewSet):
         # Recent swap requests (last 5 received)
         recent_swap_requests = SwapRequest.objects.filter(
             requested_item__owner=user
-        ).order_by('-created_at')[:5]
+        ).select_related('requester', 'offered_item', 'requested_item').order_by('-created_at')[:5]
 
         # TODO: Recent likes received (would need like timestamp tracking)
         recent_likes = []
@@ -236,6 +314,12 @@ class UserViewSet(ModelViewSet):
             'requester', 'requested_item', 'offered_item'
         ).order_by('-created_at')[:10]
         
+        # Primary images of every item involved, in one query
+        images = primary_image_urls(request, [
+            item for swap in [*requested_swaps, *received_swaps]
+            for item in (swap.requested_item, swap.offered_item)
+        ])
+        
         # Format the data for frontend
         requested_data = [
             {
@@ -250,17 +334,13 @@ class UserViewSet(ModelViewSet):
                     'title': swap.requested_item.title,
                     'owner': swap.requested_item.owner.username,
                     'point_value': swap.requested_item.point_value,
-                    'primary_image': request.build_absolute_uri(
-                        swap.requested_item.images.filter(is_primary=True).first().image.url
-                    ) if swap.requested_item.images.filter(is_primary=True).exists() else None
+                    'primary_image': images[swap.requested_item.id]
                 },
                 'item_offered': {
                     'id': swap.offered_item.id,
                     'title': swap.offered_item.title,
                     'point_value': swap.offered_item.point_value,
-                    'primary_image': request.build_absolute_uri(
-                        swap.offered_item.images.filter(is_primary=True).first().image.url
-                    ) if swap.offered_item.images.filter(is_primary=True).exists() else None
+                    'primary_image': images[swap.offered_item.id]
                 }
             } for swap in requested_swaps
         ]
@@ -282,37 +362,27 @@ class UserViewSet(ModelViewSet):
                     'id': swap.requested_item.id,
                     'title': swap.requested_item.title,
                     'point_value': swap.requested_item.point_value,
-                    'primary_image': request.build_absolute_uri(
-                        swap.requested_item.images.filter(is_primary=True).first().image.url
-                    ) if swap.requested_item.images.filter(is_primary=True).exists() else None
+                    'primary_image': images[swap.requested_item.id]
                 },
                 'offered_item': {
                     'id': swap.offered_item.id,
                     'title': swap.offered_item.title,
                     'point_value': swap.offered_item.point_value,
-                    'primary_image': request.build_absolute_uri(
-                        swap.offered_item.images.filter(is_primary=True).first().image.url
-                    ) if swap.offered_item.images.filter(is_primary=True).exists() else None
+                    'primary_image': images[swap.offered_item.id]
                 }
             } for swap in received_swaps
         ]
         
+        summary = swap_summary(user)
         return Response({
             'swaps_requested': requested_data,
             'swaps_received': received_data,
             'summary': {
-                'total_requested': SwapRequest.objects.filter(requester=user).count(),
-                'total_received': SwapRequest.objects.filter(requested_item__owner=user).count(),
-                'pending_requests': SwapRequest.objects.filter(
-                    requester=user, status='pending'
-                ).count(),
-                'pending_responses': SwapRequest.objects.filter(
-                    requested_item__owner=user, status='pending'
-                ).count(),
-                'completed_swaps': SwapRequest.objects.filter(
-                    Q(requester=user) | Q(requested_item__owner=user),
-                    status='completed'
-                ).count()
+                'total_requested': summary['requested'],
+                'total_received': summary['received'],
+                'pending_requests': summary['pending_requests'],
+                'pending_responses': summary['pending_responses'],
+                'completed_swaps': summary['completed'],
             }
         })
 
@@ -332,8 +402,19 @@ class UserViewSet(ModelViewSet):
         """
         user = request.user
         
+        items = item_summary(user)
+        swaps = swap_summary(user)
+        
         # 1. Personal Details
-        profile_data = UserProfileSerializer(user, context={'request': request}).data
+        profile_data = UserProfileSerializer(user, context={
+            'request': request,
+            'profile_stats': {
+                'total_items': items['approved'],
+                'items_swapped': items['swapped'],
+                'active_swaps': swaps['active_requested'],
+                'total_likes_received': items['likes'] or 0,
+            },
+        }).data
         
         # 2. My Listings (latest 6 items)
         my_items = user.items.all().order_by('-created_at')[:6]
@@ -344,27 +425,21 @@ class UserViewSet(ModelViewSet):
         # 3. Recent Swaps Summary
         recent_swaps_requested = SwapRequest.objects.filter(
             requester=user
-        ).order_by('-created_at')[:3]
+        ).select_related('requested_item').order_by('-created_at')[:3]
         
         recent_swaps_received = SwapRequest.objects.filter(
             requested_item__owner=user
-        ).order_by('-created_at')[:3]
+        ).select_related('requested_item', 'requester').order_by('-created_at')[:3]
         
         # 4. Quick Stats for Dashboard Cards
         stats = {
-            'total_items': user.items.count(),
-            'available_items': user.items.filter(status='available', is_approved=True).count(),
-            'flagged_items': user.items.filter(is_flagged=True).count(),
-            'total_views': user.items.aggregate(total=Sum('view_count'))['total'] or 0,
-            'total_likes': user.items.aggregate(total=Sum('like_count'))['total'] or 0,
-            'active_swaps': SwapRequest.objects.filter(
-                Q(requester=user) | Q(requested_item__owner=user),
-                status__in=['pending', 'accepted']
-            ).count(),
-            'completed_swaps': SwapRequest.objects.filter(
-                Q(requester=user) | Q(requested_item__owner=user),
-                status='completed'
-            ).count()
+            'total_items': items['total'],
+            'available_items': items['available'],
+            'flagged_items': items['flagged'],
+            'total_views': items['views'] or 0,
+            'total_likes': items['likes'] or 0,
+            'active_swaps': swaps['active'],
+            'completed_swaps': swaps['completed'],
         }
         
         return Response({